@@ -0,0 +1,106 @@
+import src.IO as IO
+import time
+import os
+
+sep = os.path.sep
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPERIMENTS_DIR = parent_dir + sep + 'experiments' + sep
+DEFAULT_EXPERIMENT = 'a_all_gene_pools_nonsym_extremehigh'
+
+
+def add_config_arguments(parser, individuals=8, duration=5, repeats=3):
+    """Adds the arguments selecting the evolution configuration of a benchmark.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser of the benchmark script.
+    individuals : int
+        Default number of individuals.
+    duration : int | float
+        Default duration of each simulation in seconds.
+    repeats : int | None
+        Default number of repetitions of each measurement, None if the benchmark does not repeat measurements.
+    """
+
+    parser.add_argument('-e', '--experiment', default=DEFAULT_EXPERIMENT,
+                        help='experiment within experiments/ whose evo_config.json is benchmarked '
+                             '(default={})'.format(DEFAULT_EXPERIMENT))
+
+    parser.add_argument('-n', '--individuals', default=individuals, type=int,
+                        help='number of individuals, overrides the experiment (default={})'.format(individuals))
+
+    parser.add_argument('-d', '--duration', default=duration, type=float,
+                        help='duration of each simulation in seconds, overrides the experiment '
+                             '(default={})'.format(duration))
+
+    if repeats is not None:
+        parser.add_argument('-r', '--repeats', default=repeats, type=int,
+                            help='number of repetitions, the fastest one is reported (default={})'.format(repeats))
+
+    parser.add_argument('-rs', '--random_seed', default=0, type=int,
+                        help='seed of the random gene pool (default=0)')
+
+
+def experiment_config(experiment):
+    """Reads the evolution configuration of an experiment.
+
+    Parameters
+    ----------
+    experiment : str
+        Name of the experiment directory within ``experiments``.
+
+    Returns
+    -------
+    evo_config : dict
+        Configuration of the experiment. See :func:`src.IO.make_default_evo_config`.
+    """
+
+    return IO.read_evo_config(EXPERIMENTS_DIR + experiment + sep + 'evo_config.json')
+
+
+def benchmark_config(args):
+    """Reads the evolution configuration of an experiment and applies the overrides of a benchmark.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed arguments. See :func:`benchmarks.add_config_arguments`.
+
+    Returns
+    -------
+    evo_config : dict
+        Configuration of the experiment with ``individuals`` and ``duration`` replaced.
+    """
+
+    evo_config = experiment_config(args.experiment)
+    evo_config['simulation']['individuals'] = args.individuals
+    evo_config['simulation']['duration'] = args.duration
+    return evo_config
+
+
+def best_time(func, repeats=3):
+    """Calls a function several times and returns the shortest wall time.
+
+    Parameters
+    ----------
+    func : callable
+        Function without arguments.
+    repeats : int
+        Number of calls.
+
+    Returns
+    -------
+    seconds : float
+        Shortest wall time of all calls.
+    result : object
+        Return value of the last call.
+    """
+
+    seconds, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, result
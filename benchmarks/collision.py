@@ -0,0 +1,131 @@
+import argparse
+import time
+import numpy as np
+import pybullet as p
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import DEFAULT_EXPERIMENT, experiment_config
+from src.simulation import _make_sim_env, _genome2simulation, _disable_collision
+import src.IO as IO
+
+
+def main():
+    """Measures the time needed to isolate n individuals sharing one physics server.
+
+    The command can be run from the command line, via
+
+    ``python benchmarks/collision.py``
+
+    .. note:: For each population size a random gene pool of the selected experiment is created in a new DIRECT
+              physics server. Individuals are isolated with collision groups right after their creation, like in
+              :func:`src.simulation.simulate_pop`. For small populations the former pairwise filter of each pair of
+              links of each pair of individuals is measured as reference. Creating the bodies and the first physics
+              step are reported separately.
+
+              .. code-block:: bash
+
+                usage: collision.py [-h] [-e EXPERIMENT] [-ns SIZES [SIZES ...]]
+                                    [-pm PAIRWISE_MAX] [-rs RANDOM_SEED]
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-e', '--experiment', default=DEFAULT_EXPERIMENT,
+                        help='experiment within experiments/ whose evo_config.json is benchmarked '
+                             '(default={})'.format(DEFAULT_EXPERIMENT))
+
+    parser.add_argument('-ns', '--sizes', default=[10, 30, 100, 300, 1000], type=int, nargs='+',
+                        help='numbers of individuals per physics server (default=10 30 100 300 1000)')
+
+    parser.add_argument('-pm', '--pairwise_max', default=30, type=int,
+                        help='largest number of individuals the pairwise filter is measured for (default=30)')
+
+    parser.add_argument('-rs', '--random_seed', default=0, type=int,
+                        help='seed of the random gene pools (default=0)')
+
+    args = parser.parse_args()
+
+    print('experiment {}'.format(args.experiment))
+    print('{:>6} | {:>10} | {:>10} | {:>10} | {:>10} | {:>10}'.format('n', 'groups', 'calls', 'pairwise', 'calls',
+                                                                       'create+step'))
+    for num_individuals in args.sizes:
+        evo_config = experiment_config(args.experiment)
+        evo_config['simulation']['individuals'] = num_individuals
+        np.random.seed(args.random_seed)
+        gene_pool = IO.new_gene_pool(None, evo_config)
+
+        seconds_groups, calls_groups, seconds_setup = _isolate_groups(gene_pool, evo_config)
+        if num_individuals <= args.pairwise_max:
+            seconds_pairwise, calls_pairwise = _isolate_pairwise(gene_pool, evo_config)
+            pairwise = '{:>9.3f}s | {:>10}'.format(seconds_pairwise, calls_pairwise)
+        else:
+            pairwise = '{:>10} | {:>10}'.format('-', '-')
+        print('{:>6} | {:>9.3f}s | {:>10} | {} | {:>9.3f}s'.format(num_individuals, seconds_groups, calls_groups,
+                                                                  pairwise, seconds_setup))
+
+
+def _isolate_groups(gene_pool, evo_config):
+    """Creates and isolates all individuals with collision groups as in :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    seconds : float
+        Time spent isolating the individuals.
+    calls : int
+        Number of collision filter calls.
+    seconds_setup : float
+        Time spent creating the individuals and for the first physics step.
+    """
+
+    sim_id = _make_sim_env('direct')
+    try:
+        pop, seconds, seconds_setup = [], 0., 0.
+        for genome in gene_pool:
+            start = time.perf_counter()
+            pop.append(_genome2simulation(sim_id, evo_config, genome))
+            seconds_setup += time.perf_counter() - start
+
+            start = time.perf_counter()
+            _disable_collision(sim_id, pop[-1:])
+            seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        p.stepSimulation(physicsClientId=sim_id)
+        seconds_setup += time.perf_counter() - start
+
+        calls = sum(p.getNumJoints(indiv, physicsClientId=sim_id) + 1 for indiv in pop)
+    finally:
+        p.disconnect(physicsClientId=sim_id)
+    return seconds, calls, seconds_setup
+
+
+def _isolate_pairwise(gene_pool, evo_config):
+    """Creates all individuals and disables the collision of each pair of links of each pair of individuals.
+
+    Returns
+    -------
+    seconds : float
+        Time spent isolating the individuals.
+    calls : int
+        Number of collision filter calls.
+    """
+
+    sim_id = _make_sim_env('direct')
+    try:
+        pop = [_genome2simulation(sim_id, evo_config, genome) for genome in gene_pool]
+
+        start, calls = time.perf_counter(), 0
+        for idx, individual in enumerate(pop[:-1]):
+            for other_individual in pop[idx + 1:]:
+                for joint in range(-1, p.getNumJoints(individual, physicsClientId=sim_id)):
+                    for other_joint in range(-1, p.getNumJoints(other_individual, physicsClientId=sim_id)):
+                        p.setCollisionFilterPair(individual, other_individual, joint, other_joint, 0,
+                                                 physicsClientId=sim_id)
+                        calls += 1
+        seconds = time.perf_counter() - start
+    finally:
+        p.disconnect(physicsClientId=sim_id)
+    return seconds, calls
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import numpy as np
+import pybullet as p
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import add_config_arguments, benchmark_config, best_time
+from src.simulation import simulate_pop, _make_sim_env, _reset_sim_env, _genome2simulation, \
+    _disable_collision, _duration_steps
+from src.individual import _move_individual, get_dist
+import src.IO as IO
+
+
+def main():
+    """Measures the physics steps per second of the compiled controllers against the per-step reference.
+
+    The command can be run from the command line, via
+
+    ``python benchmarks/controller.py``
+
+    .. note:: One random gene pool of the selected experiment is simulated in a single DIRECT physics server, once
+              with the reference :func:`src.individual._move_individual` (querying friction, shapes and forces every
+              step) and once per actuation mode of :func:`src.simulation.simulate_pop`. Setup is included. The final
+              distances of all runs must be identical.
+
+              .. code-block:: bash
+
+                usage: controller.py [-h] [-e EXPERIMENT] [-n INDIVIDUALS] [-d DURATION]
+                                     [-r REPEATS] [-rs RANDOM_SEED]
+    """
+
+    parser = argparse.ArgumentParser()
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    evo_config = benchmark_config(args)
+    np.random.seed(args.random_seed)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    num_steps = _duration_steps(evo_config)
+
+    sim_id = _make_sim_env('direct')
+    try:
+        def run(simulate):
+            def call():
+                pop = simulate(sim_id)
+                distances = [get_dist(indiv, sim_id) for indiv in pop]
+                _reset_sim_env(sim_id)
+                return distances
+            return call
+
+        runs = [('reference', run(lambda sim: _simulate_reference(gene_pool, evo_config, sim))),
+                ('limb', run(lambda sim: simulate_pop(gene_pool, evo_config, direct=True, track_individuals=False,
+                                                      sim_id=sim, actuation='limb')[0])),
+                ('array', run(lambda sim: simulate_pop(gene_pool, evo_config, direct=True, track_individuals=False,
+                                                       sim_id=sim, actuation='array')[0]))]
+
+        print('experiment {} | individuals {} | steps {}'.format(args.experiment, len(gene_pool), num_steps))
+        reference = None
+        for name, call in runs:
+            seconds, distances = best_time(call, args.repeats)
+            reference = distances if reference is None else reference
+            print('{:<9} | {:.2f} s | {:.0f} steps/s | {:.0f} creature-steps/s | identical {}'.format(
+                name, seconds, num_steps / seconds, num_steps * len(gene_pool) / seconds, distances == reference))
+    finally:
+        p.disconnect(physicsClientId=sim_id)
+
+
+def _simulate_reference(gene_pool, evo_config, sim_id):
+    """Simulates a gene pool moving each individual with :func:`src.individual._move_individual` every step.
+
+    Parameters
+    ----------
+    gene_pool : GenePool
+        Genomes of all individuals.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    sim_id : int
+        Index pointing to the physics server of the simulation.
+
+    Returns
+    -------
+    pop : list
+        List of ind_ids for all individuals.
+    """
+
+    pop = []
+    for genome in gene_pool:
+        pop.append(_genome2simulation(sim_id, evo_config, genome))
+        _disable_collision(sim_id, pop[-1:])
+    genomes = list(gene_pool)
+
+    for step in range(int(_duration_steps(evo_config))):
+        p.stepSimulation(physicsClientId=sim_id)
+        for indiv, genome in zip(pop, genomes):
+            _move_individual(indiv, genome, step, evo_config, sim_id)
+    return pop
+
+
+if __name__ == '__main__':
+    main()
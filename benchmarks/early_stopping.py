@@ -0,0 +1,115 @@
+import argparse
+import time
+import copy
+import numpy as np
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import add_config_arguments, benchmark_config
+from src.simulation import simulate_multi_core, make_worker_pool
+from src.IO import _check_early_stopping_config
+import src.evolution as evo
+import src.IO as IO
+
+
+def main():
+    """Measures the simulation time saved by early stopping and how often it changes the selection.
+
+    The command can be run from the command line, via
+
+    ``python benchmarks/early_stopping.py``
+
+    .. note:: A random gene pool of the selected experiment is evolved for ``-g`` generations without early stopping.
+              From the second generation on, each generation is simulated once more with early stopping for every
+              margin of ``-m``, using the selection cutoff of the previous generation. Reported are the simulation
+              times, the number of stopped individuals and the fraction of the selectable best half that is the same
+              with and without early stopping.
+
+              .. code-block:: bash
+
+                usage: early_stopping.py [-h] [-e EXPERIMENT] [-n INDIVIDUALS] [-d DURATION]
+                                         [-rs RANDOM_SEED] [-g GENERATIONS]
+                                         [-m MARGINS [MARGINS ...]]
+                                         [-cp CHECKPOINTS [CHECKPOINTS ...]]
+                                         [-p {extrapolate,freeze}] [-c CORES]
+    """
+
+    parser = argparse.ArgumentParser()
+    add_config_arguments(parser, individuals=24, duration=8, repeats=None)
+
+    parser.add_argument('-g', '--generations', default=6, type=int,
+                        help='number of generations (default=6)')
+
+    parser.add_argument('-m', '--margins', default=[1, 1.5, 2], type=float, nargs='+',
+                        help='margins of early stopping, at least 1 (default=1 1.5 2)')
+
+    parser.add_argument('-cp', '--checkpoints', default=[0.25, 0.5, 0.75], type=float, nargs='+',
+                        help='checkpoints of early stopping as fractions of the duration (default=0.25 0.5 0.75)')
+
+    parser.add_argument('-p', '--policy', default='extrapolate', choices=['extrapolate', 'freeze'],
+                        help='fitness of stopped individuals (default=extrapolate)')
+
+    parser.add_argument('-c', '--cores', default=1, type=int,
+                        help='number of worker processes (default=1)')
+
+    args = parser.parse_args()
+
+    evo_config = benchmark_config(args)
+    stopping_configs = []
+    for margin in args.margins:
+        stopping_config = copy.deepcopy(evo_config)
+        stopping_config['simulation']['early_stopping'] = {'checkpoints': args.checkpoints, 'policy': args.policy,
+                                                           'margin': margin}
+        _check_early_stopping_config(stopping_config['simulation']['early_stopping'])
+        stopping_configs.append(stopping_config)
+
+    np.random.seed(args.random_seed)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    num_survivors = int(0.5 * len(gene_pool))
+
+    print('experiment {} | individuals {} | duration {} s | checkpoints {} | policy {}'.format(
+        args.experiment, len(gene_pool), args.duration, args.checkpoints, args.policy))
+    seconds_full, seconds_stopping = 0., np.zeros(len(args.margins))
+    pool = make_worker_pool(None, num_cores=args.cores)
+    try:
+        cutoff = None
+        for generation in range(args.generations):
+            start = time.perf_counter()
+            fitness, _ = simulate_multi_core(gene_pool, evo_config, track_individuals=False, pool=pool)
+            seconds = time.perf_counter() - start
+            best = set(np.argsort(fitness)[::-1][:num_survivors])
+
+            # the first generation has no cutoff and is always simulated completely
+            if cutoff is not None:
+                seconds_full += seconds
+                row = ['generation {:>3} | full {:.2f} s'.format(generation, seconds)]
+                for idx, stopping_config in enumerate(stopping_configs):
+                    start = time.perf_counter()
+                    fitness_stopping, _, stopped = simulate_multi_core(gene_pool, stopping_config,
+                                                                       track_individuals=False, pool=pool,
+                                                                       cutoff=cutoff, return_stopped=True)
+                    seconds_margin = time.perf_counter() - start
+                    seconds_stopping[idx] += seconds_margin
+
+                    overlap = len(best & set(np.argsort(fitness_stopping)[::-1][:num_survivors])) / num_survivors
+                    row.append('margin {:g}: {:.2f} s, stopped {:>3}, overlap {:.2f}'.format(
+                        args.margins[idx], seconds_margin, int(np.sum(stopped)), overlap))
+                print(' | '.join(row))
+
+            cutoff = evo.selection_cutoff(fitness)
+            selected = evo.selection(np.argsort(fitness)[::-1])
+            if evo_config['evolution'].get('batch_crossing', False):
+                gene_pool = evo.batch_crossing(selected, gene_pool, evo_config)
+            else:
+                gene_pool = evo.crossing(selected, gene_pool, evo_config)
+    finally:
+        pool.close()
+        pool.join()
+
+    if args.generations > 1:
+        print('total full {:.2f} s | '.format(seconds_full) + ' | '.join(
+            'margin {:g}: {:.2f} s ({:.2f}x)'.format(margin, seconds, seconds_full / seconds)
+            for margin, seconds in zip(args.margins, seconds_stopping)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import pickle
+import tracemalloc
+import numpy as np
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import DEFAULT_EXPERIMENT, experiment_config, best_time
+import src.IO as IO
+
+
+def main():
+    """Compares memory use and serialization of a GenePool with the legacy list of genomes.
+
+    The command can be run from the command line, via
+
+    ``python benchmarks/gene_pool.py``
+
+    .. note:: For each population size a random gene pool of the selected experiment is created. Memory is the number
+              of bytes allocated while loading the pickled gene pool (measured with ``tracemalloc``), which includes
+              the Python objects around the arrays. Dump and load times are the fastest of ``-r`` repetitions. Both
+              representations must hold identical genomes after a round trip.
+
+              .. code-block:: bash
+
+                usage: gene_pool.py [-h] [-e EXPERIMENT] [-ns SIZES [SIZES ...]] [-r REPEATS]
+                                    [-rs RANDOM_SEED]
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-e', '--experiment', default=DEFAULT_EXPERIMENT,
+                        help='experiment within experiments/ whose evo_config.json is benchmarked '
+                             '(default={})'.format(DEFAULT_EXPERIMENT))
+
+    parser.add_argument('-ns', '--sizes', default=[100, 1000], type=int, nargs='+',
+                        help='numbers of individuals (default=100 1000)')
+
+    parser.add_argument('-r', '--repeats', default=5, type=int,
+                        help='number of repetitions, the fastest one is reported (default=5)')
+
+    parser.add_argument('-rs', '--random_seed', default=0, type=int,
+                        help='seed of the random gene pools (default=0)')
+
+    args = parser.parse_args()
+
+    print('experiment {}'.format(args.experiment))
+    for num_individuals in args.sizes:
+        evo_config = experiment_config(args.experiment)
+        evo_config['simulation']['individuals'] = num_individuals
+        np.random.seed(args.random_seed)
+        gene_pool = IO.new_gene_pool(None, evo_config)
+
+        for name, data in [('legacy', gene_pool.to_genomes()), ('GenePool', gene_pool)]:
+            seconds_dump, pickled = best_time(lambda: pickle.dumps(data), args.repeats)
+            seconds_load, loaded = best_time(lambda: pickle.loads(pickled), args.repeats)
+            identical = all(_genomes_equal(genome, other) for genome, other in zip(gene_pool, loaded))
+            print('n {:>6} | {:<8} | memory {:>8.2f} MB | pickle {:>8.2f} MB | dump {:>7.1f} ms | load {:>7.1f} ms | '
+                  'identical {}'.format(num_individuals, name, _loaded_bytes(pickled) / 1e6, len(pickled) / 1e6,
+                                        1e3 * seconds_dump, 1e3 * seconds_load, identical))
+
+
+def _loaded_bytes(pickled):
+    """Returns the number of bytes allocated while unpickling an object."""
+
+    tracemalloc.start()
+    try:
+        loaded = pickle.loads(pickled)
+        size = tracemalloc.get_traced_memory()[0]
+        del loaded
+    finally:
+        tracemalloc.stop()
+    return size
+
+
+def _genomes_equal(genome, other):
+    """Returns whether two genomes in the legacy format are identical."""
+
+    return all(chromosome.keys() == other_chromosome.keys() and
+               all(np.array_equal(chromosome[key], other_chromosome[key]) for key in chromosome)
+               for chromosome, other_chromosome in zip(genome, other))
+
+
+if __name__ == '__main__':
+    main()
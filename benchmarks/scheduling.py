@@ -0,0 +1,132 @@
+import argparse
+import heapq
+import time
+import numpy as np
+import pybullet as p
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import add_config_arguments, benchmark_config, best_time
+from src.simulation import simulate_pop, simulate_multi_core, make_worker_pool, _make_sim_env, _reset_sim_env, \
+    _make_batches
+import src.IO as IO
+
+
+def main():
+    """Compares the idle time at the generation barrier of fixed slabs and of batches pulled from a shared queue.
+
+    The command can be run from the command line, via
+
+    ``python benchmarks/scheduling.py``
+
+    .. note:: A heterogeneous gene pool is created from the selected experiment, where the first ``-l`` individuals
+              get the largest boxes allowed and hence many contacts. The cost of each individual is measured by
+              simulating it alone. These costs are replayed on ``-c`` cores, once split into one slab per core like
+              ``np.array_split`` and once handed out in batches of ``-bs`` individuals to whichever core is free first.
+              With ``-p`` the gene pool is additionally simulated by real worker processes, which only gives meaningful
+              wall times if the machine has at least ``-c`` cores.
+
+              .. code-block:: bash
+
+                usage: scheduling.py [-h] [-e EXPERIMENT] [-n INDIVIDUALS] [-d DURATION]
+                                     [-r REPEATS] [-rs RANDOM_SEED] [-l LARGE] [-c CORES]
+                                     [-bs BATCH_SIZES [BATCH_SIZES ...]] [-p]
+    """
+
+    parser = argparse.ArgumentParser()
+    add_config_arguments(parser, individuals=40, duration=3)
+
+    parser.add_argument('-l', '--large', default=10, type=int,
+                        help='number of individuals with the largest boxes, placed at the start of the gene pool '
+                             '(default=10)')
+
+    parser.add_argument('-c', '--cores', default=8, type=int,
+                        help='number of cores the measured costs are replayed on (default=8)')
+
+    parser.add_argument('-bs', '--batch_sizes', default=[1, 2, 5], type=int, nargs='+',
+                        help='batch sizes of the shared queue (default=1 2 5)')
+
+    parser.add_argument('-p', '--pool', action='store_true',
+                        help='additionally measure the wall time of real worker processes')
+
+    args = parser.parse_args()
+
+    evo_config = benchmark_config(args)
+    np.random.seed(args.random_seed)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    gene_pool.sizes[:args.large] = evo_config['individuals']['max_box_size']
+
+    costs = _measure_costs(gene_pool, evo_config)
+    print('experiment {} | individuals {} (large {}) | cost per individual {:.3f} - {:.3f} s | total {:.2f} s'.format(
+        args.experiment, len(gene_pool), args.large, np.min(costs), np.max(costs), np.sum(costs)))
+
+    print('replayed on {} cores'.format(args.cores))
+    schedules = [('array_split', _slab_makespan(costs, args.cores))]
+    schedules += [('queue bs={}'.format(batch_size), _queue_makespan(costs, args.cores, batch_size))
+                  for batch_size in args.batch_sizes]
+    for name, makespan in schedules:
+        idle = 1 - np.sum(costs) / (args.cores * makespan)
+        print('{:<12} | makespan {:.2f} s | idle {:.0f}%'.format(name, makespan, 100 * idle))
+
+    if args.pool:
+        print('simulated on {} worker processes'.format(args.cores))
+        seconds, _ = best_time(lambda: simulate_multi_core(gene_pool, evo_config, track_individuals=False,
+                                                           num_cores=args.cores), args.repeats)
+        print('{:<12} | wall time {:.2f} s'.format('array_split', seconds))
+
+        pool = make_worker_pool(evo_config, num_cores=args.cores)
+        try:
+            for batch_size in args.batch_sizes:
+                seconds, _ = best_time(lambda: simulate_multi_core(gene_pool, evo_config, track_individuals=False,
+                                                                   pool=pool, batch_size=batch_size), args.repeats)
+                print('{:<12} | wall time {:.2f} s'.format('queue bs={}'.format(batch_size), seconds))
+        finally:
+            pool.close()
+            pool.join()
+
+
+def _measure_costs(gene_pool, evo_config):
+    """Measures the wall time of simulating each individual alone in one physics server.
+
+    Parameters
+    ----------
+    gene_pool : GenePool
+        Genomes of all individuals.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    costs : np.array
+        Seconds needed for each individual.
+    """
+
+    sim_id = _make_sim_env('direct')
+    costs = np.zeros(len(gene_pool))
+    try:
+        for index in range(len(gene_pool)):
+            start = time.perf_counter()
+            simulate_pop(gene_pool[index:index + 1], evo_config, direct=True, track_individuals=False, sim_id=sim_id)
+            costs[index] = time.perf_counter() - start
+            _reset_sim_env(sim_id)
+    finally:
+        p.disconnect(physicsClientId=sim_id)
+    return costs
+
+
+def _slab_makespan(costs, num_cores):
+    """Returns the time until the slowest of ``num_cores`` fixed slabs (``np.array_split``) is simulated."""
+
+    return max(np.sum(slab) for slab in np.array_split(costs, num_cores))
+
+
+def _queue_makespan(costs, num_cores, batch_size):
+    """Returns the time until all batches are simulated if each batch goes to the core that is free first."""
+
+    free_at = [0.] * num_cores
+    for start, stop in _make_batches(len(costs), batch_size):
+        heapq.heappush(free_at, heapq.heappop(free_at) + np.sum(costs[start:stop]))
+    return max(free_at)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import src.IO as IO
+import argparse
+import os
+
+
+def main():
+    """Archives the gene pools of existing evolution directories to save disk space.
+
+    The command can be run from the command line, via
+
+    ``python compact_gene_pools.py <directories>``
+
+    .. note:: All given directories are searched recursively, such that e.g. ``python compact_gene_pools.py
+              experiments`` compacts all trials of all experiments. Within each evolution directory the gene pools of
+              all generations are archived as deltas against the previous generation (see
+              :func:`src.IO.compact_gene_pools`) and the space saved is reported.
+
+              .. code-block:: bash
+
+                usage: compact_gene_pools.py [-h] [-p {float32,float64}] [-k]
+                                             directories [directories ...]
+
+                positional arguments:
+                  directories           evolution directories, searched recursively
+
+                optional arguments:
+                  -h, --help            show this help message and exit
+                  -p {float32,float64}, --precision {float32,float64}
+                                        precision of the archived gene pools - By default
+                                        gene pool files keep their precision and pickle files
+                                        are archived exactly
+                  -k, --keep            keep the original gene pool files
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('directories', nargs='+',
+                        help='evolution directories, searched recursively')
+
+    parser.add_argument('-p', '--precision', default=None, choices=['float32', 'float64'],
+                        help='precision of the archived gene pools - By default gene pool files keep their precision '
+                             'and pickle files are archived exactly')
+
+    parser.add_argument('-k', '--keep', action='store_true',
+                        help='keep the original gene pool files')
+
+    args = parser.parse_args()
+
+    total_before, total_after, total_archived = 0, 0, 0
+    for directory in args.directories:
+        for evolution_dir, _, files in sorted(os.walk(directory)):
+            if not any(file.startswith('gen_') and os.path.splitext(file)[1] in IO.GENE_POOL_EXTENSIONS
+                       for file in files):
+                continue
+
+            num_archived, bytes_before, bytes_after = IO.compact_gene_pools(evolution_dir, precision=args.precision,
+                                                                            keep_files=args.keep)
+            total_before += bytes_before
+            total_after += bytes_after
+            total_archived += num_archived
+            print('{} | archived generations {} | {} -> {}'.format(evolution_dir, num_archived,
+                                                                   _format_bytes(bytes_before),
+                                                                   _format_bytes(bytes_after)))
+
+    saved = 100 * (1 - total_after / total_before) if total_before > 0 else 0
+    print('archived generations {} | {} -> {} | saved {:.1f}%'.format(total_archived, _format_bytes(total_before),
+                                                                      _format_bytes(total_after), saved))
+
+
+def _format_bytes(num_bytes):
+    """Returns a number of bytes in human readable form."""
+
+    for unit in ['B', 'KB', 'MB']:
+        if num_bytes < 1024:
+            return '{:.1f}{}'.format(num_bytes, unit)
+        num_bytes /= 1024
+    return '{:.1f}GB'.format(num_bytes)
+
+
+if __name__ == '__main__':
+    main()
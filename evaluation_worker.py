@@ -0,0 +1,62 @@
+from src.simulation import run_evaluation_worker, start_evaluation_workers
+from src.distributed import parse_address
+import argparse
+
+
+def main():
+    """Simulates individuals for an evolution running with a broker on any host.
+
+    The command can be run from the command line, via
+
+    ``python evaluation_worker.py -b <host:port> -ak <secret>``
+
+    .. note:: The evolution has to be started with ``python simulate_evolution.py -b <host:port>``, which makes it hand
+              out individuals to all connected workers instead of only local ones (see
+              :func:`src.simulation.simulate_multi_core`). The secret is the one given to the evolution with ``-ak``
+              or the one it generated and printed. Workers may be started before or after the evolution and on as
+              many hosts as desired. Workers that are lost during a generation are replaced by the remaining ones.
+              All workers exit once the evolution is done.
+
+              .. code-block:: bash
+
+                usage: evaluation_worker.py [-h] -b BROKER -ak AUTHKEY [-c CORES]
+                                            [-ct CONNECT_TIMEOUT]
+
+                optional arguments:
+                  -h, --help            show this help message and exit
+                  -b BROKER, --broker BROKER
+                                        HOST:PORT of the broker
+                  -ak AUTHKEY, --authkey AUTHKEY
+                                        shared secret of broker and evaluation workers
+                  -c CORES, --cores CORES
+                                        number of worker processes (default=1)
+                  -ct CONNECT_TIMEOUT, --connect_timeout CONNECT_TIMEOUT
+                                        seconds to wait for the broker to start (default=60)
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-b', '--broker', required=True, type=str,
+                        help='HOST:PORT of the broker')
+
+    parser.add_argument('-ak', '--authkey', required=True, type=str,
+                        help='shared secret of broker and evaluation workers')
+
+    parser.add_argument('-c', '--cores', default=1, type=int,
+                        help='number of worker processes (default=1)')
+
+    parser.add_argument('-ct', '--connect_timeout', default=60., type=float,
+                        help='seconds to wait for the broker to start (default=60)')
+
+    args = parser.parse_args()
+    address = parse_address(args.broker)
+
+    if args.cores == 1:
+        run_evaluation_worker(address, args.authkey.encode(), connect_timeout=args.connect_timeout)
+    else:
+        for process in start_evaluation_workers(address, args.authkey.encode(), num_workers=args.cores,
+                                                connect_timeout=args.connect_timeout):
+            process.join()
+
+
+if __name__ == '__main__':
+    main()
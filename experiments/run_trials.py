@@ -0,0 +1,350 @@
+import numpy as np
+import argparse
+import threading
+import queue
+import traceback
+import time
+import os, sys, inspect
+sep = os.path.sep
+current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+from src.simulation import simulate_multi_core, make_worker_pool
+from src.screening import simulate_screened, initial_promote
+import src.evolution as evo
+import src.IO as IO
+from src.gene_pool import GenePool
+from src.cache import open_fitness_cache, close_fitness_cache
+from src.tracker_store import clear_tracker
+from src.checkpoint import start_checkpoint_writer, submit_checkpoint, close_checkpoint_writer
+from psutil import cpu_count
+
+# trials share the global random number generator, hence their random draws (selection and crossing) are serialized
+# and each trial keeps its own state in between
+_rng_lock = threading.Lock()
+
+
+def find_trials(experiment_folder, num_trials):
+    """Lists the trials of all experiments within a folder.
+
+    Each sub-directory holding an ``evo_config.json`` file is an experiment, directories starting with ``_`` are
+    skipped like in :func:`experiments.group_stats.read_group_stats`. Trials are the sub-directories ``1`` to
+    ``num_trials`` of each experiment.
+
+    Parameters
+    ----------
+    experiment_folder : str
+        Path to directory where all experiments are stored.
+    num_trials : int
+        Number of trials per experiment.
+
+    Returns
+    -------
+    trials : list
+        ``(trial_dir, evo_config, trial)`` for each trial, where trial is the number of the trial within its experiment.
+    """
+
+    trials = []
+    for experiment_sel in sorted(next(os.walk(experiment_folder))[1]):
+        experiment_dir = experiment_folder + sep + experiment_sel + sep
+        if experiment_sel[0] == '_' or not os.path.isfile(experiment_dir + 'evo_config.json'):
+            continue
+
+        evo_config = IO.read_evo_config(experiment_dir + 'evo_config.json')
+        trials += [(experiment_dir + str(trial) + sep, evo_config, trial) for trial in range(1, num_trials + 1)]
+    return trials
+
+
+def run_trial(trial_dir, evo_config, pool, args, seed=None):
+    """Evolves one trial, sharing the worker pool with other trials running in parallel threads.
+
+    The trial directory is laid out like one written by ``simulate_evolution.py -e <trial_dir>``. If it holds a
+    checkpoint, the trial continues from it and is skipped if it is complete, with ``-o`` the checkpoint is removed and
+    the trial starts from scratch. While this trial selects and crosses, the pool keeps simulating the individuals of
+    other trials.
+
+    Parameters
+    ----------
+    trial_dir : str
+        Evolution directory of the trial, created if missing.
+    evo_config : dict
+        Configuration file of the experiment. See :func:`src.IO.make_default_evo_config`.
+    pool : multiprocessing.pool.Pool
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool` without a configuration.
+    args : argparse.Namespace
+        Parsed arguments. See :func:`experiments.run_trials.main`.
+    seed : int | None
+        Seed of the random number generator for a new trial. If None, the trial is seeded randomly.
+    """
+
+    if not os.path.isdir(trial_dir):
+        os.mkdir(trial_dir)
+    generations = evo_config['simulation']['generations']
+
+    if args.overwrite:
+        IO.clear_checkpoint(trial_dir)
+    checkpoint = IO.load_checkpoint(trial_dir)
+    if checkpoint is not None and checkpoint['generation'] >= generations and os.path.isfile(trial_dir + 'stats.csv'):
+        print('{} | complete'.format(trial_dir))
+        return
+    IO.write_evo_config(evo_config, trial_dir + 'evo_config.json')
+
+    # initial gene pool, the random state of a checkpoint is restored afterwards
+    with _rng_lock:
+        if checkpoint is None:
+            np.random.seed(seed)
+            gene_pool = IO.new_gene_pool(None, evo_config)
+            stats, fitness_over_gen, cutoff, first_generation = [], [], None, 0
+        else:
+            if checkpoint['config_hash'] != IO.config_hash(evo_config):
+                print('Warning: the evolution configuration of {} changed since the checkpoint was written'.format(
+                    trial_dir))
+            gene_pool = IO.new_gene_pool(trial_dir + checkpoint['gene_pool_file'], evo_config)
+            stats = IO.load_stats(trial_dir + checkpoint['stats_file'])[:checkpoint['stats_rows']]
+            fitness_over_gen = IO.load_stats(trial_dir + checkpoint['fitness_file'])[:checkpoint['fitness_rows']]
+            np.random.set_state(checkpoint['rng_state'])
+            cutoff, first_generation = checkpoint['cutoff'], checkpoint['generation']
+        rng_state = np.random.get_state()
+
+    stats_log, fitness_log = trial_dir + 'stats.bin', trial_dir + 'fitness.bin'
+    IO.save_run_log(stats, filename=stats_log)
+    IO.save_run_log(fitness_over_gen, filename=fitness_log)
+    if not args.no_tracking:
+        clear_tracker(trial_dir + 'tracker' + sep, first_generation=first_generation)
+
+    # the fraction promoted by the screening continues from the screening log
+    screening_log, promote = trial_dir + 'screening.bin', None
+    if evo_config['simulation'].get('screening') is not None:
+        promote = initial_promote(evo_config, IO.trim_run_log(screening_log, first_generation))
+
+    precision = 'float64' if args.exact_gene_pool else 'float32'
+    writer = start_checkpoint_writer()
+    cache = None
+    if args.fitness_cache:
+        cache = open_fitness_cache(trial_dir + 'fitness_cache.sqlite', max_entries=args.cache_size)
+    try:
+        for generation in range(first_generation, generations):
+            start = time.time()
+
+            # batches of this trial queue up behind those of other trials
+            screening_stats = None
+            if promote is not None:
+                fitness, tracker, screening_stats = simulate_screened(gene_pool, evo_config, promote,
+                                                                      track_individuals=(not args.no_tracking),
+                                                                      pool=pool, batch_size=args.batch_size,
+                                                                      cache=cache, cutoff=cutoff)
+                promote = screening_stats[-1]
+                screening_stats = [generation] + screening_stats
+            else:
+                fitness, tracker = simulate_multi_core(gene_pool, evo_config, track_individuals=(not args.no_tracking),
+                                                       pool=pool, batch_size=args.batch_size, cache=cache,
+                                                       cutoff=cutoff)
+
+            with _rng_lock:
+                np.random.set_state(rng_state)
+                cutoff = evo.selection_cutoff(fitness)
+                sorted_genome_ids = np.argsort(fitness)[::-1]
+                selected = evo.selection(sorted_genome_ids)
+
+                avg_dist = np.mean(fitness)
+                best = sorted_genome_ids[0]
+                stats.append([generation, avg_dist, best, fitness[best]])
+                fitness_over_gen.append(fitness + [generation])
+
+                saved_gene_pool = gene_pool
+                if evo_config['evolution'].get('batch_crossing', False):
+                    gene_pool = evo.batch_crossing(selected, gene_pool, evo_config)
+                else:
+                    gene_pool = evo.crossing(selected, gene_pool, evo_config)
+                rng_state = np.random.get_state()
+
+            submit_checkpoint(writer, 'gen_' + str(generation), IO.save_generation, generation, trial_dir,
+                              stats[-1], fitness_over_gen[-1],
+                              tracker=None if args.no_tracking else tracker,
+                              gene_pool=saved_gene_pool if args.save_gene_pool else None,
+                              precision=precision, archive=args.archive_gene_pools,
+                              screening_stats=screening_stats)
+
+            if (generation + 1 - first_generation) % args.checkpoint_interval == 0 or generation == generations - 1:
+                submit_checkpoint(writer, 'checkpoint', IO.save_checkpoint, trial_dir, generation + 1,
+                                  GenePool.from_genomes(gene_pool), cutoff, rng_state,
+                                  IO.config_hash(evo_config), len(stats), len(fitness_over_gen))
+
+            print('{} | generation {} | avg distance {} | duration {}s'.format(trial_dir, generation, avg_dist,
+                                                                               round(time.time() - start)))
+    finally:
+        close_checkpoint_writer(writer)
+        if cache is not None:
+            close_fitness_cache(cache)
+
+    IO.export_run_log(stats_log, csv_filename=trial_dir + 'stats.csv')
+    IO.export_run_log(fitness_log, csv_filename=trial_dir + 'fitness.csv')
+    if promote is not None:
+        IO.export_run_log(screening_log, csv_filename=trial_dir + 'screening.csv')
+    IO.save_gene_pool(gene_pool, filename=trial_dir + 'gen_' + str(generations - 1) + (
+        '.gpr' if args.archive_gene_pools else '.gp'), precision=precision)
+
+
+def main():
+    """Runs all trials of all experiments in one process sharing one worker pool.
+
+    To run this function use the command line and type:
+
+    ``python experiments/run_trials.py``
+
+    .. note:: Instead of one process per trial (see ``experiments/run_experiments.sh``), each paying for its own start
+              up and worker pool, several trials are evolved in parallel threads. Their batches of individuals queue up
+              in one pool of persistent workers, such that the workers keep simulating other trials while a trial
+              selects, crosses and writes its generation. Each trial directory is laid out like one written by
+              ``simulate_evolution.py -e <trial_dir>``, hence results are read with
+              :func:`experiments.group_stats.read_group_stats`. Interrupted trials continue from their latest
+              checkpoint, complete trials are skipped. If seeded, trial t of every experiment equals
+              ``simulate_evolution.py -rs <RANDOM_SEED + t>``.
+
+              .. code-block:: bash
+
+                usage: run_trials.py [-h] [-t TRIALS] [-pt PARALLEL_TRIALS] [-c CORES]
+                                     [-bs BATCH_SIZE] [-nt] [-s] [-eg] [-a] [-fc]
+                                     [-cs CACHE_SIZE] [-ci CHECKPOINT_INTERVAL]
+                                     [-rs RANDOM_SEED] [-o]
+                                     [experiment_folder]
+
+                positional arguments:
+                  experiment_folder     directory holding one sub-directory with an
+                                        evo_config.json file per experiment
+                                        (default=experiments)
+
+                optional arguments:
+                  -h, --help            show this help message and exit
+                  -t TRIALS, --trials TRIALS
+                                        number of trials per experiment (default=30)
+                  -pt PARALLEL_TRIALS, --parallel_trials PARALLEL_TRIALS
+                                        number of trials evolved at the same time - More
+                                        trials keep the workers busy while trials cross,
+                                        but need more memory (default=4)
+                  -c CORES, --cores CORES
+                                        number of CPU cores shared by all trials - Set to -1
+                                        for all cores (default=-1)
+                  -bs BATCH_SIZE, --batch_size BATCH_SIZE
+                                        number of individuals simulated together in one
+                                        physics server (default=1)
+                  -nt, --no_tracking    disable tracker for individuals
+                  -s, --save_gene_pool  save the gene pools of all generations
+                  -eg, --exact_gene_pool
+                                        store gene pools with float64 instead of float32
+                                        precision
+                  -a, --archive_gene_pools
+                                        store gene pools as deltas against the previous
+                                        generation in a shared pack file
+                  -fc, --fitness_cache  look up genomes simulated before in a fitness cache
+                                        per trial - Pays off for continued or repeated
+                                        trials of deterministic simulations
+                  -cs CACHE_SIZE, --cache_size CACHE_SIZE
+                                        maximum number of genomes in the fitness cache of
+                                        each trial (default=10000)
+                  -ci CHECKPOINT_INTERVAL, --checkpoint_interval CHECKPOINT_INTERVAL
+                                        number of generations between two checkpoints
+                                        (default=1)
+                  -rs RANDOM_SEED, --random_seed RANDOM_SEED
+                                        seed trial t of each experiment with RANDOM_SEED + t
+                  -o, --overwrite       start all trials from scratch
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('experiment_folder', nargs='?', default=current_dir,
+                        help='directory holding one sub-directory with an evo_config.json file per experiment '
+                             '(default=experiments)')
+
+    parser.add_argument('-t', '--trials', default=30, type=int,
+                        help='number of trials per experiment (default=30)')
+
+    parser.add_argument('-pt', '--parallel_trials', default=4, type=int,
+                        help='number of trials evolved at the same time - More trials keep the workers busy while '
+                             'trials cross, but need more memory (default=4)')
+
+    parser.add_argument('-c', '--cores', default=-1, type=int,
+                        help='number of CPU cores shared by all trials - Set to -1 for all cores (default=-1)')
+
+    parser.add_argument('-bs', '--batch_size', default=1, type=int,
+                        help='number of individuals simulated together in one physics server (default=1)')
+
+    parser.add_argument('-nt', '--no_tracking', action='store_true',
+                        help='disable tracker for individuals')
+
+    parser.add_argument('-s', '--save_gene_pool', action='store_true',
+                        help='save the gene pools of all generations')
+
+    parser.add_argument('-eg', '--exact_gene_pool', action='store_true',
+                        help='store gene pools with float64 instead of float32 precision')
+
+    parser.add_argument('-a', '--archive_gene_pools', action='store_true',
+                        help='store gene pools as deltas against the previous generation in a shared pack file')
+
+    parser.add_argument('-fc', '--fitness_cache', action='store_true',
+                        help='look up genomes simulated before in a fitness cache per trial - Pays off for continued '
+                             'or repeated trials of deterministic simulations')
+
+    parser.add_argument('-cs', '--cache_size', default=10000, type=int,
+                        help='maximum number of genomes in the fitness cache of each trial (default=10000)')
+
+    parser.add_argument('-ci', '--checkpoint_interval', default=1, type=int,
+                        help='number of generations between two checkpoints (default=1)')
+
+    parser.add_argument('-rs', '--random_seed', default=None, type=int,
+                        help='seed trial t of each experiment with RANDOM_SEED + t')
+
+    parser.add_argument('-o', '--overwrite', action='store_true',
+                        help='start all trials from scratch')
+
+    args = parser.parse_args()
+    if args.cores == -1:
+        args.cores = cpu_count(logical=False)
+
+    trials = find_trials(args.experiment_folder, args.trials)
+    print('trials {} | parallel trials {} | cores {}'.format(len(trials), args.parallel_trials, args.cores))
+
+    # trials are handed out to a fixed number of threads, all of them feeding the same pool
+    pending = queue.Queue()
+    for trial_dir, evo_config, trial in trials:
+        pending.put((trial_dir, evo_config, None if args.random_seed is None else args.random_seed + trial))
+    failed = []
+
+    def evolve_trials():
+        while True:
+            try:
+                trial_dir, evo_config, seed = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                run_trial(trial_dir, evo_config, pool, args, seed=seed)
+            except Exception:
+                failed.append(trial_dir)
+                print('{} | failed\n{}'.format(trial_dir, traceback.format_exc()))
+
+    # workers receive the configuration of each trial along with its batches
+    pool = make_worker_pool(None, num_cores=args.cores)
+    try:
+        threads = [threading.Thread(target=evolve_trials, daemon=True)
+                   for _ in range(min(args.parallel_trials, len(trials)))]
+        for thread in threads:
+            thread.start()
+
+        # join with a timeout, such that Ctrl-C reaches the main thread
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+    except BaseException:
+        # e.g. Ctrl-C - stop workers immediately, interrupted trials continue from their checkpoint next time
+        pool.terminate()
+        raise
+    finally:
+        pool.close()
+        pool.join()
+
+    print('done. trials {} | failed {}'.format(len(trials), len(failed)))
+    for trial_dir in failed:
+        print('failed: {}'.format(trial_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,19 @@
-from src.simulation import simulate_multi_core
+from src.simulation import simulate_multi_core, make_worker_pool, start_evaluation_workers
 import src.evolution as evo
 import src.visualize as vis
 import src.IO as IO
+from src.gene_pool import GenePool
+from src.cache import open_fitness_cache, close_fitness_cache
+from src.steady_state import steady_state
+from src.islands import start_islands, island_generations, close_islands, TOPOLOGIES
+from src.screening import simulate_screened, initial_promote
+from src.tracker_store import clear_tracker, migrate_tracker
+from src.checkpoint import start_checkpoint_writer, submit_checkpoint, checkpoint_status, close_checkpoint_writer
+from src.distributed import start_broker, close_broker, num_workers, parse_address, is_loopback
 import argparse
 import numpy as np
 import time
+import os
 
 
 def main():
@@ -23,8 +32,14 @@ def main():
 
                 usage: simulate_evolution.py [-h] [-i INDIVIDUALS] [-g GENERATIONS]
                                      [-d DURATION] [-gc] [-e EVOLUTION_DIR]
-                                     [-gen GENERATION] [-nt] [-s] [-o] [-c CORES] [-v]
-                                     [-f] [-sd SLOW_DOWN_FACTOR] [-nb] [-ss]
+                                     [-gen GENERATION] [-nt] [-s] [-eg] [-a] [-o]
+                                     [-c CORES] [-bs BATCH_SIZE] [-b BROKER]
+                                     [-ak AUTHKEY] [-st] [-is ISLANDS]
+                                     [-mi MIGRATION_INTERVAL] [-mg MIGRANTS]
+                                     [-tp {ring,random}] [-fc] [-cs CACHE_SIZE]
+                                     [-cq CHECKPOINT_QUEUE] [-ci CHECKPOINT_INTERVAL]
+                                     [-rs RANDOM_SEED] [-v] [-f]
+                                     [-sd SLOW_DOWN_FACTOR] [-nb] [-ss]
 
                 optional arguments:
                   -h, --help            show this help message and exit
@@ -47,10 +62,63 @@ def main():
                                         - Set -1 for latest (default=-1)
                   -nt, --no_tracking    disable tracker for individuals
                   -s, --save_gene_pool  Save all gene pools per generation to new folder
+                  -eg, --exact_gene_pool
+                                        store gene pools with float64 instead of float32
+                                        precision - Use to continue evolutions exactly
+                  -a, --archive_gene_pools
+                                        store gene pools as deltas against the previous
+                                        generation in a shared pack file - Use with -s to
+                                        save disk space
                   -o, --overwrite       overwrite existing data
                   -c CORES, --cores CORES
                                         number of CPU cores for simulating one generation -
                                         Set to -1 for all cores (default=-1)
+                  -bs BATCH_SIZE, --batch_size BATCH_SIZE
+                                        number of individuals simulated together in one
+                                        physics server - Workers pull batches of this size
+                                        until all individuals are simulated (default=1)
+                  -b BROKER, --broker BROKER
+                                        HOST:PORT to listen on for evaluation workers started
+                                        with evaluation_worker.py - Individuals are simulated
+                                        by these workers and -c additional local workers. The
+                                        host defaults to 127.0.0.1, use 0.0.0.0 to accept
+                                        workers on other hosts
+                  -ak AUTHKEY, --authkey AUTHKEY
+                                        shared secret of broker and evaluation workers - If
+                                        not set, a random secret is generated and printed
+                  -st, --steady_state   breed and simulate children continuously instead of
+                                        whole generations - Statistics are reported per n
+                                        simulations
+                  -is ISLANDS, --islands ISLANDS
+                                        number of islands, each evolved by its own process on
+                                        its share of the individuals - Only migrants are
+                                        exchanged between islands, -c is ignored (default=0)
+                  -mi MIGRATION_INTERVAL, --migration_interval MIGRATION_INTERVAL
+                                        number of generations between two migrations of
+                                        islands (default=5)
+                  -mg MIGRANTS, --migrants MIGRANTS
+                                        number of best individuals each island sends to
+                                        another island per migration (default=2)
+                  -tp {ring,random}, --topology {ring,random}
+                                        islands send migrants to the next island (ring) or a
+                                        random one (default=ring)
+                  -fc, --fitness_cache  look up genomes simulated before in a fitness cache -
+                                        Pays off for continued or repeated evolutions of
+                                        deterministic simulations
+                  -cs CACHE_SIZE, --cache_size CACHE_SIZE
+                                        maximum number of genomes in the fitness cache
+                                        (default=10000)
+                  -cq CHECKPOINT_QUEUE, --checkpoint_queue CHECKPOINT_QUEUE
+                                        maximum number of generations waiting to be written to
+                                        disk in the background - The evolution waits if more
+                                        are pending (default=2)
+                  -ci CHECKPOINT_INTERVAL, --checkpoint_interval CHECKPOINT_INTERVAL
+                                        number of generations between two checkpoints an
+                                        interrupted evolution is continued from exactly
+                                        (default=1)
+                  -rs RANDOM_SEED, --random_seed RANDOM_SEED
+                                        seed for the random number generator to reproduce an
+                                        evolution
                   -v, --visualize       visualize results - specify evolution directory with
                                         the help of -e
                   -f, --follow_target   whether to follow the target with the GUI camera
@@ -94,12 +162,69 @@ def main():
     parser.add_argument('-s', '--save_gene_pool', action='store_true',
                         help='Save all gene pools per generation to new folder')
 
+    parser.add_argument('-eg', '--exact_gene_pool', action='store_true',
+                        help='store gene pools with float64 instead of float32 precision - Use to continue evolutions '
+                             'exactly')
+
+    parser.add_argument('-a', '--archive_gene_pools', action='store_true',
+                        help='store gene pools as deltas against the previous generation in a shared pack file - Use '
+                             'with -s to save disk space')
+
     parser.add_argument('-o', '--overwrite', action='store_true',
                         help='overwrite existing data')
 
     parser.add_argument('-c', '--cores', default=-1, type=int,
                         help='number of CPU cores for simulating one generation - Set to -1 for all cores (default=-1)')
 
+    parser.add_argument('-bs', '--batch_size', default=1, type=int,
+                        help='number of individuals simulated together in one physics server - Workers pull batches '
+                             'of this size until all individuals are simulated (default=1)')
+
+    parser.add_argument('-b', '--broker', default=None, type=str,
+                        help='HOST:PORT to listen on for evaluation workers started with evaluation_worker.py - '
+                             'Individuals are simulated by these workers and -c additional local workers. The host '
+                             'defaults to 127.0.0.1, use 0.0.0.0 to accept workers on other hosts')
+
+    parser.add_argument('-ak', '--authkey', default=None, type=str,
+                        help='shared secret of broker and evaluation workers - If not set, a random secret is '
+                             'generated and printed')
+
+    parser.add_argument('-st', '--steady_state', action='store_true',
+                        help='breed and simulate children continuously instead of whole generations - Statistics are '
+                             'reported per n simulations')
+
+    parser.add_argument('-is', '--islands', default=0, type=int,
+                        help='number of islands, each evolved by its own process on its share of the individuals - '
+                             'Only migrants are exchanged between islands, -c is ignored (default=0)')
+
+    parser.add_argument('-mi', '--migration_interval', default=5, type=int,
+                        help='number of generations between two migrations of islands (default=5)')
+
+    parser.add_argument('-mg', '--migrants', default=2, type=int,
+                        help='number of best individuals each island sends to another island per migration '
+                             '(default=2)')
+
+    parser.add_argument('-tp', '--topology', default='ring', choices=TOPOLOGIES,
+                        help='islands send migrants to the next island (ring) or a random one (default=ring)')
+
+    parser.add_argument('-fc', '--fitness_cache', action='store_true',
+                        help='look up genomes simulated before in a fitness cache - Pays off for continued or '
+                             'repeated evolutions of deterministic simulations')
+
+    parser.add_argument('-cs', '--cache_size', default=10000, type=int,
+                        help='maximum number of genomes in the fitness cache (default=10000)')
+
+    parser.add_argument('-cq', '--checkpoint_queue', default=2, type=int,
+                        help='maximum number of generations waiting to be written to disk in the background - The '
+                             'evolution waits if more are pending (default=2)')
+
+    parser.add_argument('-ci', '--checkpoint_interval', default=1, type=int,
+                        help='number of generations between two checkpoints an interrupted evolution is continued from '
+                             'exactly (default=1)')
+
+    parser.add_argument('-rs', '--random_seed', default=None, type=int,
+                        help='seed for the random number generator to reproduce an evolution')
+
     parser.add_argument('-v', '--visualize', action='store_true',
                         help='visualize results - specify evolution directory with the help of -e')
 
@@ -118,6 +243,14 @@ def main():
 
     # convert certain arguments
     args, evo_config = IO.convert_some_args(parser.parse_args())
+    if args.steady_state and args.broker is not None:
+        parser.error('-st cannot be combined with -b')
+    if args.islands > 0 and (args.steady_state or args.broker is not None):
+        parser.error('-is cannot be combined with -st or -b')
+
+    # seed before the initial gene pool is created, a checkpoint restores the state it was written with instead
+    if args.random_seed is not None:
+        np.random.seed(args.random_seed)
 
     # initialize simulation
     gene_pool, evo_config, stats, fitness_over_gen, tracker_over_gen, parent_dir = IO.get_from_config(args, evo_config)
@@ -128,6 +261,9 @@ def main():
     if args.get_config:
         raise SystemExit
 
+    if args.islands > 0 and evo_config['simulation']['individuals'] < 4 * args.islands:
+        parser.error('-is requires at least 4 individuals per island')
+
     if not args.visualize:
 
         # print summary
@@ -138,59 +274,237 @@ def main():
         print('Generations: {}'.format(evo_config['simulation']['generations']))
         print('Duration per simulation: {}s'.format(evo_config['simulation']['duration']))
         print('FPS: {}'.format(evo_config['simulation']['fps']))
-        print('Number of cores utilized: {}'.format(args.cores))
+        print('Number of cores utilized: {}'.format(args.islands if args.islands > 0 else args.cores))
+        if args.islands > 0:
+            print('Islands: {} | migrants {} every {} generations | topology {}'.format(
+                args.islands, args.migrants, args.migration_interval, args.topology))
         print('saving output to ' + parent_dir)
         print('')
 
-        # iterate over generations
-        for generation in range(args.generation, args.generations + args.generation):
-            start = time.time()
-
-            # obtain fitness for each individual in current generation
-            fitness, tracker = simulate_multi_core(gene_pool,
-                                                   evo_config,
-                                                   track_individuals=(not args.no_tracking),
-                                                   num_cores=args.cores)
-
-            # sort fitness descending
-            sorted_genome_ids = np.argsort(fitness)[::-1]  # from:to:instepsof
-            # select best performers and transform into parent pairs
-            selected = evo.selection(sorted_genome_ids)
-
-            # collect data on population
-            avg_dist = np.mean(fitness)
-            best = sorted_genome_ids[0]
-
-            stats.append([generation, avg_dist, best, fitness[best]])
-            fitness_over_gen.append(fitness + [generation])
-            if not args.no_tracking:
-                tracker_over_gen.append(tracker)
-
-            # if desired save state of current gene pool
-            if args.save_gene_pool:
-                IO.save_gene_pool(gene_pool, filename=parent_dir + 'gen_' + str(generation) + '.pkl')
-
-                # to make sure files are present even if the evolution was interrupted
-                IO.save_stats(stats, filename=parent_dir + 'stats.csv')
-                IO.save_stats(fitness_over_gen, filename=parent_dir + 'fitness.csv')
-                if not args.no_tracking:
-                    IO.save_tracker(tracker_over_gen, filename=parent_dir + 'tracker.pkl')
-
-            # create new gene pool by pairing selected parents
-            gene_pool = evo.crossing(selected, gene_pool, evo_config)
-
-            # print status
-            print('individuals {} | generation {} | avg distance {} | duration {}s'.format(len(gene_pool), generation,
-                                                                                           avg_dist,
-                                                                                           round(time.time() - start)))
-
-        # save statistics, fitness and position data and gene pool
-        IO.save_stats(stats, filename=parent_dir + 'stats.csv')
-        IO.save_stats(fitness_over_gen, filename=parent_dir + 'fitness.csv')
+        # genomes that were simulated before are looked up instead
+        cache = None
+        if args.fitness_cache and args.islands == 0:
+            cache = open_fitness_cache(parent_dir + 'fitness_cache.sqlite', max_entries=args.cache_size)
+
+        # start worker processes once, they are reused for all generations. With a broker, workers on any host
+        # connect to it, local workers are started as well. Islands start their own processes below
+        pool, broker, workers = None, None, []
+        if args.broker is not None:
+            broker = start_broker(evo_config, address=parse_address(args.broker),
+                                  authkey=None if args.authkey is None else args.authkey.encode())
+            workers = start_evaluation_workers(broker['address'], broker['authkey'], num_workers=args.cores)
+            print('broker listening on {}:{}'.format(*broker['address']))
+
+            # workers on other hosts have to be told the generated secret
+            if args.authkey is None and not is_loopback(broker['address'][0]):
+                print('evaluation workers authenticate with -ak {}'.format(broker['authkey'].decode()))
+        elif args.islands == 0:
+            pool = make_worker_pool(evo_config, num_cores=args.cores)
+
+        # statistics and fitness are appended to run logs once per generation instead of rewriting the whole history
+        stats_log, fitness_log = parent_dir + 'stats.bin', parent_dir + 'fitness.bin'
+        IO.save_run_log(stats, filename=stats_log)
+        IO.save_run_log(fitness_over_gen, filename=fitness_log)
+
+        # islands log their own statistics alongside, generations simulated again are replaced
+        island_log = parent_dir + 'island_stats.bin'
+        if args.islands > 0:
+            IO.trim_run_log(island_log, 0 if args.overwrite else args.generation)
+
+        # with screening configured, individuals are screened cheaply and only the best are simulated fully. The
+        # fraction promoted adapts to the rank correlation of both stages and continues from the screening log
+        screening_log, promote = parent_dir + 'screening.bin', None
+        if evo_config['simulation'].get('screening') is not None:
+            if args.islands > 0 or args.steady_state:
+                print('Screening is only used for generational evolutions without -is or -st.')
+            else:
+                promote = initial_promote(evo_config,
+                                          IO.trim_run_log(screening_log, 0 if args.overwrite else args.generation))
+
+        # paths are written to a tracker store one generation at a time, generations simulated again are replaced
+        tracker_dir = parent_dir + 'tracker' + IO.sep
         if not args.no_tracking:
-            IO.save_tracker(tracker_over_gen, filename=parent_dir + 'tracker.pkl')
-        IO.save_gene_pool(gene_pool, filename=parent_dir + 'gen_' + str(
-            args.generations + args.generation - 1) + '.pkl')
+            if os.path.isfile(parent_dir + 'tracker.pkl') and not os.path.isdir(tracker_dir) and not args.overwrite:
+                migrate_tracker(parent_dir + 'tracker.pkl', tracker_dir)
+            clear_tracker(tracker_dir, first_generation=args.generation)
+
+        # checkpoints are written in the background while the next generation is simulated, a new evolution must not
+        # be continued from the checkpoint of the one it overwrites
+        if args.overwrite:
+            IO.clear_checkpoint(parent_dir)
+        writer = start_checkpoint_writer(max_queue=args.checkpoint_queue)
+
+        # fitness needed to be selected in the previous generation, used to stop hopeless individuals early
+        cutoff = None
+
+        # continue exactly where the checkpoint was written
+        if args.checkpoint is not None:
+            print('Continuing from checkpoint of generation {}'.format(args.checkpoint['generation']))
+            if args.checkpoint['config_hash'] != IO.config_hash(evo_config):
+                print('Warning: the evolution configuration changed since the checkpoint was written, the evolution '
+                      'will differ from an uninterrupted one.')
+            np.random.set_state(args.checkpoint['rng_state'])
+            cutoff = args.checkpoint['cutoff']
+
+            # islands store one cutoff each
+            if isinstance(cutoff, list) and args.islands == 0:
+                cutoff = None
+
+        # in steady state mode children are bred and simulated one by one, a few more than workers are kept pending
+        virtual_generations = None
+        if args.steady_state:
+            virtual_generations = steady_state(gene_pool, evo_config, pool, args.generations,
+                                               track_individuals=(not args.no_tracking), max_pending=2 * args.cores,
+                                               cutoff=cutoff)
+
+        # in island mode each island process evolves its share of the individuals, the population is only gathered at
+        # the end of each epoch
+        islands, island_epochs = None, None
+        if args.islands > 0:
+            islands = start_islands(gene_pool, evo_config, args.islands, track_individuals=(not args.no_tracking),
+                                    batch_size=args.batch_size, send_gene_pools=args.save_gene_pool)
+            island_epochs = island_generations(islands, args.generations, migration_interval=args.migration_interval,
+                                               num_migrants=args.migrants, topology=args.topology, cutoff=cutoff,
+                                               first_generation=args.generation)
+        checkpoint_generation = args.generation
+        try:
+            # iterate over generations
+            for generation in range(args.generation, args.generations + args.generation):
+                start = time.time()
+
+                island_stats, population, screening_stats = None, None, None
+                if island_epochs is not None:
+                    # islands report the generations of an epoch at its end, when their populations are gathered too
+                    evaluated, fitness, tracker, island_stats, population, cutoffs = next(island_epochs)
+                    if population is not None:
+                        cutoff = cutoffs
+                elif virtual_generations is not None:
+                    # the n individuals simulated last form a generation, the population keeps evolving meanwhile
+                    evaluated, fitness, tracker, population, cutoff = next(virtual_generations)
+                elif promote is not None:
+                    # screen all individuals, the best of them are simulated fully
+                    evaluated = gene_pool
+                    fitness, tracker, screening_stats = simulate_screened(gene_pool, evo_config, promote,
+                                                                          track_individuals=(not args.no_tracking),
+                                                                          num_cores=args.cores, pool=pool,
+                                                                          batch_size=args.batch_size, cache=cache,
+                                                                          cutoff=cutoff, broker=broker)
+                    promote = screening_stats[-1]
+                    screening_stats = [generation] + screening_stats
+                    cutoff = evo.selection_cutoff(fitness)
+                else:
+                    # obtain fitness for each individual in current generation
+                    evaluated = gene_pool
+                    fitness, tracker = simulate_multi_core(gene_pool,
+                                                           evo_config,
+                                                           track_individuals=(not args.no_tracking),
+                                                           num_cores=args.cores,
+                                                           pool=pool,
+                                                           batch_size=args.batch_size,
+                                                           cache=cache,
+                                                           cutoff=cutoff,
+                                                           broker=broker)
+                    cutoff = evo.selection_cutoff(fitness)
+
+                # sort fitness descending
+                sorted_genome_ids = np.argsort(fitness)[::-1]  # from:to:instepsof
+
+                # collect data on population
+                avg_dist = np.mean(fitness)
+                best = sorted_genome_ids[0]
+
+                stats.append([generation, avg_dist, best, fitness[best]])
+                fitness_over_gen.append(fitness + [generation])
+
+                # hand over data of this generation, the gene pool is not modified anymore since crossing creates a new
+                # one. If desired save state of current gene pool as well
+                submit_checkpoint(writer, 'gen_' + str(generation), IO.save_generation, generation, parent_dir,
+                                  stats[-1], fitness_over_gen[-1],
+                                  tracker=None if args.no_tracking else tracker,
+                                  gene_pool=evaluated if args.save_gene_pool else None,
+                                  precision='float64' if args.exact_gene_pool else 'float32',
+                                  archive=args.archive_gene_pools,
+                                  island_stats=island_stats,
+                                  screening_stats=screening_stats)
+
+                if island_epochs is not None:
+                    # the gathered islands are continued from and saved at the end
+                    if population is not None:
+                        gene_pool = population
+                elif virtual_generations is not None:
+                    # the population is continued from and saved at the end
+                    gene_pool = population
+                else:
+                    # select best performers and transform into parent pairs
+                    selected = evo.selection(sorted_genome_ids)
+
+                    # create new gene pool by pairing selected parents
+                    if evo_config['evolution'].get('batch_crossing', False):
+                        gene_pool = evo.batch_crossing(selected, gene_pool, evo_config)
+                    else:
+                        gene_pool = evo.crossing(selected, gene_pool, evo_config)
+
+                # write the full state to continue from after the data of this generation was written, islands can
+                # only be continued from the end of an epoch
+                if (island_epochs is None or population is not None) and \
+                        (generation + 1 - checkpoint_generation >= args.checkpoint_interval or
+                         generation == args.generations + args.generation - 1):
+                    submit_checkpoint(writer, 'checkpoint', IO.save_checkpoint, parent_dir, generation + 1,
+                                      GenePool.from_genomes(gene_pool), cutoff, np.random.get_state(),
+                                      IO.config_hash(evo_config), len(stats), len(fitness_over_gen))
+                    checkpoint_generation = generation + 1
+
+                # print status
+                depth, last_latency = checkpoint_status(writer)
+                last_checkpoint = 'none' if last_latency is None else '{} {:.2f}s'.format(*last_latency)
+                status_details = '' if broker is None else ' | workers {}'.format(num_workers(broker))
+                if screening_stats is not None:
+                    status_details += ' | promoted {} | rank correlation {:.2f}'.format(int(screening_stats[3]),
+                                                                                       screening_stats[1])
+                print('individuals {} | generation {} | avg distance {} | duration {}s | checkpoint queue {} | '
+                      'last checkpoint {}{}'.format(len(gene_pool), generation, avg_dist, round(time.time() - start),
+                                                    depth, last_checkpoint, status_details))
+        except BaseException:
+            # e.g. Ctrl-C - stop workers immediately
+            if pool is not None:
+                pool.terminate()
+            if islands is not None:
+                close_islands(islands, terminate=True)
+                islands = None
+            for process in workers:
+                process.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if islands is not None:
+                close_islands(islands)
+
+            # remote workers are asked to exit, local workers exit as well
+            if broker is not None:
+                close_broker(broker)
+            for process in workers:
+                process.join()
+
+            # make sure all checkpoints are on disk before exiting
+            latencies = [latency for _, latency in close_checkpoint_writer(writer)]
+            if len(latencies) > 0:
+                print('checkpoints {} | avg write {:.2f}s | max write {:.2f}s'.format(
+                    len(latencies), np.mean(latencies), np.max(latencies)))
+            if cache is not None:
+                print('fitness cache hits {} | misses {}'.format(cache['hits'], cache['misses']))
+                close_fitness_cache(cache)
+
+        # export statistics and fitness to csv files and save gene pool
+        IO.export_run_log(stats_log, csv_filename=parent_dir + 'stats.csv')
+        IO.export_run_log(fitness_log, csv_filename=parent_dir + 'fitness.csv')
+        if args.islands > 0:
+            IO.export_run_log(island_log, csv_filename=parent_dir + 'island_stats.csv')
+        if promote is not None:
+            IO.export_run_log(screening_log, csv_filename=parent_dir + 'screening.csv')
+        IO.save_gene_pool(gene_pool, filename=parent_dir + 'gen_' + str(args.generations + args.generation - 1) + (
+            '.gpr' if args.archive_gene_pools else '.gp'), precision='float64' if args.exact_gene_pool else 'float32')
 
         print('done.')
         print('')
@@ -199,7 +513,7 @@ def main():
 
         if not args.show_stats:
             # show desired simulation
-            pop, sim_id, tracker = vis.show_individual(gene_pool, evo_config, args)
+            pop, sim_id, tracker, _ = vis.show_individual(gene_pool, evo_config, args)
 
             # show tracked paths
             vis.show_path(tracker)
@@ -3,10 +3,29 @@ from datetime import datetime
 import pickle
 import numpy as np
 from src.evolution import _make_random_gene_pool
+from src.gene_pool import GenePool
+from src.tracker_store import TrackerStore, append_tracker
+from src.gene_pool_file import save_gene_pool_file, load_gene_pool_file, gene_pool_file_size, \
+    gene_pool_file_precision, is_gene_pool_file
+from src.gene_pool_archive import save_archived_gene_pool, load_archived_gene_pool, archived_gene_pool_size, \
+    is_archived_gene_pool, PACK_FILE
+from src.checkpoint import atomic_write
 from psutil import cpu_count
+import hashlib
 import json
 sep = os.path.sep
 
+# binary run logs start with this magic followed by the number of values per record as uint64
+RUN_LOG_MAGIC = b'LPRUNLOG'
+RUN_LOG_HEADER_SIZE = len(RUN_LOG_MAGIC) + 8
+RUN_LOG_DTYPE = '<f8'
+
+# gene pool files in the order they are preferred if several exist for one generation
+GENE_POOL_EXTENSIONS = ('.gp', '.gpr', '.pkl')
+
+# manifest of the latest checkpoint within an evolution directory
+CHECKPOINT_FILE = 'checkpoint.json'
+
 
 def convert_some_args(args):
     """Converts arguments from argument parser.
@@ -75,14 +94,22 @@ def convert_some_args(args):
         evo_config['simulation']['duration'] = args.duration
 
     # define result paths
-    args.stats = parent_dir + 'stats.csv'
-    args.fitness = parent_dir + 'fitness.csv'
-    args.tracker = parent_dir + 'tracker.pkl'
+    args.stats = _stats_file(parent_dir, 'stats')
+    args.fitness = _stats_file(parent_dir, 'fitness')
+    args.tracker = _tracker_file(parent_dir)
+
+    # continue an evolution from its latest checkpoint, if any, instead of searching for the latest generation
+    args.checkpoint = None
+    if not args.overwrite and not args.visualize and args.generation == -1:
+        args.checkpoint = load_checkpoint(parent_dir)
 
     # if parent dir empty or overwrite initialize new evolution
     if len(os.listdir(parent_dir)) == 0 or args.overwrite:
         args.gene_pool_file = None
         args.generation = 0
+    elif args.checkpoint is not None:
+        args.gene_pool_file = parent_dir + args.checkpoint['gene_pool_file']
+        args.generation = args.checkpoint['generation']
     else:
 
         # if desired find last generation
@@ -90,23 +117,40 @@ def convert_some_args(args):
             # if no generation file present initialize new evolution
             if any(['gen_' in f for f in os.listdir(parent_dir)]):
                 args.generation = find_latest_gen(parent_dir)
-                args.gene_pool_file = parent_dir + 'gen_' + str(args.generation) + '.pkl'
+                args.gene_pool_file = gene_pool_filename(parent_dir, args.generation)
             else:
                 args.gene_pool_file = None
                 args.generation = 0
 
         # otherwise take generation specified
         else:
-            args.gene_pool_file = parent_dir + 'gen_' + str(args.generation) + '.pkl'
+            args.gene_pool_file = gene_pool_filename(parent_dir, args.generation)
 
-    # make sure evolution continues at correct generation
+    # make sure evolution continues at correct generation, a checkpoint holds the gene pool of the next generation
     if args.generation > 0 and not args.visualize:
-        args.generation += 1
+        if args.checkpoint is None:
+            args.generation += 1
         evo_config['simulation']['generations'] = args.generation + args.generations
 
     return args, evo_config
 
 
+def _stats_file(parent_dir, name):
+    """Returns the run log of an evolution if present, the csv file of older evolutions otherwise."""
+
+    if os.path.isfile(parent_dir + name + '.bin'):
+        return parent_dir + name + '.bin'
+    return parent_dir + name + '.csv'
+
+
+def _tracker_file(parent_dir):
+    """Returns the tracker store of an evolution if present, the tracker file of older evolutions otherwise."""
+
+    if os.path.isdir(parent_dir + 'tracker'):
+        return parent_dir + 'tracker' + sep
+    return parent_dir + 'tracker.pkl'
+
+
 def get_from_config(args, evo_config):
     """Output pre-processed data from arguments and evolution configuration.
 
@@ -119,8 +163,9 @@ def get_from_config(args, evo_config):
 
     Returns
     -------
-    gene_pool : list
-        List of genomes for all individuals. Created using :func:`src.new_gene_pool`.
+    gene_pool : GenePool | list
+        Genomes for all individuals. Created using :func:`src.IO.new_gene_pool`. In visualization mode a list of the
+        selected genomes.
     evo_config : dict
         Modified evolution configuration.
     stats : list
@@ -132,11 +177,15 @@ def get_from_config(args, evo_config):
     parent_dir : str
         Current working directory of the simulation (evolution directory).
     """
-    # get initial data from parsed arguments
-    gene_pool = new_gene_pool(args.gene_pool_file, evo_config)
+    # get initial data from parsed arguments, in visualization mode only the displayed individuals are loaded below
+    if args.visualize and isinstance(args.gene_pool_file, str):
+        gene_pool = None
+        evo_config['simulation']['individuals'] = gene_pool_size(args.gene_pool_file)
+    else:
+        gene_pool = new_gene_pool(args.gene_pool_file, evo_config)
 
-    # in case a previous gene pool was loaded, we have to assure proper number of individuals parsing
-    evo_config['simulation']['individuals'] = len(gene_pool)
+        # in case a previous gene pool was loaded, we have to assure proper number of individuals parsing
+        evo_config['simulation']['individuals'] = len(gene_pool)
 
     if args.overwrite:
         stats = []
@@ -156,6 +205,11 @@ def get_from_config(args, evo_config):
             fitness = []
             tracker = []
 
+        # discard generations recorded after the checkpoint, they are simulated again
+        if args.checkpoint is not None:
+            stats = stats[:args.checkpoint['stats_rows']]
+            fitness = fitness[:args.checkpoint['fitness_rows']]
+
     # if not results to display were found warn and exit program
     if args.visualize:
         if args.show_stats and (len(stats) < 1 or len(fitness) < 1 or (len(tracker) < 1 and not args.no_tracking)):
@@ -164,16 +218,20 @@ def get_from_config(args, evo_config):
 
         # select the best or i random individuals to display
         if not args.not_only_best:
-            best = int(stats[args.generation][-2])
-            gene_pool = [gene_pool[best]]
+            ind_sel = [int(stats[args.generation][-2])]
+        else:
+            ind_sel = np.random.random_integers(0, evo_config['simulation']['individuals'] - 1, args.individuals)
+
+        if gene_pool is None:
+            gene_pool = new_gene_pool(args.gene_pool_file, evo_config, indices=ind_sel)
         else:
-            ind_sel = np.random.random_integers(0, len(gene_pool) - 1, args.individuals)
-            gene_pool = [gene_pool[ind] for ind in ind_sel]
+            gene_pool = gene_pool.take(ind_sel)
+        gene_pool = gene_pool.to_genomes()
 
     return gene_pool, evo_config, stats, fitness, tracker, return_parent_path(args)
 
 
-def new_gene_pool(gene_pool_file, evo_config):
+def new_gene_pool(gene_pool_file, evo_config, indices=None):
     """Returns new gene pool.
 
     A new gene pool houses the genomes for all individuals. This can be obtained by reading an existing file from disk
@@ -186,20 +244,20 @@ def new_gene_pool(gene_pool_file, evo_config):
         to an existing gene pool file, which is loaded.
     evo_config : dict
         Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    indices : list | np.array | None
+        Indices of the individuals to return. If None, all individuals are returned.
 
     Returns
     -------
-    gene_pool : list
-        List of genomes for all individuals.
+    gene_pool : GenePool
+        Genomes for all or the selected individuals.
     """
     # create either random gene pool or load
-    if not isinstance(gene_pool_file, str):
-        return _make_random_gene_pool(evo_config)
-    if isinstance(gene_pool_file, str):
-        if gene_pool_file.lower() == 'random':
-            return _make_random_gene_pool(evo_config)
-        else:
-            return load_gene_pool(gene_pool_file)
+    if not isinstance(gene_pool_file, str) or gene_pool_file.lower() == 'random':
+        gene_pool = GenePool.from_genomes(_make_random_gene_pool(evo_config))
+        return gene_pool if indices is None else gene_pool.take(indices)
+    else:
+        return GenePool.from_genomes(load_gene_pool(gene_pool_file, indices=indices))
 
 
 def return_parent_path(args):
@@ -240,41 +298,205 @@ def return_parent_path(args):
     return parent_dir
 
 
-def save_gene_pool(gene_pool, filename='gen_0.pkl'):
-    """Saves gene pool to pickle file.
+def save_gene_pool(gene_pool, filename='gen_0.gp', precision='float32'):
+    """Saves gene pool to a gene pool file. The file is replaced atomically.
+
+    See :func:`src.gene_pool_file.save_gene_pool_file` for the file format. If filename ends with ``.gpr``, the gene
+    pool is archived instead (see :func:`src.gene_pool_archive.save_archived_gene_pool`), using the archived gene pool
+    of the closest earlier (or the same) generation within the same directory as reference.
 
     Parameters
     ----------
-    gene_pool : list
-        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    gene_pool : list | GenePool
+        Genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
     filename : str
         Filename to save the data to.
+    precision : str
+        Either 'float32' or 'float64' to store the genomes exactly.
     """
 
-    with open(filename, 'wb') as pkl_file:
-        pickle.dump(gene_pool, pkl_file)
+    if filename.endswith('.gpr'):
+        save_archived_gene_pool(gene_pool, filename=filename, reference=_archive_reference(filename),
+                                precision=precision)
+    else:
+        save_gene_pool_file(gene_pool, filename=filename, precision=precision)
 
 
-def load_gene_pool(filename='gen_0.pkl'):
-    """Loads gene pool from pickle file.
+def load_gene_pool(filename='gen_0.gp', indices=None):
+    """Loads gene pool from a gene pool file, an archived gene pool or from a pickle file of older evolutions.
 
     Parameters
     ----------
     filename : str
         Filename to read the data from.
+    indices : list | np.array | None
+        Indices of the individuals to load. If None, all individuals are loaded. Only the selected individuals are read
+        from gene pool files and archived gene pools, whereas pickle files are always read entirely.
 
     Returns
     -------
-    gene_pool : list
-        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    gene_pool : list | GenePool
+        Genomes for all or the selected individuals. All genomes of pickle files are returned as they were saved, i.e. a
+        list of genomes for files of older evolutions.
     """
 
+    if is_gene_pool_file(filename):
+        return load_gene_pool_file(filename, indices=indices)
+    if is_archived_gene_pool(filename):
+        return load_archived_gene_pool(filename, indices=indices)
+
     with open(filename, 'rb') as pkl_file:
-        return pickle.load(pkl_file)
+        gene_pool = pickle.load(pkl_file)
+    return gene_pool if indices is None else GenePool.from_genomes(gene_pool).take(indices)
+
+
+def gene_pool_size(filename='gen_0.gp'):
+    """Returns the number of individuals stored in a gene pool file without loading the genomes.
+
+    Parameters
+    ----------
+    filename : str
+        Gene pool file, archived gene pool or pickle file of older evolutions, which is loaded entirely.
+
+    Returns
+    -------
+    num_individuals : int
+        Number of individuals.
+    """
+
+    if is_gene_pool_file(filename):
+        return gene_pool_file_size(filename)
+    if is_archived_gene_pool(filename):
+        return archived_gene_pool_size(filename)
+    return len(load_gene_pool(filename))
+
+
+def gene_pool_filename(parent_dir, generation):
+    """Returns the file of the gene pool of a generation.
+
+    Parameters
+    ----------
+    parent_dir : str
+        Evolution directory.
+    generation : int
+        Number of the generation.
+
+    Returns
+    -------
+    filename : str
+        ``gen_<generation>.gp`` if present, otherwise the archived gene pool ``gen_<generation>.gpr`` or the pickle file
+        ``gen_<generation>.pkl`` of an older evolution. ``gen_<generation>.gp`` if none exists.
+    """
+
+    filename = parent_dir + 'gen_' + str(generation)
+    for extension in GENE_POOL_EXTENSIONS:
+        if os.path.isfile(filename + extension):
+            return filename + extension
+    return filename + '.gp'
+
+
+def compact_gene_pools(evolution_dir, precision=None, keep_files=False):
+    """Archives all gene pool files of an evolution directory.
+
+    Generations are archived in ascending order, each one as delta against the previous one (see
+    :func:`src.gene_pool_archive.save_archived_gene_pool`). Each archived generation is restored and compared to the
+    original before the original file is removed. Generations that are archived already are kept as they are.
+
+    Parameters
+    ----------
+    evolution_dir : str
+        Evolution directory.
+    precision : str | None
+        Either 'float32' or 'float64'. If None, gene pool files keep their precision and pickle files of older
+        evolutions are archived exactly as float64.
+    keep_files : bool
+        Whether to keep the original files.
+
+    Returns
+    -------
+    num_archived : int
+        Number of archived generations.
+    bytes_before : int
+        Size of all gene pool files (including the pack file of earlier archives) before compacting.
+    bytes_after : int
+        Size of all gene pool files and the pack file after compacting.
+    """
+
+    parent_dir = evolution_dir.rstrip(sep) + sep
+    bytes_before = _gene_pool_bytes(parent_dir)
+    num_archived = 0
+
+    reference = None
+    for generation in _gene_pool_generations(parent_dir):
+        filename = gene_pool_filename(parent_dir, generation)
+        archived_filename = parent_dir + 'gen_' + str(generation) + '.gpr'
+
+        if filename != archived_filename:
+            gene_pool = GenePool.from_genomes(load_gene_pool(filename))
+            if precision is not None:
+                file_precision = precision
+            elif is_gene_pool_file(filename):
+                file_precision = gene_pool_file_precision(filename)
+            else:
+                file_precision = 'float64'
+
+            save_archived_gene_pool(gene_pool, filename=archived_filename, reference=reference,
+                                    precision=file_precision)
+
+            # make sure the generation can be restored before removing the original
+            restored = load_archived_gene_pool(archived_filename)
+            if not np.array_equal(restored.pattern_lengths, gene_pool.pattern_lengths) or \
+                    not np.array_equal(restored.sizes, gene_pool.sizes.astype(file_precision).astype(float)) or \
+                    not np.array_equal(restored.move_patterns,
+                                       gene_pool.move_patterns.astype(file_precision).astype(float)):
+                raise ValueError('Archived gene pool {} differs from {}.'.format(archived_filename, filename))
+
+            if not keep_files:
+                os.remove(filename)
+            num_archived += 1
+
+        reference = archived_filename
+
+    return num_archived, bytes_before, _gene_pool_bytes(parent_dir)
+
+
+def _archive_reference(filename):
+    """Returns the archived gene pool of the closest generation up to the one of filename, None if there is none."""
+
+    parent_dir = os.path.dirname(os.path.abspath(filename)) + sep
+    name = os.path.splitext(os.path.basename(filename))[0]
+    if not name.startswith('gen_') or not name[len('gen_'):].isdigit():
+        return None
+
+    generations = [generation for generation in _gene_pool_generations(parent_dir, extensions=('.gpr', ))
+                   if generation <= int(name[len('gen_'):])]
+    return parent_dir + 'gen_' + str(max(generations)) + '.gpr' if len(generations) > 0 else None
+
+
+def _gene_pool_generations(parent_dir, extensions=None):
+    """Returns the sorted numbers of all generations with a gene pool file of the given extensions in a directory."""
+
+    if extensions is None:
+        extensions = GENE_POOL_EXTENSIONS
+
+    generations = set()
+    for file in os.listdir(parent_dir):
+        name, extension = os.path.splitext(os.path.basename(file))
+        if name.startswith('gen_') and name[len('gen_'):].isdigit() and extension in extensions:
+            generations.add(int(name[len('gen_'):]))
+    return sorted(generations)
+
+
+def _gene_pool_bytes(parent_dir):
+    """Returns the size of all gene pool files and the pack file of a directory."""
+
+    files = [file for file in os.listdir(parent_dir)
+             if file == PACK_FILE or (file.startswith('gen_') and os.path.splitext(file)[1] in GENE_POOL_EXTENSIONS)]
+    return sum(os.path.getsize(parent_dir + file) for file in files)
 
 
 def save_stats(stats, filename='stats.csv'):
-    """Saves statistics to csv file.
+    """Saves statistics to csv file. The file is replaced atomically.
 
     Parameters
     ----------
@@ -284,16 +506,16 @@ def save_stats(stats, filename='stats.csv'):
         Filename to save the data to.
     """
 
-    np.savetxt(filename, stats, delimiter=',')
+    atomic_write(filename, lambda csv_file: np.savetxt(csv_file, stats, delimiter=','))
 
 
 def load_stats(filename='stats.csv'):
-    """Loads statistics from csv file.
+    """Loads statistics from csv file or run log.
 
     Parameters
     ----------
     filename : str
-        Filename to read the data from.
+        Filename to read the data from, either a csv file or a run log written by :func:`src.IO.append_run_log`.
 
     Returns
     -------
@@ -301,7 +523,348 @@ def load_stats(filename='stats.csv'):
         Statistics on an evolution.
     """
 
-    return np.loadtxt(filename, delimiter=',').tolist()
+    if _is_run_log(filename):
+        return read_run_log(filename).tolist()
+
+    return np.loadtxt(filename, delimiter=',', ndmin=2).tolist()
+
+
+def save_run_log(rows, filename='stats.bin'):
+    """Writes rows to a new run log, replacing any existing file.
+
+    A run log is a binary file holding a small header followed by fixed size records of float64 values, one record per
+    generation. New records are appended by :func:`src.IO.append_run_log` without rewriting the file.
+
+    Parameters
+    ----------
+    rows : list | np.array
+        Rows of equal length, e.g. statistics or fitness per generation. May be empty.
+    filename : str
+        Filename to save the data to.
+    """
+
+    rows = [np.asarray(row, dtype=RUN_LOG_DTYPE).reshape(-1) for row in rows]
+
+    with open(filename, 'wb') as log_file:
+        if len(rows) > 0:
+            log_file.write(_run_log_header(len(rows[0])))
+            for row in rows:
+                _write_run_log_record(log_file, row, len(rows[0]))
+
+
+def append_run_log(row, filename='stats.bin'):
+    """Appends a single record to a run log, creating the file if needed.
+
+    An incomplete record at the end of the file (see :func:`src.IO.read_run_log`) is overwritten.
+
+    Parameters
+    ----------
+    row : list | np.array
+        Values of one generation, e.g. statistics or fitness. All rows of a run log must have the same length.
+    filename : str
+        Filename of the run log.
+    """
+
+    row = np.asarray(row, dtype=RUN_LOG_DTYPE).reshape(-1)
+
+    with open(filename, 'ab') as log_file:
+        if log_file.tell() == 0:
+            log_file.write(_run_log_header(len(row)))
+            width = len(row)
+        else:
+            width = _read_run_log_width(filename)
+            record_size = width * np.dtype(RUN_LOG_DTYPE).itemsize
+            incomplete = (log_file.tell() - RUN_LOG_HEADER_SIZE) % record_size
+            if incomplete > 0:
+                log_file.truncate(log_file.tell() - incomplete)
+        _write_run_log_record(log_file, row, width)
+        log_file.flush()
+        os.fsync(log_file.fileno())
+
+
+def read_run_log(filename='stats.bin'):
+    """Memory maps a run log.
+
+    Columns can be accessed without reading the whole file, e.g. ``read_run_log('stats.bin')[:, 1]`` for the average
+    fitness of all generations. An incomplete record at the end of the file (e.g. if the evolution was killed while
+    writing) is ignored.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the run log.
+
+    Returns
+    -------
+    rows : np.memmap | np.array
+        Read-only array of shape (generations, values per generation).
+    """
+
+    width = _read_run_log_width(filename)
+    record_size = width * np.dtype(RUN_LOG_DTYPE).itemsize
+    num_rows = (os.path.getsize(filename) - RUN_LOG_HEADER_SIZE) // record_size
+
+    # memmap cannot map zero bytes
+    if num_rows == 0:
+        return np.zeros((0, width), dtype=RUN_LOG_DTYPE)
+
+    return np.memmap(filename, dtype=RUN_LOG_DTYPE, mode='r', offset=RUN_LOG_HEADER_SIZE, shape=(num_rows, width))
+
+
+def trim_run_log(filename, first_generation):
+    """Removes the records of a run log from a generation on, e.g. before these generations are simulated again.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the run log, the first value of each record being the generation. Created if missing.
+    first_generation : int
+        First generation to remove.
+
+    Returns
+    -------
+    rows : np.array
+        Remaining records.
+    """
+
+    rows = np.zeros((0, 0))
+    if os.path.isfile(filename) and _is_run_log(filename):
+        rows = np.array(read_run_log(filename))
+        rows = rows[rows[:, 0] < first_generation]
+    save_run_log(rows, filename=filename)
+    return rows
+
+
+def export_run_log(filename='stats.bin', csv_filename=None):
+    """Exports a run log to a csv file as written by :func:`src.IO.save_stats`.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the run log.
+    csv_filename : str | None
+        Filename of the csv file. If None, the extension of filename is replaced by ``.csv``.
+    """
+
+    if csv_filename is None:
+        csv_filename = os.path.splitext(filename)[0] + '.csv'
+
+    save_stats(read_run_log(filename), filename=csv_filename)
+
+
+def _run_log_header(width):
+    """Returns the header of a run log with records of the given number of values."""
+
+    return RUN_LOG_MAGIC + np.array([width], dtype='<u8').tobytes()
+
+
+def _read_run_log_width(filename):
+    """Returns the number of values per record of an existing run log."""
+
+    with open(filename, 'rb') as log_file:
+        header = log_file.read(RUN_LOG_HEADER_SIZE)
+
+    if len(header) < RUN_LOG_HEADER_SIZE or not header.startswith(RUN_LOG_MAGIC):
+        raise ValueError('{} is not a run log.'.format(filename))
+
+    return int(np.frombuffer(header[len(RUN_LOG_MAGIC):], dtype='<u8')[0])
+
+
+def _write_run_log_record(log_file, row, width):
+    """Writes one record to an open run log after checking its length."""
+
+    if len(row) != width:
+        raise ValueError('Record of length {} does not fit into run log with records of length {}.'.format(len(row),
+                                                                                                            width))
+    log_file.write(row.tobytes())
+
+
+def _is_run_log(filename):
+    """Checks whether a file starts with the header of a run log."""
+
+    with open(filename, 'rb') as log_file:
+        return log_file.read(len(RUN_LOG_MAGIC)) == RUN_LOG_MAGIC
+
+
+def save_generation(generation, parent_dir, stats_row, fitness_row, tracker=None, gene_pool=None,
+                    precision='float32', archive=False, island_stats=None, screening_stats=None):
+    """Writes the data recorded for one generation, i.e. one checkpoint of an evolution.
+
+    Statistics and fitness are appended to the run logs ``stats.bin`` and ``fitness.bin``, the tracker is added to the
+    tracker store ``tracker`` and the gene pool is saved to ``gen_<generation>.gp`` (``gen_<generation>.gpr`` if
+    archived). Statistics of islands and of the screening are appended to the run logs ``island_stats.bin`` and
+    ``screening.bin``.
+
+    Parameters
+    ----------
+    generation : int
+        Number of the generation.
+    parent_dir : str
+        Evolution directory.
+    stats_row : list
+        Statistics of the generation.
+    fitness_row : list
+        Fitness of all individuals followed by the generation.
+    tracker : dict | None
+        Samples recorded for each individual. Not saved if None.
+    gene_pool : GenePool | None
+        Genomes of the generation. Not saved if None.
+    precision : str
+        Precision of the saved gene pool, either 'float32' or 'float64'.
+    archive : bool
+        Whether to archive the gene pool as delta against the previous generation. See
+        :func:`src.gene_pool_archive.save_archived_gene_pool`.
+    island_stats : list | None
+        Statistics of each island of the generation. See :func:`src.islands.island_generations`. Not saved if None.
+    screening_stats : list | None
+        Statistics of the screening of the generation. See :func:`src.screening.simulate_screened`. Not saved if None.
+    """
+
+    append_run_log(stats_row, filename=parent_dir + 'stats.bin')
+    append_run_log(fitness_row, filename=parent_dir + 'fitness.bin')
+    if island_stats is not None:
+        for row in island_stats:
+            append_run_log(row, filename=parent_dir + 'island_stats.bin')
+    if screening_stats is not None:
+        append_run_log(screening_stats, filename=parent_dir + 'screening.bin')
+    if tracker is not None:
+        append_tracker(tracker, generation, parent_dir + 'tracker' + sep)
+    if gene_pool is not None:
+        save_gene_pool(gene_pool, filename=parent_dir + 'gen_' + str(generation) + ('.gpr' if archive else '.gp'),
+                       precision=precision)
+
+
+def save_checkpoint(parent_dir, generation, gene_pool, cutoff, rng_state, config_hash, stats_rows, fitness_rows):
+    """Writes the full state needed to continue an evolution exactly as if it had not been interrupted.
+
+    The gene pool of the next generation is saved with float64 precision to ``checkpoint_gen_<generation>.gp``. The
+    manifest ``checkpoint.json`` holds the generation number, the state of the global random number generator, the
+    selection cutoff used for early stopping, a hash of the evolution configuration and pointers to the files of the
+    checkpoint, i.e. the gene pool file and the number of records in the run logs. The manifest is replaced atomically
+    after the gene pool was written, afterwards the gene pool of the previous checkpoint is removed. Run logs and
+    tracker store must have been written up to ``generation - 1`` before.
+
+    Only the state of the main process is saved. Worker processes and evaluation workers draw no random numbers that
+    affect the results (the colors of bodies are not simulated), selection and crossing draw from the global random
+    number generator of the main process and island processes are seeded from it at the start of each epoch.
+
+    Parameters
+    ----------
+    parent_dir : str
+        Evolution directory.
+    generation : int
+        Number of the next generation to simulate.
+    gene_pool : GenePool
+        Genomes of the next generation.
+    cutoff : float | list | None
+        Selection cutoff of the previous generation. See :func:`src.evolution.selection_cutoff`. A list holds the
+        cutoff of each island, see :func:`src.islands.island_generations`.
+    rng_state : tuple
+        State of the global random number generator as returned by ``np.random.get_state()``.
+    config_hash : str
+        Hash of the evolution configuration. See :func:`src.IO.config_hash`.
+    stats_rows : int
+        Number of records in the statistics run log.
+    fitness_rows : int
+        Number of records in the fitness run log.
+    """
+
+    previous = load_checkpoint(parent_dir)
+
+    gene_pool_file = 'checkpoint_gen_{}.gp'.format(generation)
+    save_gene_pool(gene_pool, filename=parent_dir + gene_pool_file, precision='float64')
+
+    manifest = {'generation': generation,
+                'gene_pool_file': gene_pool_file,
+                'stats_file': 'stats.bin',
+                'stats_rows': stats_rows,
+                'fitness_file': 'fitness.bin',
+                'fitness_rows': fitness_rows,
+                'tracker_dir': 'tracker',
+                'cutoff': None if cutoff is None else np.asarray(cutoff, dtype=float).tolist(),
+                'config_hash': config_hash,
+                'rng_state': {'algorithm': rng_state[0],
+                              'keys': np.asarray(rng_state[1]).tolist(),
+                              'pos': int(rng_state[2]),
+                              'has_gauss': int(rng_state[3]),
+                              'cached_gaussian': float(rng_state[4])}}
+    atomic_write(parent_dir + CHECKPOINT_FILE, lambda json_file: json.dump(manifest, json_file), mode='w')
+
+    if previous is not None and previous['gene_pool_file'] != gene_pool_file and \
+            os.path.isfile(parent_dir + previous['gene_pool_file']):
+        os.remove(parent_dir + previous['gene_pool_file'])
+
+
+def load_checkpoint(parent_dir):
+    """Loads the manifest of the latest checkpoint of an evolution.
+
+    Parameters
+    ----------
+    parent_dir : str
+        Evolution directory.
+
+    Returns
+    -------
+    checkpoint : dict | None
+        Manifest written by :func:`src.IO.save_checkpoint` with ``rng_state`` converted to the tuple accepted by
+        ``np.random.set_state``. None if the evolution has no checkpoint.
+    """
+
+    if not os.path.isfile(parent_dir + CHECKPOINT_FILE):
+        return None
+
+    with open(parent_dir + CHECKPOINT_FILE) as json_file:
+        checkpoint = json.load(json_file)
+
+    rng_state = checkpoint['rng_state']
+    checkpoint['rng_state'] = (rng_state['algorithm'], np.array(rng_state['keys'], dtype=np.uint32), rng_state['pos'],
+                               rng_state['has_gauss'], rng_state['cached_gaussian'])
+    return checkpoint
+
+
+def clear_checkpoint(parent_dir):
+    """Removes the checkpoint of an evolution, e.g. because the evolution is started again from scratch.
+
+    Removes the manifest ``checkpoint.json`` and every checkpoint gene pool ``checkpoint_gen_<generation>.gp``, such
+    that an interrupted new evolution is not continued from the checkpoint of the previous one.
+
+    Parameters
+    ----------
+    parent_dir : str
+        Evolution directory.
+    """
+
+    if not os.path.isdir(parent_dir):
+        return
+
+    # the manifest goes first, a checkpoint without its gene pool must never be found
+    if os.path.isfile(parent_dir + CHECKPOINT_FILE):
+        os.remove(parent_dir + CHECKPOINT_FILE)
+
+    for file in os.listdir(parent_dir):
+        if file.startswith('checkpoint_gen_') and file.endswith('.gp'):
+            os.remove(parent_dir + file)
+
+
+def config_hash(evo_config):
+    """Computes a hash of the evolution configuration.
+
+    The number of generations is ignored, since it grows whenever an evolution is continued.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal hash value.
+    """
+
+    relevant_config = json.loads(json.dumps(evo_config))
+    relevant_config['simulation'].pop('generations', None)
+    return hashlib.sha1(json.dumps(relevant_config, sort_keys=True).encode()).hexdigest()
 
 
 def save_tracker(tracker, filename='tracker.pkl'):
@@ -320,19 +883,22 @@ def save_tracker(tracker, filename='tracker.pkl'):
 
 
 def load_tracker(filename='tracker.pkl'):
-    """Loads gene pool from pickle file.
+    """Loads tracker from pickle file or tracker store.
 
     Parameters
     ----------
     filename : str
-        Filename to read the data from.
+        Filename to read the data from or directory of a tracker store (see :class:`src.tracker_store.TrackerStore`).
 
     Returns
     -------
-    tracker : list
-        List of tracker dictionaries for all individuals.
+    tracker : list | TrackerStore
+        List of tracker dictionaries for all individuals. For a tracker store, generations are loaded on access.
     """
 
+    if os.path.isdir(filename):
+        return TrackerStore(filename)
+
     with open(filename, 'rb') as pkl_file:
         return pickle.load(pkl_file)
 
@@ -340,8 +906,9 @@ def load_tracker(filename='tracker.pkl'):
 def find_latest_gen(save_folder_dir):
     """Finds the latest generation in a given evolution directory.
 
-    Within a precomputed evolution, generations are saved as ``gen_<generation number>.pkl`` files. This function looks
-    through the specified directory and finds the highest number attached to the file names starting with `'gen_'`.
+    Within a precomputed evolution, generations are saved as ``gen_<generation number>.gp`` files (``.gpr`` if
+    archived, ``.pkl`` for older evolutions). This function looks through the specified directory and finds the highest
+    number attached to the file names starting with `'gen_'`.
 
     Parameters
     ----------
@@ -354,14 +921,8 @@ def find_latest_gen(save_folder_dir):
         Last generation found.
     """
 
-    latest_gen = 0
-    for file in os.listdir(save_folder_dir):
-        if 'gen_' in file:
-            curr_gen = int(str(os.path.basename(file).split('gen_')[-1]).split('.pkl')[0])
-            if curr_gen > latest_gen:
-                latest_gen = curr_gen
-
-    return latest_gen
+    generations = _gene_pool_generations(save_folder_dir)
+    return generations[-1] if len(generations) > 0 else 0
 
 
 def read_evo_config(filename='evo_config.json'):
@@ -379,7 +940,33 @@ def read_evo_config(filename='evo_config.json'):
     """
 
     with open(filename) as json_file:
-        return json.load(json_file)
+        evo_config = json.load(json_file)
+    _check_early_stopping_config(evo_config['simulation'].get('early_stopping'))
+    return evo_config
+
+
+def _check_early_stopping_config(early_stopping):
+    """Raises a ValueError if an early stopping configuration is invalid.
+
+    A margin below 1 would stop individuals whose extrapolated fitness still reaches the selection cutoff, and
+    checkpoints outside of the simulation duration are never reached.
+
+    Parameters
+    ----------
+    early_stopping : dict | None
+        Early stopping configuration. See :func:`src.simulation._check_early_stopping`.
+    """
+
+    if early_stopping is None:
+        return
+    if not early_stopping['margin'] >= 1:
+        raise ValueError('Early stopping margin must be at least 1, got {}.'.format(early_stopping['margin']))
+    for fraction in early_stopping['checkpoints']:
+        if not 0 < fraction < 1:
+            raise ValueError('Early stopping checkpoints must be fractions within (0, 1), got {}.'.format(fraction))
+    if early_stopping['policy'] not in ('extrapolate', 'freeze'):
+        raise ValueError("Early stopping policy must be 'extrapolate' or 'freeze', got {}.".format(
+            early_stopping['policy']))
 
 
 def write_evo_config(evo_config, filename='evo_config.json'):
@@ -402,6 +989,12 @@ def make_default_evo_config():
     Each evolution has a configuration file attached to it. If no file is present, a default file is needed, which is
     created on demand here.
 
+    New evolutions cross and mutate all pairs at once (``'batch_crossing': True``, see
+    :func:`src.evolution.batch_crossing`) instead of gene by gene as before. Children follow the same distribution
+    (checked by the distribution tests in ``tests/test_crossing.py``), but a seeded evolution no longer reproduces the
+    results of earlier versions. Set ``'batch_crossing'`` to False to get them back; configurations without the entry
+    keep the gene wise crossing.
+
     Returns
     -------
     evo_config : dict
@@ -422,13 +1015,17 @@ def make_default_evo_config():
                                  },
                   'simulation': {
                                 'fps': 240,
-                                'colormap': 'viridis'
+                                'colormap': 'viridis',
+                                'early_stopping': None,
+                                'screening': None,
+                                'tracking': {'interval': 10, 'channels': []}
                                 },
                   'evolution': {
                                 'mutation_prob_ind': 0.05,
                                 'mutation_prob_gene': 0.05,
                                 'mutation_prob_feature': 0.05,
-                                'alpha_limits': 0.5
+                                'alpha_limits': 0.5,
+                                'batch_crossing': True
                                }
                   }
 
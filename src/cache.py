@@ -0,0 +1,210 @@
+import pybullet as p
+from src.individual import _tracking_config
+import numpy as np
+import hashlib
+import pickle
+import sqlite3
+import json
+
+
+def open_fitness_cache(filename='fitness_cache.sqlite', max_entries=10000):
+    """Opens (or creates) an on-disk cache for fitness values.
+
+    Simulations are deterministic, hence genomes that have been simulated before do not need to be simulated again.
+    This is mostly the case for the generations simulated again by a resumed evolution and for evolutions repeated with
+    the same random seed. Crossing blends the genes of both parents into every child, such that an evolution hardly
+    ever simulates the same genome twice otherwise. Entries are keyed by :func:`src.cache.genome_hash` and hold the
+    tracked samples of the genome if it was simulated with tracking (about 7.7 KB for 40 s), hence ``max_entries``
+    bounds the size of the database. Once the cache holds more than ``max_entries`` entries, the least recently used
+    entries are evicted.
+
+    Parameters
+    ----------
+    filename : str
+        SQLite database to store the cache in.
+    max_entries : int
+        Maximum number of entries kept in the cache.
+
+    Returns
+    -------
+    cache : dict
+        Cache handle storing the database connection, the maximum and current number of entries, the counter used to
+        find the least recently used entries and counters for cache hits and misses.
+    """
+
+    connection = sqlite3.connect(filename)
+    connection.execute('CREATE TABLE IF NOT EXISTS fitness '
+                       '(key TEXT PRIMARY KEY, fitness REAL, track BLOB, last_used INTEGER)')
+    connection.execute('CREATE INDEX IF NOT EXISTS fitness_last_used ON fitness (last_used)')
+    connection.commit()
+
+    # both are kept up to date in the handle, such that lookups and stores do not scan the table
+    num_entries, last_used = connection.execute('SELECT COUNT(*), MAX(last_used) FROM fitness').fetchone()
+
+    return {'connection': connection,
+            'max_entries': max_entries,
+            'num_entries': num_entries,
+            'last_used': -1 if last_used is None else last_used,
+            'hits': 0,
+            'misses': 0}
+
+
+def close_fitness_cache(cache):
+    """Closes a fitness cache.
+
+    Parameters
+    ----------
+    cache : dict
+        Cache handle. See :func:`src.cache.open_fitness_cache`.
+    """
+
+    cache['connection'].close()
+
+
+def genome_hash(genome, evo_config):
+    """Computes a stable hash of a genome and the parts of the evolution configuration that affect its fitness.
+
+    Parameters
+    ----------
+    genome : list | tuple
+        Genome containing dictionaries for size and move pattern.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal hash value.
+    """
+
+    sha = hashlib.sha1()
+    sha.update(json.dumps(_simulation_relevant_config(evo_config), sort_keys=True).encode())
+    for chromosome in genome[:2]:
+        for gene in sorted(chromosome.keys()):
+            sha.update(gene.encode())
+            sha.update(np.ascontiguousarray(chromosome[gene], dtype='<f8').tobytes())
+    return sha.hexdigest()
+
+
+def lookup_fitness(cache, keys, track_individuals=False):
+    """Looks up fitness values in the cache.
+
+    Parameters
+    ----------
+    cache : dict
+        Cache handle. See :func:`src.cache.open_fitness_cache`.
+    keys : list
+        Hash values of the genomes to look up. See :func:`src.cache.genome_hash`.
+    track_individuals : bool
+        Whether tracked paths are required. If so, entries stored without tracked path count as misses.
+
+    Returns
+    -------
+    found : dict
+        ``(fitness, track)`` for all keys found in the cache.
+    """
+
+    connection = cache['connection']
+    found = {}
+    unique_keys = list(set(keys))
+
+    # query in chunks to stay below the maximum number of sql variables
+    for start in range(0, len(unique_keys), 500):
+        chunk = unique_keys[start:start + 500]
+        rows = connection.execute('SELECT key, fitness, track FROM fitness WHERE key IN ({})'.format(
+            ','.join('?' * len(chunk))), chunk).fetchall()
+        for key, fitness, track in rows:
+            if track_individuals and track is None:
+                continue
+            found[key] = (fitness, None if track is None else pickle.loads(track))
+
+    # mark entries as recently used
+    last_used = _next_use(cache)
+    connection.executemany('UPDATE fitness SET last_used = ? WHERE key = ?', [(last_used, key) for key in found])
+    connection.commit()
+
+    cache['hits'] += sum(key in found for key in keys)
+    cache['misses'] += sum(key not in found for key in keys)
+    return found
+
+
+def store_fitness(cache, entries):
+    """Stores fitness values in the cache and evicts the least recently used entries if the cache is full.
+
+    Parameters
+    ----------
+    cache : dict
+        Cache handle. See :func:`src.cache.open_fitness_cache`.
+    entries : list
+        ``(key, fitness, track)`` for each genome, where track may be None.
+    """
+
+    connection = cache['connection']
+    entries = list({key: (key, fitness, track) for key, fitness, track in entries}.values())
+
+    # entries stored before without tracked samples are replaced and do not add to the number of entries
+    keys = [entry[0] for entry in entries]
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        cache['num_entries'] -= connection.execute('SELECT COUNT(*) FROM fitness WHERE key IN ({})'.format(
+            ','.join('?' * len(chunk))), chunk).fetchone()[0]
+    cache['num_entries'] += len(entries)
+
+    last_used = _next_use(cache)
+    connection.executemany('INSERT OR REPLACE INTO fitness VALUES (?, ?, ?, ?)',
+                           [(key, float(fitness), None if track is None else pickle.dumps(track), last_used)
+                            for key, fitness, track in entries])
+
+    # evict least recently used entries
+    if cache['num_entries'] > cache['max_entries']:
+        connection.execute('DELETE FROM fitness WHERE key IN '
+                           '(SELECT key FROM fitness ORDER BY last_used ASC LIMIT ?)',
+                           (cache['num_entries'] - cache['max_entries'], ))
+        cache['num_entries'] = cache['max_entries']
+    connection.commit()
+
+
+def _next_use(cache):
+    """Returns an increasing counter used to determine the least recently used entries.
+
+    Parameters
+    ----------
+    cache : dict
+        Cache handle. See :func:`src.cache.open_fitness_cache`.
+
+    Returns
+    -------
+    last_used : int
+        Counter value larger than all values in the cache.
+    """
+
+    cache['last_used'] += 1
+    return cache['last_used']
+
+
+def _simulation_relevant_config(evo_config):
+    """Extracts the parts of the evolution configuration that affect the fitness or tracked path of a given genome.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    relevant_config : dict
+        Configuration values that affect the simulation of a genome.
+    """
+
+    relevant_config = {'min_force': evo_config['individuals']['min_force'],
+                       'max_force': evo_config['individuals']['max_force'],
+                       'standard_volume': evo_config['individuals']['standard_volume'],
+                       'fps': evo_config['simulation']['fps'],
+                       'duration': evo_config['simulation']['duration'],
+                       'tracking': _tracking_config(evo_config),
+                       'physics_api': p.getAPIVersion()}
+
+    # only coarser time steps are keyed, such that keys of existing caches remain valid
+    if evo_config['simulation'].get('time_step_factor', 1) != 1:
+        relevant_config['time_step_factor'] = evo_config['simulation']['time_step_factor']
+    return relevant_config
@@ -0,0 +1,167 @@
+import threading
+import queue
+import time
+import os
+
+
+def start_checkpoint_writer(max_queue=4):
+    """Starts a background thread writing checkpoints (gene pools, statistics, tracked paths) to disk.
+
+    The evolution hands each checkpoint over with :func:`src.checkpoint.submit_checkpoint` and continues with the next
+    generation right away. Checkpoints are written in the order they were submitted. If ``max_queue`` checkpoints are
+    pending, submitting blocks until the writer caught up, which bounds the memory held by pending snapshots.
+
+    Parameters
+    ----------
+    max_queue : int
+        Maximum number of pending checkpoints.
+
+    Returns
+    -------
+    writer : dict
+        Writer handle storing the queue, the thread, the first error that occurred and the write latency of each
+        finished checkpoint.
+    """
+
+    writer = {'queue': queue.Queue(maxsize=max_queue),
+              'error': None,
+              'latencies': [],
+              'lock': threading.Lock()}
+    writer['thread'] = threading.Thread(target=_write_checkpoints, args=(writer, ), name='checkpoint-writer',
+                                        daemon=True)
+    writer['thread'].start()
+    return writer
+
+
+def submit_checkpoint(writer, label, write, *args, **kwargs):
+    """Hands a checkpoint over to the background writer.
+
+    Arguments are written as they are when the writer gets to them, hence they must not be modified afterwards (e.g.
+    pass a new gene pool per generation instead of changing the previous one).
+
+    Parameters
+    ----------
+    writer : dict
+        Writer handle. See :func:`src.checkpoint.start_checkpoint_writer`.
+    label : str
+        Name of the checkpoint used for reporting.
+    write : callable
+        Function writing the checkpoint, called as ``write(*args, **kwargs)``.
+
+    Returns
+    -------
+    depth : int
+        Number of pending checkpoints including this one.
+    """
+
+    _raise_error(writer)
+    writer['queue'].put((label, write, args, kwargs))
+    return writer['queue'].qsize()
+
+
+def checkpoint_status(writer):
+    """Reports the state of the background writer.
+
+    Parameters
+    ----------
+    writer : dict
+        Writer handle. See :func:`src.checkpoint.start_checkpoint_writer`.
+
+    Returns
+    -------
+    depth : int
+        Number of pending checkpoints.
+    last_latency : tuple | None
+        ``(label, seconds)`` of the last finished checkpoint, None if none finished yet.
+    """
+
+    with writer['lock']:
+        last_latency = writer['latencies'][-1] if len(writer['latencies']) > 0 else None
+    return writer['queue'].qsize(), last_latency
+
+
+def close_checkpoint_writer(writer):
+    """Waits until all pending checkpoints are written and stops the background writer.
+
+    Parameters
+    ----------
+    writer : dict
+        Writer handle. See :func:`src.checkpoint.start_checkpoint_writer`.
+
+    Returns
+    -------
+    latencies : list
+        ``(label, seconds)`` for each written checkpoint.
+    """
+
+    writer['queue'].put(None)
+    writer['thread'].join()
+    _raise_error(writer)
+    return writer['latencies']
+
+
+def atomic_write(filename, write, mode='wb'):
+    """Writes a file atomically by writing to a temporary file first and renaming it afterwards.
+
+    Readers either see the previous or the complete new file, even if the evolution is interrupted while writing. If
+    ``write`` raises, the temporary file is removed and the previous file is left untouched.
+
+    Parameters
+    ----------
+    filename : str
+        Filename to write to.
+    write : callable
+        Function writing the content, called with the open temporary file.
+    mode : str
+        Mode to open the temporary file with.
+    """
+
+    tmp_filename = filename + '.tmp'
+    try:
+        with open(tmp_filename, mode) as tmp_file:
+            write(tmp_file)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+    except BaseException:
+        if os.path.isfile(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    os.replace(tmp_filename, filename)
+
+
+def _write_checkpoints(writer):
+    """Writes queued checkpoints until None is received. Runs in the background thread.
+
+    Parameters
+    ----------
+    writer : dict
+        Writer handle. See :func:`src.checkpoint.start_checkpoint_writer`.
+    """
+
+    while True:
+        item = writer['queue'].get()
+        if item is None:
+            return
+
+        label, write, args, kwargs = item
+
+        # after an error further checkpoints are skipped, the error is raised in the main thread
+        if writer['error'] is not None:
+            continue
+
+        start = time.time()
+        try:
+            write(*args, **kwargs)
+        except BaseException as error:
+            writer['error'] = error
+            continue
+
+        with writer['lock']:
+            writer['latencies'].append((label, time.time() - start))
+
+
+def _raise_error(writer):
+    """Raises the error that occurred in the background writer, if any."""
+
+    if writer['error'] is not None:
+        raise RuntimeError('writing checkpoint failed') from writer['error']
@@ -0,0 +1,356 @@
+from multiprocessing.connection import Listener, Client, AuthenticationError
+import ipaddress
+import traceback
+import threading
+import secrets
+import socket
+import queue
+import time
+
+# host the broker listens on if none is given, workers on other hosts require an explicit host like 0.0.0.0
+DEFAULT_HOST = '127.0.0.1'
+
+# seconds between two heartbeats of a busy worker and between two pings of an idle worker
+HEARTBEAT_INTERVAL = 5.
+
+
+def start_broker(config, address=(DEFAULT_HOST, 0), authkey=None, heartbeat_timeout=30.):
+    """Starts a broker handing out tasks to workers connected over TCP.
+
+    Workers (see :func:`src.distributed.run_worker`) may connect from any host at any time. Each worker receives
+    ``config`` once after connecting and then one task after another. While evaluating a task a worker sends
+    heartbeats. If a worker disconnects or no message arrives within ``heartbeat_timeout`` seconds, its task is handed
+    out again to another worker. Tasks are submitted with :func:`src.distributed.run_tasks`.
+
+    Messages are pickled, hence anyone knowing the secret can run code on the broker and its workers. Without an
+    ``authkey`` a random secret is generated (see ``broker['authkey']``), which has to be passed on to the workers.
+
+    Parameters
+    ----------
+    config : object
+        Picklable configuration sent to each worker, e.g. the evolution configuration.
+    address : tuple
+        ``(host, port)`` to listen on. Port 0 selects a free port, see ``broker['address']``.
+    authkey : bytes | None
+        Shared secret workers have to authenticate with. If None, a random secret is generated.
+    heartbeat_timeout : float
+        Seconds after which a silent worker is considered lost.
+
+    Returns
+    -------
+    broker : dict
+        Broker handle storing the listener, its address, the task and result queues and the connected workers.
+    """
+
+    if authkey is None:
+        authkey = generate_authkey()
+
+    listener = Listener(address, family='AF_INET', authkey=authkey)
+    broker = {'listener': listener,
+              'address': listener.address,
+              'authkey': authkey,
+              'config': config,
+              'heartbeat_timeout': heartbeat_timeout,
+              'tasks': queue.Queue(),
+              'results': queue.Queue(),
+              'call': 0,
+              'workers': {},
+              'lock': threading.Lock(),
+              'closed': threading.Event()}
+    broker['thread'] = threading.Thread(target=_accept_workers, args=(broker, ), name='broker', daemon=True)
+    broker['thread'].start()
+    return broker
+
+
+def run_tasks(broker, tasks):
+    """Hands tasks out to the connected workers and yields their results.
+
+    Blocks until workers are connected and all results arrived, tasks of workers lost on the way are handed out again.
+
+    Parameters
+    ----------
+    broker : dict
+        Broker handle. See :func:`src.distributed.start_broker`.
+    tasks : list
+        Picklable tasks.
+
+    Returns
+    -------
+    results : generator
+        Result of each task in the order of completion.
+    """
+
+    # results of tasks of earlier calls (e.g. after an interrupt) are ignored
+    with broker['lock']:
+        broker['call'] += 1
+        call = broker['call']
+
+    for task_id, task in enumerate(tasks):
+        broker['tasks'].put((call, task_id, task))
+
+    pending = set(range(len(tasks)))
+    while len(pending) > 0:
+        result_call, task_id, status, result = broker['results'].get()
+        if result_call != call or task_id not in pending:
+            continue
+        if status == 'error':
+            raise RuntimeError('Task failed on worker:\n{}'.format(result))
+        pending.remove(task_id)
+        yield result
+
+
+def num_workers(broker):
+    """Returns the number of connected workers.
+
+    Parameters
+    ----------
+    broker : dict
+        Broker handle. See :func:`src.distributed.start_broker`.
+
+    Returns
+    -------
+    num_workers : int
+        Number of connected workers.
+    """
+
+    with broker['lock']:
+        return len(broker['workers'])
+
+
+def close_broker(broker):
+    """Stops the broker and asks all connected workers to exit.
+
+    Parameters
+    ----------
+    broker : dict
+        Broker handle. See :func:`src.distributed.start_broker`.
+    """
+
+    broker['closed'].set()
+
+    # closing the listener does not interrupt a pending accept, hence the broker connects to itself once
+    try:
+        Client(_connect_address(broker['address']), family='AF_INET', authkey=broker['authkey']).close()
+    except OSError:
+        pass
+    broker['thread'].join()
+    broker['listener'].close()
+    with broker['lock']:
+        threads = list(broker['workers'].values())
+    for thread in threads:
+        thread.join(HEARTBEAT_INTERVAL + 1)
+
+
+def run_worker(address, evaluate, authkey, init=None, heartbeat_interval=HEARTBEAT_INTERVAL, connect_timeout=60.):
+    """Connects to a broker and evaluates tasks until the broker stops.
+
+    Parameters
+    ----------
+    address : tuple
+        ``(host, port)`` of the broker, e.g. ``broker['address']`` for a worker on the host of the broker.
+    evaluate : callable
+        Called as ``evaluate(state, task)`` for each task, returns the picklable result.
+    authkey : bytes
+        Shared secret of the broker.
+    init : callable | None
+        Called as ``init(config)`` with the configuration of the broker once after connecting, returns the state
+        passed to evaluate. If None, the configuration itself is passed.
+    heartbeat_interval : float
+        Seconds between two heartbeats while evaluating a task.
+    connect_timeout : float
+        Seconds to retry connecting, e.g. if workers are started before the broker.
+
+    Returns
+    -------
+    num_tasks : int
+        Number of evaluated tasks.
+    """
+
+    connection = _connect(address, authkey, connect_timeout)
+    send_lock = threading.Lock()
+    num_tasks = 0
+
+    try:
+        config = connection.recv()[1]
+        state = config if init is None else init(config)
+
+        while True:
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                # broker is gone
+                return num_tasks
+
+            if message[0] == 'stop':
+                return num_tasks
+            if message[0] != 'task':
+                continue
+
+            # let the broker know the worker is still alive while evaluating
+            stop_heartbeat = threading.Event()
+            heartbeat = threading.Thread(target=_send_heartbeats,
+                                         args=(connection, send_lock, stop_heartbeat, heartbeat_interval), daemon=True)
+            heartbeat.start()
+            try:
+                reply = ('result', evaluate(state, message[1]))
+            except Exception:
+                reply = ('error', traceback.format_exc())
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+
+            with send_lock:
+                connection.send(reply)
+            num_tasks += 1
+    finally:
+        connection.close()
+
+
+def parse_address(address):
+    """Converts ``'host:port'`` to ``(host, port)``.
+
+    Parameters
+    ----------
+    address : str
+        Address, the host may be omitted (``':port'``) to use ``127.0.0.1``. A broker reachable from other hosts has
+        to be given a host explicitly, e.g. ``0.0.0.0`` for all interfaces.
+
+    Returns
+    -------
+    address : tuple
+        ``(host, port)``.
+    """
+
+    host, _, port = address.rpartition(':')
+    return host or DEFAULT_HOST, int(port)
+
+
+def is_loopback(host):
+    """Returns whether a host name or address refers to the local host only.
+
+    Parameters
+    ----------
+    host : str
+        Host name or IP address. An empty host listens on all interfaces.
+
+    Returns
+    -------
+    loopback : bool
+        True if only processes on the local host can connect.
+    """
+
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback if host else False
+    except (OSError, ValueError):
+        return False
+
+
+def generate_authkey():
+    """Returns a random shared secret for a broker and its workers.
+
+    Returns
+    -------
+    authkey : bytes
+        Hexadecimal secret of 32 characters, which can be passed on the command line.
+    """
+
+    return secrets.token_hex(16).encode()
+
+
+def _accept_workers(broker):
+    """Accepts workers until the broker is closed, each worker is served by its own thread."""
+
+    while not broker['closed'].is_set():
+        try:
+            connection = broker['listener'].accept()
+        except AuthenticationError:
+            continue
+        except OSError:
+            # listener was closed
+            return
+        if broker['closed'].is_set():
+            connection.close()
+            return
+
+        thread = threading.Thread(target=_serve_worker, args=(broker, connection), daemon=True)
+        with broker['lock']:
+            broker['workers'][id(connection)] = thread
+        thread.start()
+
+
+def _serve_worker(broker, connection):
+    """Sends tasks to one worker and collects its results. Runs in a thread of the broker."""
+
+    try:
+        connection.send(('config', broker['config']))
+
+        while not broker['closed'].is_set():
+            try:
+                item = broker['tasks'].get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                connection.send(('ping', ))
+                continue
+
+            # skip tasks of an earlier call
+            if item[0] != broker['call']:
+                continue
+
+            try:
+                connection.send(('task', item[2]))
+                status, result = _wait_for_result(connection, broker['heartbeat_timeout'])
+            except (EOFError, OSError, TimeoutError):
+                # worker was lost, hand the task to another worker
+                broker['tasks'].put(item)
+                return
+            broker['results'].put((item[0], item[1], status, result))
+
+        connection.send(('stop', ))
+    except (EOFError, OSError):
+        pass
+    finally:
+        connection.close()
+        with broker['lock']:
+            broker['workers'].pop(id(connection), None)
+
+
+def _wait_for_result(connection, heartbeat_timeout):
+    """Waits for the result of a task, raises TimeoutError if the worker stays silent for too long."""
+
+    while True:
+        if not connection.poll(heartbeat_timeout):
+            raise TimeoutError('worker sent no heartbeat for {}s'.format(heartbeat_timeout))
+
+        message = connection.recv()
+        if message[0] in ('result', 'error'):
+            return 'ok' if message[0] == 'result' else 'error', message[1]
+
+
+def _send_heartbeats(connection, send_lock, stop, interval):
+    """Sends heartbeats until stop is set. Runs in a thread of the worker."""
+
+    while not stop.wait(interval):
+        try:
+            with send_lock:
+                connection.send(('heartbeat', ))
+        except OSError:
+            return
+
+
+def _connect(address, authkey, connect_timeout):
+    """Connects to a broker, retrying until connect_timeout seconds passed."""
+
+    start = time.time()
+    while True:
+        try:
+            return Client(_connect_address(address), family='AF_INET', authkey=authkey)
+        except ConnectionRefusedError:
+            if time.time() - start > connect_timeout:
+                raise
+            time.sleep(1)
+
+
+def _connect_address(address):
+    """Returns the address to connect to a broker listening on address, a broker on all interfaces via localhost."""
+
+    host, port = address
+    return host if host not in ('', '0.0.0.0') else 'localhost', port
@@ -1,7 +1,7 @@
 from src.individual import _make_random_genome, get_dist, _make_size_dict, \
-    _interpolate_move_pattern, _make_limb_dict, _move_pattern_size, _normalize_move_pattern
+    _interpolate_move_pattern, _interpolate_move_patterns, _make_limb_dict, _move_pattern_size, _normalize_move_pattern
+from src.gene_pool import GenePool, SIZE_KEYS
 import numpy as np
-import random
 
 
 def crossing(pairs, gene_pool, evo_config):
@@ -16,12 +16,20 @@ def crossing(pairs, gene_pool, evo_config):
     ----------
     pairs : list
         Pairs of survivor indices.
-    gene_pool : list
+    gene_pool : list | GenePool
         List of genomes for all individuals.
     evo_config : dict
         Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    gene_pool_out : list | GenePool
+        Genomes of the new generation, of the same type as ``gene_pool``.
     """
 
+    if isinstance(gene_pool, GenePool):
+        return GenePool.from_genomes(crossing(pairs, gene_pool.to_genomes(), evo_config))
+
     mutation_prob_ind = evo_config['evolution']['mutation_prob_ind']
     mutation_prob_gene = evo_config['evolution']['mutation_prob_gene']
     mutation_prob_feature = evo_config['evolution']['mutation_prob_feature']
@@ -113,7 +121,107 @@ def crossing(pairs, gene_pool, evo_config):
     return gene_pool_out
 
 
-def fitness(pop, sim_id):
+def batch_crossing(pairs, gene_pool, evo_config, rng=None):
+    """Crossing of selected pairs for the entire population at once.
+
+    Vectorized version of :func:`src.evolution.crossing` producing children of the same distribution: sizes and move
+    pattern lengths and values are selected randomly within the limits given by :func:`src.evolution._limit`, both
+    parent patterns are resampled to the child's pattern length, mutation replaces single features by those of a random
+    genome and sizes are copied for symmetric individuals. Random genome features are only created for genes that
+    actually mutate.
+
+    Unlike :func:`src.evolution.crossing` the parent genomes are left untouched, i.e. the resampled patterns of a parent
+    are not carried over to the next pair that parent is part of.
+
+    Parameters
+    ----------
+    pairs : list
+        Pairs of survivor indices.
+    gene_pool : list | GenePool
+        Genomes for all individuals.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    rng : np.random.RandomState | None
+        Random number generator. If None, the global state of ``np.random`` is used.
+
+    Returns
+    -------
+    gene_pool_out : GenePool
+        Genomes of the new generation.
+    """
+
+    if rng is None:
+        rng = np.random
+
+    mutation_prob_ind = evo_config['evolution']['mutation_prob_ind']
+    mutation_prob_gene = evo_config['evolution']['mutation_prob_gene']
+    mutation_prob_feature = evo_config['evolution']['mutation_prob_feature']
+
+    if evo_config['individuals']['max_move_pattern_size'] is None:
+        max_move_pattern = evo_config['simulation']['fps'] * evo_config['simulation']['duration']
+    else:
+        max_move_pattern = evo_config['individuals']['max_move_pattern_size']
+
+    gene_pool = GenePool.from_genomes(gene_pool)
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    num_children = pairs.shape[0]
+
+    # assign probability for each genome to mutate
+    mutate_ind = rng.random_sample(num_children) < mutation_prob_ind
+
+    # crossing of sizes
+    sizes_0, sizes_1 = gene_pool.sizes[pairs[:, 0]], gene_pool.sizes[pairs[:, 1]]
+    sizes = _randoms_between(_limit((sizes_0 + sizes_1) / 2, sizes_0 - sizes_1, evo_config), rng)
+
+    mutate_sizes = mutate_ind[:, None, None] & (rng.random_sample(sizes.shape[:2] + (1, )) < mutation_prob_gene) & \
+        (rng.random_sample(sizes.shape) < mutation_prob_feature)
+    sizes[mutate_sizes] = _random_sizes(np.sum(mutate_sizes), evo_config, rng)
+
+    # make sure to not have sizes greater than 0
+    sizes[sizes <= 0] = 0.01
+
+    # assure symmetry if demanded
+    if evo_config['individuals']['symmetric']:
+        for left_key, right_key in [('left_hand', 'right_hand'), ('left_foot', 'right_foot')]:
+            sizes[:, SIZE_KEYS.index(right_key)] = sizes[:, SIZE_KEYS.index(left_key)]
+
+    # crossing of move pattern lengths including mutation
+    lengths_0, lengths_1 = gene_pool.pattern_lengths[pairs[:, 0]], gene_pool.pattern_lengths[pairs[:, 1]]
+    lengths = np.round(_randoms_between(_limit((lengths_0 + lengths_1) / 2, lengths_0 - lengths_1, evo_config),
+                                        rng)).astype(np.int64)
+
+    mutate_lengths = mutate_ind[:, None] & (rng.random_sample(lengths.shape) < mutation_prob_gene) & \
+        (rng.random_sample(lengths.shape) < mutation_prob_feature)
+    lengths[mutate_lengths] = _random_pattern_sizes(np.sum(mutate_lengths), evo_config, rng)
+    lengths = np.clip(lengths, 10, max_move_pattern)
+
+    # resample both parents to the length of the child and cross their patterns
+    patterns_0 = _interpolate_move_patterns(gene_pool.move_patterns, gene_pool.pattern_offsets[pairs[:, 0]],
+                                            lengths_0, lengths)
+    patterns_1 = _interpolate_move_patterns(gene_pool.move_patterns, gene_pool.pattern_offsets[pairs[:, 1]],
+                                            lengths_1, lengths)
+    patterns = _randoms_between(_limit((patterns_0 + patterns_1) / 2, patterns_0 - patterns_1, evo_config), rng)
+
+    # mutate move patterns, random patterns are created for mutating genes only
+    mutate_genes = mutate_ind[:, None] & (rng.random_sample(lengths.shape) < mutation_prob_gene)
+    if np.any(mutate_genes):
+        random_patterns = _random_patterns(lengths[mutate_genes], evo_config, rng)
+        in_mutate_genes = np.repeat(mutate_genes.reshape(-1), lengths.reshape(-1))
+        mutated = patterns[in_mutate_genes]
+        mutate_features = rng.random_sample(mutated.shape) < mutation_prob_feature
+        mutated[mutate_features] = random_patterns[mutate_features]
+        patterns[in_mutate_genes] = mutated
+
+    offsets = np.cumsum(lengths.reshape(-1)) - lengths.reshape(-1)
+
+    # make sure move patterns are normalized to sum to 2 pi if desired
+    if evo_config['individuals']['normalize_move_pattern']:
+        patterns = _normalize_patterns(patterns, offsets, lengths.reshape(-1))
+
+    return GenePool(sizes, patterns, offsets, lengths)
+
+
+def fitness(pop, sim_id, stopped=None):
     """Compute fitness for the entire population based on how far each individual moved.
 
     Parameters
@@ -122,6 +230,9 @@ def fitness(pop, sim_id):
         List of ind_ids for multiple individuals.
     sim_id : int
         Index pointing to the physics server of the respective simulation.
+    stopped : dict | None
+        Fitness of individuals that were stopped early and are no longer part of the simulation. See
+        :func:`src.simulation.simulate_pop`.
 
     Returns
     -------
@@ -130,20 +241,49 @@ def fitness(pop, sim_id):
         simulation.
     """
 
+    if stopped is None:
+        stopped = {}
+
     # compute fitness as distance to origin
-    return [get_dist(ind, sim_id) for ind in pop]
+    return [stopped[ind] if ind in stopped else get_dist(ind, sim_id) for ind in pop]
 
 
-def selection(sorted_pop):
+def selection_cutoff(fitness_pop):
+    """Compute the fitness an individual needs to be considered by :func:`src.evolution.selection`.
+
+    Selection only picks from the best half of the population, so the fitness of the individual ranked right behind
+    is used as cutoff for early stopping in the next generation.
+
+    Parameters
+    ----------
+    fitness_pop : list
+        Fitness for each individual in the population.
+
+    Returns
+    -------
+    cutoff : float
+        Fitness of the worst individual that can still be selected.
+    """
+
+    num_survivors = int(0.5 * len(fitness_pop))
+    return np.sort(fitness_pop)[::-1][num_survivors]
+
+
+def selection(sorted_pop, rng=None):
     """Select individuals based on performance (i.e. fitness).
 
     By default as many individuals survive as half the size of the population. From those as many randomly assigned
     pairs are selected as there were individuals in the original population.
 
+    Each survivor is paired with a partner drawn uniformly from the other distinct survivors. Partners are drawn for all
+    survivors at once, which keeps selection at O(n log n) for large populations.
+
     Parameters
     ----------
-    sorted_pop : list
+    sorted_pop : list | np.array
         List of individuals of one population, sorted descending with respect to fitness.
+    rng : np.random.RandomState | None
+        Random number generator. If None, the global state of ``np.random`` is used.
 
     Returns
     -------
@@ -152,8 +292,75 @@ def selection(sorted_pop):
 
     """
 
+    if rng is None:
+        rng = np.random
+
+    survivor_ids = np.tile(_survivor_ids(len(sorted_pop), rng), 2)  # to ensure population length
+
+    # pair each survivor with one randomly chosen survivor from the difference-set
+    # between the selected survivor and the others: draw from all but one distinct survivor and skip the survivor itself
+    distinct_ids = np.unique(survivor_ids)
+    own_positions = np.searchsorted(distinct_ids, survivor_ids)
+    partner_positions = rng.randint(0, len(distinct_ids) - 1, size=len(survivor_ids))
+    partner_positions += partner_positions >= own_positions
+
+    sorted_pop = np.asarray(sorted_pop)
+    return list(zip(sorted_pop[survivor_ids], sorted_pop[distinct_ids[partner_positions]]))
+
+
+def select_pair(sorted_pop, rng=None):
+    """Select a single pair of individuals, e.g. to breed one child at a time.
+
+    The pair follows the same distribution as each pair returned by :func:`src.evolution.selection`, but only the
+    survivors and a single partner are drawn instead of a partner for each individual of the population.
+
+    Parameters
+    ----------
+    sorted_pop : list | np.array
+        List of individuals of one population, sorted descending with respect to fitness.
+    rng : np.random.RandomState | None
+        Random number generator. If None, the global state of ``np.random`` is used.
+
+    Returns
+    -------
+    pair : tuple
+        Survivor and its partner.
+    """
+
+    if rng is None:
+        rng = np.random
+
+    survivor_ids = _survivor_ids(len(sorted_pop), rng)
+
+    # the partner is drawn uniformly from the other distinct survivors, like in selection
+    distinct_ids = np.unique(survivor_ids)
+    partner_position = rng.randint(0, len(distinct_ids) - 1)
+    partner_position += partner_position >= np.searchsorted(distinct_ids, survivor_ids[0])
+
+    return sorted_pop[survivor_ids[0]], sorted_pop[distinct_ids[partner_position]]
+
+
+def _survivor_ids(num_individuals, rng):
+    """Draws the ranks of the survivors of a population, at least two of them distinct. See
+    :func:`src.evolution.selection`.
+
+    Parameters
+    ----------
+    num_individuals : int
+        Size of the population.
+    rng : np.random.RandomState | module
+        Random number generator.
+
+    Returns
+    -------
+    survivor_ids : np.array
+        Ranks of half as many survivors as there are individuals.
+    """
+
     # want to keep 50% of the pop
-    num_survivors = int(0.5 * len(sorted_pop))
+    num_survivors = int(0.5 * num_individuals)
+    if num_survivors < 2:
+        raise ValueError('Selection needs a population of at least 4 individuals, got {}.'.format(num_individuals))
 
     # calcul of select and k and value of coeff
     # from "Concepts fondamentaux des algorithmes evolutionnistes"
@@ -161,23 +368,14 @@ def selection(sorted_pop):
     coeff = 1.1
     k = coeff ** (num_survivors + 1) - 1
 
-    survivor_ids = list(np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * np.random.rand(
-        num_survivors) + 1)))
+    survivor_ids = np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * rng.random_sample(
+        num_survivors) + 1)).astype(np.int64)
 
     while np.unique(survivor_ids).shape[0] < 2:
-        survivor_ids = list(np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * np.random.rand(
-            num_survivors) + 1)))
-
-    survivor_ids *= 2  # to ensure population length
+        survivor_ids = np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * rng.random_sample(
+            num_survivors) + 1)).astype(np.int64)
 
-    pairs = []
-    for this_survivor_id in survivor_ids:
-        # pair each survivor with one randomly chosen survivor from the difference-set
-        # between the selected survivor and the others
-        not_this_survivor_ids = np.setdiff1d(survivor_ids, this_survivor_id)
-        not_this_survivor_id = int(random.choice(not_this_survivor_ids))
-        pairs.append((sorted_pop[int(this_survivor_id)], sorted_pop[not_this_survivor_id]))
-    return pairs
+    return survivor_ids
 
 
 def _limit(mid, diff, evo_config):
@@ -213,20 +411,25 @@ def _limit(mid, diff, evo_config):
     return limits
 
 
-def _randoms_between(limits):
+def _randoms_between(limits, rng=None):
     """Selects random value within a given range.
 
     Parameters
     ----------
     limits : list | tuple
         Upper and lower limit.
+    rng : np.random.RandomState | None
+        Random number generator. If None, the global state of ``np.random`` is used.
 
     Returns
     -------
-    rand_in_limits : float
+    rand_in_limits : np.array
         Random value selected from range between limits.
     """
 
+    if rng is None:
+        rng = np.random
+
     lows = np.array(limits[0])
     highs = np.array(limits[1])
     # abs difference to shift random distribution that is natively between 0 and 1
@@ -234,7 +437,7 @@ def _randoms_between(limits):
     # Example: if you want random values between 1 and 3 you say: rand * 2 + 1, etc
 
     # array of random values between 0 and 1
-    rand_values = np.random.rand(len(highs))  # len(high) == len(low)
+    rand_values = rng.random_sample(highs.shape)  # highs.shape == lows.shape
     differences = highs - lows
     # random values between lower bound of limits and bound of limits + abs_difference
     rand_in_limits = (rand_values * differences) + lows
@@ -242,6 +445,115 @@ def _randoms_between(limits):
     return rand_in_limits
 
 
+def _random_sizes(num_features, evo_config, rng):
+    """Creates box size features as :func:`src.individual._make_size_dict` does.
+
+    Parameters
+    ----------
+    num_features : int
+        Number of features to create.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    rng : np.random.RandomState
+        Random number generator.
+
+    Returns
+    -------
+    sizes : np.array
+        Random box sizes.
+    """
+
+    min_size = evo_config['individuals']['min_box_size']
+    max_size = evo_config['individuals']['max_box_size']
+
+    if evo_config['individuals']['random_box_size']:
+        return rng.random_sample(num_features) * (max_size - min_size) + min_size
+    else:
+        return np.full(num_features, (max_size + min_size) / 2)
+
+
+def _random_pattern_sizes(num_patterns, evo_config, rng):
+    """Creates move pattern lengths as :func:`src.individual._move_pattern_size` does.
+
+    Parameters
+    ----------
+    num_patterns : int
+        Number of lengths to create.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    rng : np.random.RandomState
+        Random number generator.
+
+    Returns
+    -------
+    pattern_lengths : np.array
+        Lengths of the movement patterns.
+    """
+
+    pattern_length = evo_config['individuals']['start_move_pattern_size']
+
+    # compute size of movement pattern (jitter of +- 50%)
+    if evo_config['individuals']['vary_pattern_length']:
+        return (pattern_length * (1.5 - rng.random_sample(num_patterns))).astype(np.int64)
+    else:
+        return np.full(num_patterns, pattern_length, dtype=np.int64)
+
+
+def _random_patterns(new_lengths, evo_config, rng):
+    """Creates random move patterns as :func:`src.individual._make_move_pattern` does and resamples them.
+
+    Each pattern is created with a random length and then resampled to the requested length, as done for the random
+    genome used for mutation in :func:`src.evolution.crossing`.
+
+    Parameters
+    ----------
+    new_lengths : np.array
+        Lengths the patterns are resampled to.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    rng : np.random.RandomState
+        Random number generator.
+
+    Returns
+    -------
+    patterns : np.array
+        Concatenated move patterns.
+    """
+
+    lengths = _random_pattern_sizes(len(new_lengths), evo_config, rng)
+    offsets = np.cumsum(lengths) - lengths
+    patterns = rng.random_sample(np.sum(lengths)) * 2 * np.pi - np.pi
+
+    # rescale step sizes to make the absolute values summing up to 2 pi
+    if evo_config['individuals']['normalize_move_pattern']:
+        patterns = _normalize_patterns(patterns, offsets, lengths)
+
+    return _interpolate_move_patterns(patterns, offsets, lengths, new_lengths)
+
+
+def _normalize_patterns(patterns, offsets, lengths, max_val=2 * np.pi):
+    """Normalizes concatenated move patterns. See :func:`src.individual._normalize_move_pattern`.
+
+    Parameters
+    ----------
+    patterns : np.array
+        Concatenated move patterns.
+    offsets : np.array
+        Start of each pattern.
+    lengths : np.array
+        Length of each pattern.
+    max_val : float
+        Maximum value to which all absolute values of a pattern will sum up to.
+
+    Returns
+    -------
+    patterns : np.array
+        Normalized move patterns.
+    """
+
+    return patterns / np.repeat(np.add.reduceat(np.abs(patterns), offsets), lengths) * max_val
+
+
 def _make_random_gene_pool(evo_config):
     """Create random gene pool for as many individuals as specified in the evolution configuration.
 
@@ -0,0 +1,155 @@
+from src.individual import _make_limb_dict
+import numpy as np
+
+# order of genes within the arrays of a gene pool
+SIZE_KEYS = ('left_hand', 'right_hand', 'left_foot', 'right_foot', 'chest', 'hip')
+MOVE_KEYS = tuple(_make_limb_dict().keys())
+
+
+class GenePool:
+    """Genomes of all individuals stored as contiguous arrays.
+
+    A genome in its legacy format is a tuple of a size dictionary and a move pattern dictionary holding one small numpy
+    array per gene (see :func:`src.individual._make_random_genome`). For large populations pickling, copying and
+    sending those objects to worker processes is dominated by Python overhead. A ``GenePool`` stores the same data in a
+    few arrays instead:
+
+    * ``sizes``: box sizes of shape (n, 6, 3), genes ordered as in ``SIZE_KEYS``
+    * ``move_patterns``: all move patterns concatenated into one flat array
+    * ``pattern_offsets``: start of each move pattern within ``move_patterns`` of shape (n, 10), genes ordered as in
+      ``MOVE_KEYS``
+    * ``pattern_lengths``: length of each move pattern of shape (n, 10)
+
+    Single genomes are returned in the legacy format, hence a ``GenePool`` can be used wherever a list of genomes is
+    expected (indexing, iterating, ``len``).
+
+    Parameters
+    ----------
+    sizes : np.array
+        Box sizes of shape (n, 6, 3).
+    move_patterns : np.array
+        Flat array of all move patterns.
+    pattern_offsets : np.array
+        Start index of each move pattern of shape (n, 10).
+    pattern_lengths : np.array
+        Length of each move pattern of shape (n, 10).
+    """
+
+    def __init__(self, sizes, move_patterns, pattern_offsets, pattern_lengths):
+        self.sizes = np.asarray(sizes, dtype=float).reshape(-1, len(SIZE_KEYS), 3)
+        self.move_patterns = np.asarray(move_patterns, dtype=float)
+        self.pattern_offsets = np.asarray(pattern_offsets, dtype=np.int64).reshape(-1, len(MOVE_KEYS))
+        self.pattern_lengths = np.asarray(pattern_lengths, dtype=np.int64).reshape(-1, len(MOVE_KEYS))
+
+    @classmethod
+    def from_genomes(cls, genomes):
+        """Creates a gene pool from genomes in the legacy format.
+
+        Parameters
+        ----------
+        genomes : list
+            List of genomes, each containing dictionaries for size and move pattern.
+
+        Returns
+        -------
+        gene_pool : GenePool
+            Gene pool storing all genomes.
+        """
+
+        if isinstance(genomes, GenePool):
+            return genomes
+
+        sizes = np.array([[genome[0][key] for key in SIZE_KEYS] for genome in genomes], dtype=float)
+        patterns = [np.asarray(genome[1][key], dtype=float) for genome in genomes for key in MOVE_KEYS]
+        pattern_lengths = np.array([len(pattern) for pattern in patterns], dtype=np.int64)
+        pattern_offsets = np.cumsum(pattern_lengths) - pattern_lengths
+        move_patterns = np.concatenate(patterns) if len(patterns) > 0 else np.zeros(0)
+
+        return cls(sizes, move_patterns, pattern_offsets, pattern_lengths)
+
+    @classmethod
+    def concatenate(cls, gene_pools):
+        """Joins several gene pools into one.
+
+        Parameters
+        ----------
+        gene_pools : list
+            Gene pools (or lists of genomes) to join, in order.
+
+        Returns
+        -------
+        gene_pool : GenePool
+            Gene pool holding the individuals of all gene pools.
+        """
+
+        gene_pools = [cls.from_genomes(gene_pool) for gene_pool in gene_pools]
+
+        # offsets of each gene pool are shifted behind the move patterns of the gene pools before
+        starts = np.cumsum([0] + [len(gene_pool.move_patterns) for gene_pool in gene_pools[:-1]])
+        return cls(np.concatenate([gene_pool.sizes for gene_pool in gene_pools]),
+                   np.concatenate([gene_pool.move_patterns for gene_pool in gene_pools]),
+                   np.concatenate([gene_pool.pattern_offsets + start for gene_pool, start in zip(gene_pools, starts)]),
+                   np.concatenate([gene_pool.pattern_lengths for gene_pool in gene_pools]))
+
+    def to_genomes(self):
+        """Converts the gene pool to genomes in the legacy format.
+
+        Returns
+        -------
+        genomes : list
+            List of genomes, each containing dictionaries for size and move pattern.
+        """
+
+        return [self[idx] for idx in range(len(self))]
+
+    def take(self, indices):
+        """Selects individuals from the gene pool.
+
+        Parameters
+        ----------
+        indices : list | np.array
+            Indices of the individuals to select, may contain duplicates.
+
+        Returns
+        -------
+        gene_pool : GenePool
+            Gene pool holding copies of the selected individuals.
+        """
+
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        pattern_lengths = self.pattern_lengths[indices]
+
+        # gather the move patterns of all selected individuals into a new flat array
+        starts = self.pattern_offsets[indices].reshape(-1)
+        lengths = pattern_lengths.reshape(-1)
+        pattern_offsets = np.cumsum(lengths) - lengths
+        gather = np.repeat(starts - pattern_offsets, lengths) + np.arange(np.sum(lengths))
+
+        return GenePool(self.sizes[indices], self.move_patterns[gather], pattern_offsets, pattern_lengths)
+
+    @property
+    def nbytes(self):
+        """int: Number of bytes occupied by the arrays of the gene pool."""
+
+        return self.sizes.nbytes + self.move_patterns.nbytes + self.pattern_offsets.nbytes + \
+            self.pattern_lengths.nbytes
+
+    def __len__(self):
+        return self.sizes.shape[0]
+
+    def __getitem__(self, item):
+        """Returns a single genome in the legacy format or a new gene pool if sliced."""
+
+        if isinstance(item, slice):
+            return self.take(np.arange(len(self))[item])
+        if not np.isscalar(item):
+            return self.take(item)
+
+        size_dict = {key: self.sizes[item, idx].copy() for idx, key in enumerate(SIZE_KEYS)}
+        move_dict = {key: self.move_patterns[offset:offset + length].copy()
+                     for key, offset, length in zip(MOVE_KEYS, self.pattern_offsets[item], self.pattern_lengths[item])}
+        return size_dict, move_dict
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
@@ -0,0 +1,357 @@
+from src.gene_pool import GenePool, SIZE_KEYS, MOVE_KEYS
+from src.gene_pool_file import PRECISIONS, GENE_POOL_HEADER_SIZE, _header, _read_header, _shuffle_bytes, \
+    _unshuffle_bytes
+from src.checkpoint import atomic_write
+import numpy as np
+import contextlib
+import hashlib
+import mmap
+import zlib
+import os
+
+# archived gene pools use the header layout of gene pool files with their own magic, followed by fixed size records
+ARCHIVE_MAGIC = b'LPGPREFS'
+PACK_MAGIC = b'LPGPPACK'
+PACK_FILE = 'gene_pools.pack'
+
+# each chunk within a pack holds the move patterns of one individual and starts with this header
+CHUNK_HEADER = np.dtype([('key', 'u1', (20, )), ('itemsize', '<u4'), ('depth', '<u4'),
+                         ('lengths', '<u4', (len(MOVE_KEYS), )), ('reference', '<u8'), ('size', '<u8')])
+
+# maximum number of deltas applied to restore an individual
+MAX_DELTA_DEPTH = 10
+
+# number of samples per move pattern used to find the most similar individual of the reference generation
+SIGNATURE_SIZE = 16
+
+# chunk index of each pack file, extended by chunks appended since it was built
+_pack_indices = {}
+
+
+def save_archived_gene_pool(gene_pool, filename='gen_0.gpr', reference=None, precision='float32'):
+    """Archives a gene pool as content addressed chunks, stored as deltas against an earlier generation.
+
+    All archived gene pools of an evolution directory share one pack file (``gene_pools.pack``), which holds the move
+    patterns of each individual as a compressed chunk addressed by the hash of its values. Individuals that were
+    archived before (e.g. a generation that is saved again) only refer to the existing chunk. Others are stored as
+    bitwise difference (xor) to the most similar individual of the reference generation, which compresses better than
+    the values themselves since children resemble their parents. At most ``MAX_DELTA_DEPTH`` deltas are chained,
+    afterwards an individual is stored in full again, such that any generation is restored quickly.
+
+    The archived gene pool itself (``filename``) only holds box sizes, move pattern lengths and the chunk position of
+    each individual. Chunks are appended to the pack before the archived gene pool is replaced atomically.
+
+    Parameters
+    ----------
+    gene_pool : GenePool | list
+        Genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    filename : str
+        Filename to save the data to. The pack file is located in the same directory.
+    reference : str | None
+        Archived gene pool within the same directory to compute deltas against, usually the previous generation. If
+        None, all new individuals are stored in full.
+    precision : str
+        Either 'float32' or 'float64'.
+    """
+
+    if precision not in PRECISIONS:
+        raise ValueError('Unknown precision {}, use one of {}.'.format(precision, ', '.join(PRECISIONS)))
+
+    gene_pool = GenePool.from_genomes(gene_pool)
+    dtype = np.dtype(PRECISIONS[precision])
+    pack_file = os.path.join(os.path.dirname(os.path.abspath(filename)), PACK_FILE)
+
+    # the most similar individual of the reference generation is found by comparing a few samples of each pattern
+    closest = None
+    if reference is not None:
+        reference_pool, reference_chunks = _load_archive(reference, None, with_chunks=True)
+        if len(reference_pool) > 0 and len(gene_pool) > 0:
+            signatures, reference_signatures = _signatures(gene_pool), _signatures(reference_pool)
+            distances = np.sum(signatures ** 2, axis=-1)[:, None] - 2 * signatures @ reference_signatures.T + \
+                np.sum(reference_signatures ** 2, axis=-1)[None, :]
+            closest = np.argmin(distances, axis=-1)
+
+    chunks = np.zeros(len(gene_pool), dtype='<u8')
+    with _open_pack(pack_file) as (pack, index):
+        for idx in range(len(gene_pool)):
+            lengths = gene_pool.pattern_lengths[idx].astype('<u4')
+            values = _individual_patterns(gene_pool, idx).astype(dtype)
+            key = hashlib.sha1(dtype.str.encode() + lengths.tobytes() + values.tobytes()).digest()
+
+            if key not in index:
+                base = None
+                if closest is not None:
+                    base = (int(reference_chunks[closest[idx]]), reference_pool.pattern_lengths[closest[idx]],
+                            _individual_patterns(reference_pool, closest[idx]).astype(dtype))
+                index[key] = _append_chunk(pack, key, lengths, values, base)
+            chunks[idx] = index[key]
+
+        pack.flush()
+        os.fsync(pack.fileno())
+
+    records = np.zeros(len(gene_pool), dtype=_record_dtype(dtype))
+    records['sizes'] = gene_pool.sizes.reshape(len(gene_pool), -1)
+    records['lengths'] = gene_pool.pattern_lengths
+    records['chunk'] = chunks
+
+    def write(archive_file):
+        archive_file.write(_header(ARCHIVE_MAGIC, dtype, len(gene_pool)))
+        archive_file.write(records.tobytes())
+
+    atomic_write(filename, write)
+
+
+def load_archived_gene_pool(filename='gen_0.gpr', indices=None):
+    """Restores all or selected individuals of an archived gene pool.
+
+    Only the move patterns of the selected individuals and the chunks they were computed from are read from the pack
+    file.
+
+    Parameters
+    ----------
+    filename : str
+        Filename written by :func:`src.gene_pool_archive.save_archived_gene_pool`.
+    indices : list | np.array | None
+        Indices of the individuals to load, may contain duplicates. If None, all individuals are loaded.
+
+    Returns
+    -------
+    gene_pool : GenePool
+        Genomes of the selected individuals in the given order.
+    """
+
+    return _load_archive(filename, indices)
+
+
+def archived_gene_pool_size(filename='gen_0.gpr'):
+    """Returns the number of individuals within an archived gene pool by reading its header.
+
+    Parameters
+    ----------
+    filename : str
+        Filename written by :func:`src.gene_pool_archive.save_archived_gene_pool`.
+
+    Returns
+    -------
+    num_individuals : int
+        Number of individuals.
+    """
+
+    with open(filename, 'rb') as archive_file:
+        return _read_header(archive_file.read(GENE_POOL_HEADER_SIZE), filename, magic=ARCHIVE_MAGIC)[1]
+
+
+def is_archived_gene_pool(filename):
+    """Checks whether a file starts with the header of an archived gene pool.
+
+    Parameters
+    ----------
+    filename : str
+        Filename to check.
+
+    Returns
+    -------
+    is_archived_gene_pool : bool
+        True for files written by :func:`src.gene_pool_archive.save_archived_gene_pool`.
+    """
+
+    with open(filename, 'rb') as archive_file:
+        return archive_file.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def _load_archive(filename, indices, with_chunks=False):
+    """Restores selected individuals of an archived gene pool and optionally returns their chunk positions as well."""
+
+    with open(filename, 'rb') as archive_file:
+        dtype, num_individuals = _read_header(archive_file.read(GENE_POOL_HEADER_SIZE), filename, magic=ARCHIVE_MAGIC)
+
+    if indices is None:
+        indices = np.arange(num_individuals)
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+    if np.any(indices < -num_individuals) or np.any(indices >= num_individuals):
+        raise IndexError('Index out of range for gene pool of {} individuals.'.format(num_individuals))
+
+    if num_individuals == 0 or len(indices) == 0:
+        records = np.zeros(0, dtype=_record_dtype(dtype))
+    else:
+        records = np.array(np.memmap(filename, dtype=_record_dtype(dtype), mode='r', offset=GENE_POOL_HEADER_SIZE,
+                                     shape=(num_individuals, ))[indices])
+
+    patterns = []
+    if len(records) > 0:
+        pack_file = os.path.join(os.path.dirname(os.path.abspath(filename)), PACK_FILE)
+        with open(pack_file, 'rb') as pack, mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ) as pack_map:
+            restored = {}
+            patterns = [_restore_chunk(pack_map, int(chunk), restored)[1] for chunk in records['chunk']]
+
+    pattern_lengths = records['lengths'].astype(np.int64).reshape(-1, len(MOVE_KEYS))
+    pattern_offsets = (np.cumsum(pattern_lengths) - pattern_lengths.reshape(-1)).reshape(pattern_lengths.shape)
+    move_patterns = np.concatenate(patterns).astype(float) if len(patterns) > 0 else np.zeros(0)
+    gene_pool = GenePool(records['sizes'].astype(float), move_patterns, pattern_offsets, pattern_lengths)
+
+    if with_chunks:
+        return gene_pool, records['chunk']
+    return gene_pool
+
+
+def _record_dtype(dtype):
+    """Returns the record of one individual within an archived gene pool."""
+
+    return np.dtype([('sizes', dtype, (len(SIZE_KEYS) * 3, )), ('lengths', '<u4', (len(MOVE_KEYS), )),
+                     ('chunk', '<u8')])
+
+
+def _individual_patterns(gene_pool, idx):
+    """Returns the concatenated move patterns of the idx-th individual of a gene pool."""
+
+    start = gene_pool.pattern_offsets[idx, 0]
+    return gene_pool.move_patterns[start:start + np.sum(gene_pool.pattern_lengths[idx])]
+
+
+def _signatures(gene_pool):
+    """Samples each move pattern at ``SIGNATURE_SIZE`` positions, returns an array of shape (n, 10 * samples)."""
+
+    positions = (np.arange(SIGNATURE_SIZE)[None, None, :] * gene_pool.pattern_lengths[:, :, None]) // SIGNATURE_SIZE
+    if len(gene_pool.move_patterns) == 0:
+        return np.zeros((len(gene_pool), positions.shape[1] * SIGNATURE_SIZE))
+    return gene_pool.move_patterns[gene_pool.pattern_offsets[:, :, None] + positions].reshape(len(gene_pool), -1)
+
+
+def _resample(values, lengths, new_lengths):
+    """Resamples concatenated move patterns to new lengths by nearest indices, using integer arithmetic only.
+
+    Parameters
+    ----------
+    values : np.array
+        Concatenated move patterns.
+    lengths : np.array
+        Length of each move pattern within values.
+    new_lengths : np.array
+        Length of each resampled move pattern.
+
+    Returns
+    -------
+    resampled : np.array
+        Concatenated resampled move patterns.
+    """
+
+    lengths, new_lengths = np.asarray(lengths, dtype=np.int64), np.asarray(new_lengths, dtype=np.int64)
+    genes = np.repeat(np.arange(len(new_lengths)), new_lengths)
+    positions = np.arange(np.sum(new_lengths)) - np.repeat(np.cumsum(new_lengths) - new_lengths, new_lengths)
+    offsets = np.cumsum(lengths) - lengths
+    return values[offsets[genes] + (positions * lengths[genes]) // new_lengths[genes]]
+
+
+@contextlib.contextmanager
+def _open_pack(pack_file):
+    """Opens a pack file for appending chunks and yields it together with its chunk index.
+
+    The index maps the key of each chunk to its position in the pack and is kept between calls. An incomplete chunk at
+    the end of the pack (e.g. if the evolution was killed while writing) is removed.
+    """
+
+    if not os.path.isfile(pack_file):
+        with open(pack_file, 'wb') as pack:
+            pack.write(PACK_MAGIC)
+
+    with open(pack_file, 'r+b') as pack:
+        if pack.read(len(PACK_MAGIC)) != PACK_MAGIC:
+            raise ValueError('{} is not a gene pool pack.'.format(pack_file))
+
+        # continue indexing where the last call stopped, start over if the pack was replaced meanwhile
+        stat = os.fstat(pack.fileno())
+        identity, end = (stat.st_dev, stat.st_ino), stat.st_size
+        cached_identity, scanned, index = _pack_indices.get(os.path.abspath(pack_file), (None, len(PACK_MAGIC), {}))
+        if cached_identity != identity or scanned > end:
+            scanned, index = len(PACK_MAGIC), {}
+
+        while scanned + CHUNK_HEADER.itemsize <= end:
+            header = _chunk_header(pack, scanned)
+            if scanned + CHUNK_HEADER.itemsize + int(header['size']) > end:
+                break
+            index[header['key'].tobytes()] = scanned
+            scanned += CHUNK_HEADER.itemsize + int(header['size'])
+
+        if scanned < end:
+            pack.truncate(scanned)
+
+        pack.seek(scanned)
+        try:
+            yield pack, index
+        finally:
+            _pack_indices[os.path.abspath(pack_file)] = (identity, pack.tell(), index)
+
+
+def _append_chunk(pack, key, lengths, values, base=None):
+    """Appends the move patterns of an individual to an open pack, as delta to base if given.
+
+    Parameters
+    ----------
+    pack : file
+        Pack file opened by :func:`src.gene_pool_archive._open_pack`, positioned at its end.
+    key : bytes
+        Hash of the move pattern lengths and values.
+    lengths : np.array
+        Length of each move pattern.
+    values : np.array
+        Concatenated move patterns with the precision to store.
+    base : tuple | None
+        Chunk position, move pattern lengths and concatenated move patterns of the individual to compute the delta
+        against.
+
+    Returns
+    -------
+    position : int
+        Position of the chunk within the pack.
+    """
+
+    dtype, reference, depth = values.dtype, 0, 0
+    bits = values.view('<u{}'.format(dtype.itemsize))
+
+    if base is not None:
+        base_header = _chunk_header(pack, base[0])
+        if base_header['itemsize'] == dtype.itemsize and base_header['depth'] < MAX_DELTA_DEPTH and \
+                not np.any((base[1] == 0) & (lengths > 0)):
+            bits = bits ^ _resample(base[2], base[1], lengths).view(bits.dtype)
+            reference, depth = base[0], int(base_header['depth']) + 1
+
+    payload = zlib.compress(_shuffle_bytes(bits), 9)
+    header = np.zeros(1, dtype=CHUNK_HEADER)
+    header['key'] = np.frombuffer(key, dtype=np.uint8)
+    header['itemsize'], header['depth'], header['lengths'] = dtype.itemsize, depth, lengths
+    header['reference'], header['size'] = reference, len(payload)
+
+    position = pack.tell()
+    pack.write(header.tobytes())
+    pack.write(payload)
+    return position
+
+
+def _chunk_header(pack, position):
+    """Reads the header of a chunk from an open pack without changing the current position."""
+
+    current = pack.tell()
+    pack.seek(position)
+    header = np.frombuffer(pack.read(CHUNK_HEADER.itemsize), dtype=CHUNK_HEADER)[0]
+    pack.seek(current)
+    return header
+
+
+def _restore_chunk(pack_map, position, restored):
+    """Restores move pattern lengths and values of a chunk by applying all deltas, caching results in ``restored``."""
+
+    if position in restored:
+        return restored[position]
+
+    start = position + CHUNK_HEADER.itemsize
+    header = np.frombuffer(pack_map[position:start], dtype=CHUNK_HEADER)[0]
+    lengths = header['lengths'].astype(np.int64)
+    bits = _unshuffle_bytes(zlib.decompress(pack_map[start:start + int(header['size'])]),
+                            np.dtype('<u{}'.format(header['itemsize'])))
+
+    if header['reference'] != 0:
+        base_lengths, base = _restore_chunk(pack_map, int(header['reference']), restored)
+        bits = bits ^ _resample(base, base_lengths, lengths).view(bits.dtype)
+
+    restored[position] = (lengths, bits.view('<f{}'.format(header['itemsize'])))
+    return restored[position]
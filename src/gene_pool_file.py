@@ -0,0 +1,208 @@
+from src.gene_pool import GenePool, SIZE_KEYS, MOVE_KEYS
+from src.checkpoint import atomic_write
+import numpy as np
+import mmap
+import zlib
+
+# gene pool files start with this magic followed by the format version and the number of bytes per value as uint32
+# and the number of individuals as uint64
+GENE_POOL_MAGIC = b'LPGENEPL'
+GENE_POOL_VERSION = 1
+GENE_POOL_HEADER_SIZE = len(GENE_POOL_MAGIC) + 16
+PRECISIONS = {'float32': '<f4', 'float64': '<f8'}
+
+
+def save_gene_pool_file(gene_pool, filename='gen_0.gp', precision='float32'):
+    """Writes a gene pool to a compressed file with random access to single individuals.
+
+    The file holds a header, an index with the position and size of each record and one zlib compressed record per
+    individual. A record stores the lengths of the move patterns, the box sizes and the move patterns of one individual.
+    Values are stored as float32 by default, which halves the file size compared to pickled float64 arrays, or as
+    float64 to store the genomes exactly. Before compressing, the bytes of all values are grouped by significance, such
+    that the slowly varying sign, exponent and leading mantissa bytes compress well. The file is replaced atomically.
+
+    Parameters
+    ----------
+    gene_pool : GenePool | list
+        Genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    filename : str
+        Filename to save the data to.
+    precision : str
+        Either 'float32' or 'float64'.
+    """
+
+    if precision not in PRECISIONS:
+        raise ValueError('Unknown precision {}, use one of {}.'.format(precision, ', '.join(PRECISIONS)))
+
+    gene_pool = GenePool.from_genomes(gene_pool)
+    dtype = np.dtype(PRECISIONS[precision])
+
+    records = [_compress_record(gene_pool, idx, dtype) for idx in range(len(gene_pool))]
+    record_sizes = np.array([len(record) for record in records], dtype='<u8')
+    index_size = 16 * len(records)
+    offsets = GENE_POOL_HEADER_SIZE + index_size + np.cumsum(record_sizes) - record_sizes
+
+    def write(gp_file):
+        gp_file.write(_header(GENE_POOL_MAGIC, dtype, len(records)))
+        gp_file.write(np.stack([offsets, record_sizes], axis=-1).astype('<u8').tobytes())
+        for record in records:
+            gp_file.write(record)
+
+    atomic_write(filename, write)
+
+
+def load_gene_pool_file(filename='gen_0.gp', indices=None):
+    """Loads all or selected individuals from a gene pool file.
+
+    The file is memory mapped and only the records of the selected individuals are read and decompressed, hence loading
+    a single individual does not depend on the size of the gene pool.
+
+    Parameters
+    ----------
+    filename : str
+        Filename written by :func:`src.gene_pool_file.save_gene_pool_file`.
+    indices : list | np.array | None
+        Indices of the individuals to load, may contain duplicates. If None, all individuals are loaded.
+
+    Returns
+    -------
+    gene_pool : GenePool
+        Genomes of the selected individuals in the given order.
+    """
+
+    with open(filename, 'rb') as gp_file, mmap.mmap(gp_file.fileno(), 0, access=mmap.ACCESS_READ) as gp_map:
+        dtype, num_individuals = _read_header(gp_map, filename)
+        index = np.frombuffer(gp_map, dtype='<u8', count=2 * num_individuals,
+                              offset=GENE_POOL_HEADER_SIZE).reshape(-1, 2)
+
+        if indices is None:
+            indices = np.arange(num_individuals)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if np.any(indices < -num_individuals) or np.any(indices >= num_individuals):
+            raise IndexError('Index out of range for gene pool of {} individuals.'.format(num_individuals))
+
+        records = []
+        for idx in indices:
+            offset, size = index[idx]
+            records.append(_decompress_record(gp_map[int(offset):int(offset + size)], dtype))
+
+        # the index must not be used once the file is unmapped
+        del index
+
+    sizes = np.array([record[0] for record in records], dtype=float).reshape(-1, len(SIZE_KEYS), 3)
+    pattern_lengths = np.array([record[1] for record in records], dtype=np.int64).reshape(-1, len(MOVE_KEYS))
+    pattern_offsets = (np.cumsum(pattern_lengths) - pattern_lengths.reshape(-1)).reshape(pattern_lengths.shape)
+    move_patterns = np.concatenate([record[2] for record in records]) if len(records) > 0 else np.zeros(0)
+
+    return GenePool(sizes, move_patterns, pattern_offsets, pattern_lengths)
+
+
+def gene_pool_file_size(filename='gen_0.gp'):
+    """Returns the number of individuals within a gene pool file by reading its header.
+
+    Parameters
+    ----------
+    filename : str
+        Filename written by :func:`src.gene_pool_file.save_gene_pool_file`.
+
+    Returns
+    -------
+    num_individuals : int
+        Number of individuals.
+    """
+
+    with open(filename, 'rb') as gp_file:
+        return _read_header(gp_file.read(GENE_POOL_HEADER_SIZE), filename)[1]
+
+
+def gene_pool_file_precision(filename='gen_0.gp'):
+    """Returns the precision of the values within a gene pool file by reading its header.
+
+    Parameters
+    ----------
+    filename : str
+        Filename written by :func:`src.gene_pool_file.save_gene_pool_file`.
+
+    Returns
+    -------
+    precision : str
+        Either 'float32' or 'float64'.
+    """
+
+    with open(filename, 'rb') as gp_file:
+        dtype = _read_header(gp_file.read(GENE_POOL_HEADER_SIZE), filename)[0]
+    return 'float{}'.format(8 * dtype.itemsize)
+
+
+def is_gene_pool_file(filename):
+    """Checks whether a file starts with the header of a gene pool file.
+
+    Parameters
+    ----------
+    filename : str
+        Filename to check.
+
+    Returns
+    -------
+    is_gene_pool_file : bool
+        False for pickled gene pools of older evolutions.
+    """
+
+    with open(filename, 'rb') as gp_file:
+        return gp_file.read(len(GENE_POOL_MAGIC)) == GENE_POOL_MAGIC
+
+
+def _header(magic, dtype, num_individuals):
+    """Returns the header of a gene pool file or of another file using the same layout with a different magic."""
+
+    return magic + np.array([GENE_POOL_VERSION, dtype.itemsize], dtype='<u4').tobytes() + \
+        np.array([num_individuals], dtype='<u8').tobytes()
+
+
+def _read_header(header, filename, magic=GENE_POOL_MAGIC):
+    """Returns the value dtype and the number of individuals stored in the header of a gene pool file."""
+
+    if len(header) < GENE_POOL_HEADER_SIZE or header[:len(magic)] != magic:
+        raise ValueError('{} is not a gene pool file.'.format(filename))
+
+    version, itemsize = np.frombuffer(header, dtype='<u4', count=2, offset=len(magic))
+    if version != GENE_POOL_VERSION:
+        raise ValueError('Gene pool file {} has unsupported version {}.'.format(filename, version))
+
+    num_individuals = np.frombuffer(header, dtype='<u8', count=1, offset=len(magic) + 8)[0]
+    return np.dtype('<f{}'.format(itemsize)), int(num_individuals)
+
+
+def _shuffle_bytes(values):
+    """Groups the i-th byte of all values together, such that similar bytes are next to each other when compressing."""
+
+    return values.view(np.uint8).reshape(-1, values.dtype.itemsize).T.tobytes()
+
+
+def _unshuffle_bytes(data, dtype, offset=0):
+    """Reverts :func:`src.gene_pool_file._shuffle_bytes` and returns the values."""
+
+    shuffled = np.frombuffer(data, dtype=np.uint8, offset=offset).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(shuffled.T).view(dtype).reshape(-1)
+
+
+def _compress_record(gene_pool, idx, dtype):
+    """Returns the compressed record of the idx-th individual of a gene pool."""
+
+    offsets, lengths = gene_pool.pattern_offsets[idx], gene_pool.pattern_lengths[idx]
+    values = np.concatenate([gene_pool.sizes[idx].reshape(-1)] +
+                            [gene_pool.move_patterns[offset:offset + length]
+                             for offset, length in zip(offsets, lengths)]).astype(dtype)
+
+    return zlib.compress(lengths.astype('<u4').tobytes() + _shuffle_bytes(values))
+
+
+def _decompress_record(record, dtype):
+    """Returns box sizes, move pattern lengths and concatenated move patterns of a compressed record."""
+
+    record = zlib.decompress(record)
+    lengths = np.frombuffer(record, dtype='<u4', count=len(MOVE_KEYS))
+    values = _unshuffle_bytes(record, dtype, offset=lengths.nbytes).astype(float)
+
+    num_sizes = len(SIZE_KEYS) * 3
+    return values[:num_sizes], lengths, values[num_sizes:]
@@ -114,6 +114,75 @@ def _get_pos(ind_id, sim_id):
     return x, y
 
 
+def _tracking_config(evo_config):
+    """Returns the tracking configuration, filling in defaults for evolutions created before it existed.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    tracking : dict
+        ``'interval'``: number of steps between two samples, ``'channels'``: values recorded in addition to x and y,
+        any of ``'z'``, ``'orientation'`` (quaternion) and ``'joints'`` (joint angles of all limbs).
+    """
+
+    tracking = evo_config['simulation'].get('tracking') or {}
+    return {'interval': int(tracking.get('interval', 10)),
+            'channels': [channel for channel in ('z', 'orientation', 'joints')
+                         if channel in tracking.get('channels', [])]}
+
+
+def _track_width(channels):
+    """Returns the number of values recorded per sample for the given tracking channels.
+
+    Parameters
+    ----------
+    channels : list
+        Channels recorded in addition to x and y. See :func:`src.individual._tracking_config`.
+
+    Returns
+    -------
+    width : int
+        Number of values per sample.
+    """
+
+    sizes = {'z': 1, 'orientation': 4, 'joints': len(_make_limb_dict())}
+    return 2 + sum(sizes[channel] for channel in channels)
+
+
+def _track_state(controller, channels, sim_id):
+    """Returns the current state of an individual as recorded by the tracker.
+
+    Parameters
+    ----------
+    controller : dict
+        Compiled controller. See :func:`src.individual._compile_controller`.
+    channels : list
+        Channels recorded in addition to x and y. See :func:`src.individual._tracking_config`.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+
+    Returns
+    -------
+    state : list
+        x and y position of the head followed by the values of all channels.
+    """
+
+    position, orientation = p.getBasePositionAndOrientation(controller['ind_id'], physicsClientId=sim_id)
+    state = list(position[0:2])
+    if 'z' in channels:
+        state.append(position[2])
+    if 'orientation' in channels:
+        state += list(orientation)
+    if 'joints' in channels:
+        state += [joint_state[0] for joint_state in p.getJointStates(controller['ind_id'], controller['limbs'],
+                                                                     physicsClientId=sim_id)]
+    return state
+
+
 def _make_limb_dict():
     """Create controller dictionary translating each limb id into human readable format.
 
@@ -160,6 +229,148 @@ def _move_individual(ind_id, genome, move_step, evo_config, sim_id):
         _move_limb(ind_id, limb_dict[key], genome[1][key][move_step % len(genome[1][key])], evo_config, sim_id)
 
 
+def _compile_controller(ind_id, genome, evo_config, sim_id, num_steps=0, step_size=1):
+    """Compiles the movement of an individual into a controller, such that stepping requires no further queries.
+
+    Friction, limb sizes and hence forces do not change during a simulation. Thus friction is applied once here and the
+    force for each limb is computed once from its collision shape. Additionally the target positions of all limbs are
+    precomputed for ``num_steps`` steps, such that each step boils down to one indexed lookup plus the motor command.
+
+    Parameters
+    ----------
+    ind_id : int
+        Index pointing to the multi body of the respective simulation.
+    genome : list | tuple
+        Genome of the current individual.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+    num_steps : int | float
+        Number of steps for which target positions are precomputed. Steps beyond are looked up from the move patterns
+        directly (e.g. for GUI simulations of infinite duration).
+    step_size : int
+        Number of move pattern entries each step advances, larger than 1 for coarser time steps.
+
+    Returns
+    -------
+    controller : dict
+        Compiled controller holding the multi body ID, joint IDs, forces, move patterns and target positions
+        (steps x limbs) of the individual.
+    """
+
+    limb_dict = _make_limb_dict()
+    limbs = list(limb_dict.values())
+
+    # friction and forces are constant throughout the simulation
+    forces = []
+    for limb in limbs:
+        p.changeDynamics(ind_id, limb, lateralFriction=2, anisotropicFriction=[1, 1, 0.01], physicsClientId=sim_id)
+        forces.append(_get_limb_force(ind_id, limb, evo_config, sim_id))
+
+    # precompute target positions of all limbs for every step
+    move_patterns = [np.asarray(genome[1][key]) for key in limb_dict.keys()]
+    if not np.isfinite(num_steps):
+        num_steps = 0
+    steps = np.arange(int(num_steps)) * step_size
+    targets = np.empty((len(steps), len(limbs)))
+    for idx, move_pattern in enumerate(move_patterns):
+        targets[:, idx] = move_pattern[steps % len(move_pattern)]
+
+    return {'ind_id': ind_id,
+            'limbs': limbs,
+            'forces': forces,
+            'move_patterns': move_patterns,
+            'step_size': step_size,
+            'targets': targets}
+
+
+def _controller_targets(controller, step):
+    """Returns the target positions of all limbs of a compiled controller for a given step.
+
+    Parameters
+    ----------
+    controller : dict
+        Compiled controller. See :func:`src.individual._compile_controller`.
+    step : int
+        Current step.
+
+    Returns
+    -------
+    targets : np.array | list
+        Target position for each limb in multiples of pi.
+    """
+
+    if step < len(controller['targets']):
+        return controller['targets'][step]
+    step = step * controller['step_size']
+    return [move_pattern[step % len(move_pattern)] for move_pattern in controller['move_patterns']]
+
+
+def _actuate(controller, step, sim_id, actuation='array'):
+    """Moves all limbs of an individual by one step using its compiled controller.
+
+    Parameters
+    ----------
+    controller : dict
+        Compiled controller. See :func:`src.individual._compile_controller`.
+    step : int
+        Current step.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+    actuation : str
+        Either ``'array'`` to command all joints with a single call or ``'limb'`` to command each joint separately. The
+        latter serves as reference, both yield identical trajectories.
+    """
+
+    if actuation == 'array':
+        p.setJointMotorControlArray(controller['ind_id'],
+                                    controller['limbs'],
+                                    p.POSITION_CONTROL,
+                                    targetPositions=_controller_targets(controller, step),
+                                    forces=controller['forces'],
+                                    physicsClientId=sim_id)
+        return
+
+    for limb, target_pos, force in zip(controller['limbs'], _controller_targets(controller, step),
+                                       controller['forces']):
+        p.setJointMotorControl2(controller['ind_id'],
+                                limb,
+                                p.POSITION_CONTROL,
+                                targetPosition=target_pos,
+                                force=force,
+                                physicsClientId=sim_id)
+
+
+def _get_limb_force(ind_id, limb, evo_config, sim_id):
+    """Computes the force of a single limb from the size of its collision shape.
+
+    Parameters
+    ----------
+    ind_id : int
+        Index pointing to the multi body of the respective simulation.
+    limb : int
+        Index pointing to the joint of the multi body.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+
+    Returns
+    -------
+    force : float
+        Force of the joint motor. See :func:`src.individual._compute_force`.
+    """
+
+    shape_data = p.getCollisionShapeData(ind_id, limb, physicsClientId=sim_id)[0]
+    box_size = shape_data[3]
+
+    if shape_data[2] == 2:  # type of object (2 = sphere)
+        box_size = box_size[0]
+
+    return _compute_force(_compute_mass(box_size, evo_config), evo_config)
+
+
 def _move_limb(ind_id, limb, target_pos, evo_config, sim_id):
     """Moves a single limb of a given individual by one step.
 
@@ -273,13 +484,10 @@ def _normalize_move_pattern(move_pattern, max_val=2 * np.pi):
 def _interpolate_move_pattern(move_pattern, new_size, min_size=10, max_size=1000):
     """Interpolates movement pattern to fit a given size.
 
-    Linearly interpolates all values in move_pattern to fit a certain vector length.
-
-    If move pattern is longer than new_size, it cannot be interpolated in the classical sense (i.e. it has to be
-    extrapolated). We have to find a common multiple to extent the size, in order to reslice it properly later.
-    However, in order to ensure that we keep the first and last value in the vector untouched, we have to add 1 and
-    subtract len(move_pattern). Doing as described will yield a new vector of size new_size, with the first and last
-    value in move_pattern untouched, whereas values in between are interpolated according to the standard procedure.
+    Linearly interpolates all values in move_pattern to fit a certain vector length. The first and last value in
+    move_pattern are kept untouched, whereas values in between are interpolated at equally spaced positions, i.e. value
+    j of the new vector is taken from position j * (len(move_pattern) - 1) / (new_size - 1) of move_pattern. This holds
+    for shortening and lengthening alike, hence only a vector of size new_size has to be created.
 
     Parameters
     ----------
@@ -304,21 +512,50 @@ def _interpolate_move_pattern(move_pattern, new_size, min_size=10, max_size=1000
     elif new_size > max_size:
         new_size = max_size
 
-    if len(move_pattern) > new_size:
-        int_size = new_size * len(move_pattern) - len(move_pattern) + 1
-    else:
-        int_size = new_size
+    move_pattern = np.asarray(move_pattern, dtype=float)
+    new_x = np.linspace(0, len(move_pattern) - 1, int(new_size))
 
-    # linear interpolation
-    x = np.linspace(0, len(move_pattern), len(move_pattern))
-    new_x = np.linspace(0, len(move_pattern), int_size)
-    interpolated_move_pattern = np.interp(new_x, x, move_pattern)
+    return np.interp(new_x, np.arange(len(move_pattern)), move_pattern)
 
-    # in the above described case, we have to reslice the enlarged vector.
-    if len(move_pattern) > new_size:
-        return interpolated_move_pattern[::len(move_pattern)]
-    else:
-        return interpolated_move_pattern
+
+def _interpolate_move_patterns(move_patterns, offsets, lengths, new_sizes):
+    """Interpolates many movement patterns at once. See :func:`src.individual._interpolate_move_pattern`.
+
+    Parameters
+    ----------
+    move_patterns : np.array
+        Flat array containing the movement patterns.
+    offsets : np.array
+        Start of each pattern within move_patterns.
+    lengths : np.array
+        Length of each pattern.
+    new_sizes : np.array
+        Length of each pattern after interpolation. Limits are not applied.
+
+    Returns
+    -------
+    interpolated_move_patterns : np.array
+        Concatenated interpolated movement patterns.
+    """
+
+    offsets = np.ravel(offsets)
+    lengths = np.ravel(lengths)
+    new_sizes = np.ravel(new_sizes)
+
+    # index of each value within its interpolated pattern
+    new_offsets = np.cumsum(new_sizes) - new_sizes
+    steps = np.arange(np.sum(new_sizes)) - np.repeat(new_offsets, new_sizes)
+
+    # position within the original pattern, a pattern of size 1 is sampled at its first value only
+    scales = np.repeat((lengths - 1) / np.maximum(new_sizes - 1, 1), new_sizes)
+    positions = steps * scales
+    last = np.repeat(lengths - 1, new_sizes)
+    lows = np.minimum(np.floor(positions).astype(np.int64), np.maximum(last - 1, 0))
+    highs = np.minimum(lows + 1, last)
+    weights = positions - lows
+
+    starts = np.repeat(offsets, new_sizes)
+    return move_patterns[starts + lows] * (1 - weights) + move_patterns[starts + highs] * weights
 
 
 def _make_size_dict(evo_config):
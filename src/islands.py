@@ -0,0 +1,405 @@
+import pybullet as p
+from src.simulation import simulate_pop, _make_sim_env, _reset_sim_env, _make_batches, _trim_track
+from src.evolution import fitness, selection, selection_cutoff, crossing, batch_crossing
+from src.gene_pool import GenePool
+import multiprocessing as mp
+import numpy as np
+import traceback
+import signal
+
+# topologies along which migrants are sent, see _migration_targets
+TOPOLOGIES = ('ring', 'random')
+
+
+def start_islands(gene_pool, evo_config, num_islands, track_individuals=True, batch_size=1, send_gene_pools=False):
+    """Splits a population into islands, each evolved by its own worker process.
+
+    Each island process connects to its own direct physics server and simulates, selects and crosses its
+    sub-population on its own. Islands only talk to the main process at the end of each epoch, when they report the
+    fitness and tracked samples of all generations of the epoch at once and exchange a few migrants, instead of sending
+    the whole population per generation. Drive the islands with
+    :func:`src.islands.island_generations` and shut them down with :func:`src.islands.close_islands`.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        Genomes of the whole population, split into consecutive sub-populations of (almost) equal size.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    num_islands : int
+        Number of islands and worker processes.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    batch_size : int
+        Number of individuals simulated together in one physics server.
+    send_gene_pools : bool
+        Whether islands report the gene pool of each generation along with its fitness, e.g. to be saved. Otherwise
+        only the population at the end of an epoch is sent.
+
+    Returns
+    -------
+    islands : dict
+        Handle of the islands.
+    """
+
+    gene_pool = GenePool.from_genomes(gene_pool)
+    if len(gene_pool) < 4 * num_islands:
+        raise ValueError('each island needs at least 4 individuals, got {} individuals for {} islands'.format(
+            len(gene_pool), num_islands))
+
+    islands = {'processes': [], 'connections': [], 'gene_pools': [], 'offsets': []}
+    for indices in np.array_split(np.arange(len(gene_pool)), num_islands):
+        connection, island_connection = mp.Pipe()
+        process = mp.Process(target=_run_island, args=(island_connection, evo_config, track_individuals, batch_size,
+                                                       send_gene_pools), daemon=True)
+        process.start()
+        island_connection.close()
+
+        islands['processes'].append(process)
+        islands['connections'].append(connection)
+        islands['gene_pools'].append(gene_pool.take(indices))
+        islands['offsets'].append(int(indices[0]))
+    return islands
+
+
+def island_generations(islands, num_generations, migration_interval=5, num_migrants=2, topology='ring', cutoff=None,
+                       first_generation=0):
+    """Evolves islands started by :func:`src.islands.start_islands` and reports each generation.
+
+    Islands evolve independently for epochs of ``migration_interval`` generations. In the last generation of an epoch
+    each island sends copies of its ``num_migrants`` best individuals to another island along the topology, where
+    they replace the worst individuals before selection. In a ``'ring'`` topology island ``i`` sends its migrants to
+    island ``i + 1``, in a ``'random'`` topology to a randomly chosen other island. Islands report the generations of
+    an epoch together with their migrants, hence the generations of an epoch are yielded once all islands finished it.
+
+    At the start of each epoch each island is seeded from the random number generator of the calling process, which
+    also picks the targets of a random topology. Hence an evolution can be reproduced by seeding ``numpy.random`` and
+    continued exactly from a state written at the end of an epoch.
+
+    Parameters
+    ----------
+    islands : dict
+        Handle returned by :func:`src.islands.start_islands`.
+    num_generations : int
+        Number of generations to evolve.
+    migration_interval : int
+        Number of generations per epoch.
+    num_migrants : int
+        Number of individuals each island sends per epoch.
+    topology : str
+        Either ``'ring'`` or ``'random'``.
+    cutoff : float | list | None
+        Selection cutoff for early stopping in the first generation, either of all islands or a list of one per island.
+        Afterwards each island uses the cutoff of its own previous generation. See :func:`src.simulation.simulate_pop`.
+    first_generation : int
+        Number of the first generation, used in the statistics of the islands.
+
+    Returns
+    -------
+    generations : generator
+        For each generation a tuple of
+
+        * ``evaluated``: GenePool of the simulated individuals of all islands, None if islands do not send their gene
+          pools each generation
+        * ``fitness``: list of their fitness values, islands ordered as in the population they were started with
+        * ``tracker``: dictionary of their recorded samples, keys are indices within the whole population
+        * ``island_stats``: one row ``[generation, island, avg fitness, best, best fitness]`` per island, with
+          ``best`` being the index within the whole population
+        * ``population``: GenePool of the next generation of all islands at the end of an epoch, otherwise None
+        * ``cutoffs``: selection cutoff of each island at the end of an epoch, otherwise None
+    """
+
+    if topology not in TOPOLOGIES:
+        raise ValueError('unknown topology {}, expected one of {}'.format(topology, TOPOLOGIES))
+
+    connections, offsets = islands['connections'], islands['offsets']
+    num_islands = len(connections)
+    if num_islands < 2:
+        num_migrants = 0
+
+    # islands receive their sub-population with the first epoch only and keep it afterwards
+    gene_pools, cutoffs = islands['gene_pools'], [cutoff] * num_islands
+    if isinstance(cutoff, list):
+        cutoffs = cutoff if len(cutoff) == num_islands else [None] * num_islands
+    islands['gene_pools'] = None
+
+    generation = first_generation
+    while generation < first_generation + num_generations:
+        epoch_length = min(migration_interval, first_generation + num_generations - generation)
+        seeds = np.random.randint(2 ** 31 - 1, size=num_islands)
+        for island, connection in enumerate(connections):
+            connection.send(('epoch', None if gene_pools is None else gene_pools[island], cutoffs[island],
+                             int(seeds[island]), epoch_length, num_migrants))
+        gene_pools = None
+
+        # each island reports all generations of the epoch along with its migrants
+        epoch_reports = [_receive(connection, 'epoch') for connection in connections]
+        if num_migrants > 0:
+            _migrate(connections, [migrants for _, migrants in epoch_reports], topology)
+        epoch_ends = [_receive(connection, 'population') for connection in connections]
+
+        for epoch_generation in range(epoch_length):
+            reports = [island_reports[epoch_generation] for island_reports, _ in epoch_reports]
+
+            fitness_all, tracker_all, island_stats = [], {}, []
+            for island, (fitness_island, tracker_island, _) in enumerate(reports):
+                best = int(np.argmax(fitness_island))
+                island_stats.append([generation, island, np.mean(fitness_island), offsets[island] + best,
+                                     fitness_island[best]])
+                fitness_all += fitness_island
+                tracker_all.update({offsets[island] + index: track for index, track in tracker_island.items()})
+
+            evaluated = None
+            if reports[0][2] is not None:
+                evaluated = GenePool.concatenate([gene_pool for _, _, gene_pool in reports])
+
+            population = None
+            if epoch_generation == epoch_length - 1:
+                population = GenePool.concatenate([gene_pool for gene_pool, _ in epoch_ends])
+                cutoffs = [cutoff_island for _, cutoff_island in epoch_ends]
+
+            yield evaluated, fitness_all, tracker_all, island_stats, population, \
+                None if population is None else cutoffs
+            generation += 1
+
+
+def close_islands(islands, terminate=False):
+    """Shuts down the processes of islands started by :func:`src.islands.start_islands`.
+
+    Parameters
+    ----------
+    islands : dict
+        Handle of the islands.
+    terminate : bool
+        Whether to kill the processes immediately, e.g. after an error, instead of letting them finish.
+    """
+
+    for process, connection in zip(islands['processes'], islands['connections']):
+        if terminate:
+            process.terminate()
+        else:
+            try:
+                connection.send(('stop', ))
+            except (BrokenPipeError, OSError):
+                pass
+
+    for process, connection in zip(islands['processes'], islands['connections']):
+        process.join()
+        connection.close()
+
+
+def _migrate(connections, migrants, topology):
+    """Sends the migrants of all islands to their target islands.
+
+    Parameters
+    ----------
+    connections : list
+        Connection to each island.
+    migrants : list
+        Genomes and fitness values of the migrants of each island.
+    topology : str
+        Either ``'ring'`` or ``'random'``.
+    """
+
+    targets = _migration_targets(len(connections), topology)
+
+    for island, connection in enumerate(connections):
+        sources = [source for source, target in enumerate(targets) if target == island]
+        immigrants = GenePool.concatenate([migrants[source][0] for source in sources]) if len(sources) > 0 else None
+        immigrant_fitness = [value for source in sources for value in migrants[source][1]]
+        connection.send(('immigrants', immigrants, immigrant_fitness))
+
+
+def _migration_targets(num_islands, topology):
+    """Returns the island each island sends its migrants to.
+
+    Parameters
+    ----------
+    num_islands : int
+        Number of islands.
+    topology : str
+        Either ``'ring'`` or ``'random'``.
+
+    Returns
+    -------
+    targets : list
+        Target island of each island, never the island itself.
+    """
+
+    if topology == 'ring':
+        shifts = np.ones(num_islands, dtype=int)
+    else:
+        shifts = np.random.randint(1, num_islands, size=num_islands)
+    return [int(target) for target in (np.arange(num_islands) + shifts) % num_islands]
+
+
+def _receive(connection, kind):
+    """Receives a message of an island, errors of the island are raised in the calling process.
+
+    Parameters
+    ----------
+    connection : multiprocessing.connection.Connection
+        Connection to the island.
+    kind : str
+        Expected kind of message.
+
+    Returns
+    -------
+    content : tuple
+        Content of the message without its kind.
+    """
+
+    message = connection.recv()
+    if message[0] == 'error':
+        raise RuntimeError('island failed:\n' + message[1])
+    if message[0] != kind:
+        raise RuntimeError('expected {} from island, got {}'.format(kind, message[0]))
+    return message[1:]
+
+
+def _run_island(connection, evo_config, track_individuals, batch_size, send_gene_pools):
+    """Main function of an island process. See :func:`src.islands.start_islands`.
+
+    Parameters
+    ----------
+    connection : multiprocessing.connection.Connection
+        Connection to the main process.
+    evo_config : dict
+        Configuration file for the current simulation.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    batch_size : int
+        Number of individuals simulated together in one physics server.
+    send_gene_pools : bool
+        Whether to report the gene pool of each generation.
+    """
+
+    # let the main process handle Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    sim_id = _make_sim_env('direct')
+    gene_pool, cutoff = None, None
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == 'stop':
+                break
+
+            _, new_gene_pool, new_cutoff, seed, epoch_length, num_migrants = message
+            if new_gene_pool is not None:
+                gene_pool, cutoff = new_gene_pool, new_cutoff
+            np.random.seed(seed)
+
+            # generations are reported in one message at the end of the epoch
+            reports = []
+            for epoch_generation in range(epoch_length):
+                fitness_island, tracker_island = _simulate_island(gene_pool, evo_config, track_individuals,
+                                                                  batch_size, cutoff, sim_id)
+                reports.append((fitness_island, tracker_island, gene_pool if send_gene_pools else None))
+
+                if epoch_generation == epoch_length - 1:
+                    gene_pool, fitness_island = _exchange_migrants(connection, reports, gene_pool, fitness_island,
+                                                                   num_migrants)
+
+                # select and cross like the generational evolution, but within the island only
+                cutoff = selection_cutoff(fitness_island)
+                selected = selection(np.argsort(fitness_island)[::-1])
+                if evo_config['evolution'].get('batch_crossing', False):
+                    gene_pool = batch_crossing(selected, gene_pool, evo_config)
+                else:
+                    gene_pool = crossing(selected, gene_pool, evo_config)
+
+            connection.send(('population', gene_pool, cutoff))
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+    finally:
+        p.disconnect(physicsClientId=sim_id)
+        connection.close()
+
+
+def _exchange_migrants(connection, reports, gene_pool, fitness_island, num_migrants):
+    """Reports an epoch along with the best individuals of an island and replaces its worst individuals by the
+    immigrants received.
+
+    Parameters
+    ----------
+    connection : multiprocessing.connection.Connection
+        Connection to the main process.
+    reports : list
+        Fitness, tracked samples and gene pool or None of each generation of the epoch.
+    gene_pool : GenePool
+        Genomes of the island.
+    fitness_island : list
+        Fitness of each individual of the island.
+    num_migrants : int
+        Number of individuals to send.
+
+    Returns
+    -------
+    gene_pool : GenePool
+        Genomes of the island including the immigrants.
+    fitness_island : list
+        Fitness of each individual of the island including the immigrants.
+    """
+
+    if num_migrants == 0:
+        connection.send(('epoch', reports, None))
+        return gene_pool, fitness_island
+
+    ranking = np.argsort(fitness_island)
+    best = ranking[::-1][:num_migrants]
+    connection.send(('epoch', reports, (gene_pool.take(best), [fitness_island[index] for index in best])))
+
+    _, immigrants, immigrant_fitness = connection.recv()
+    if immigrants is None:
+        return gene_pool, fitness_island
+
+    # the fitness of immigrants is known already, the islands share the evolution configuration. At most half of the
+    # island is replaced, such that some individuals of its own survive
+    num_immigrants = min(len(immigrants), len(gene_pool) // 2)
+    worst = ranking[:num_immigrants]
+    genomes, fitness_island = gene_pool.to_genomes(), list(fitness_island)
+    for index, genome, value in zip(worst, immigrants, immigrant_fitness):
+        genomes[index] = genome
+        fitness_island[index] = value
+    return GenePool.from_genomes(genomes), fitness_island
+
+
+def _simulate_island(gene_pool, evo_config, track_individuals, batch_size, cutoff, sim_id):
+    """Simulates the individuals of an island batch by batch on the physics server of the island.
+
+    Parameters
+    ----------
+    gene_pool : GenePool
+        Genomes of the island.
+    evo_config : dict
+        Configuration file for the current simulation.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    batch_size : int
+        Number of individuals simulated together in one physics server.
+    cutoff : float | None
+        Selection cutoff for early stopping.
+    sim_id : int
+        Index pointing to the physics server of the island.
+
+    Returns
+    -------
+    fitness_island : list
+        Fitness of each individual.
+    tracker_island : dict
+        Samples recorded for each individual. Keys are the indices of the individuals. Empty if individuals were not
+        tracked.
+    """
+
+    fitness_island, tracker_island = [], {}
+    for start, stop in _make_batches(len(gene_pool), batch_size):
+        pop, _, tracker, stopped = simulate_pop(gene_pool[start:stop], evo_config, track_individuals=track_individuals,
+                                                direct=True, sim_id=sim_id, cutoff=cutoff)
+        fitness_island += fitness(pop, sim_id, stopped)
+        _reset_sim_env(sim_id)
+
+        if tracker is not None:
+            tracker_island.update({start + index: _trim_track(np.asarray(track, dtype=np.float32))
+                                   for index, track in enumerate(tracker)})
+    return fitness_island, tracker_island
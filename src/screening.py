@@ -0,0 +1,151 @@
+from src.simulation import simulate_multi_core
+from src.gene_pool import GenePool
+from scipy import stats
+import numpy as np
+import copy
+
+
+def screening_config(evo_config):
+    """Derives the configuration of the cheap screening stage from an evolution configuration.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation with ``evo_config['simulation']['screening']`` set. See
+        :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    screen_config : dict
+        Copy of the configuration simulating ``screening['duration']`` seconds with time steps
+        ``screening['time_step_factor']`` times as long as usual. See :func:`src.simulation._duration_steps`.
+    """
+
+    screening = evo_config['simulation']['screening']
+    screen_config = copy.deepcopy(evo_config)
+    screen_config['simulation']['duration'] = screening.get('duration', evo_config['simulation']['duration'])
+    screen_config['simulation']['time_step_factor'] = screening.get('time_step_factor', 1)
+    screen_config['simulation']['screening'] = None
+    return screen_config
+
+
+def initial_promote(evo_config, screening_rows=()):
+    """Returns the fraction of individuals to promote in the next generation.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation with ``evo_config['simulation']['screening']`` set.
+    screening_rows : list | np.array
+        Screening statistics of previous generations, see :func:`src.screening.simulate_screened`.
+
+    Returns
+    -------
+    promote : float
+        The fraction adapted in the last generation, ``screening['promote']`` if there was none.
+    """
+
+    if len(screening_rows) > 0:
+        return float(screening_rows[-1][-1])
+    return evo_config['simulation']['screening']['promote']
+
+
+def simulate_screened(gene_pool, evo_config, promote, track_individuals=True, num_cores=1, pool=None, batch_size=1,
+                      cache=None, cutoff=None, broker=None):
+    """Simulates a gene pool in two stages, a cheap screening of all individuals and a full simulation of the best.
+
+    All individuals are simulated with the configuration of :func:`src.screening.screening_config` first. The best
+    ``promote`` fraction of them is simulated again with the full configuration, the others keep their screened
+    fitness and tracked samples. Both stages are simulated by :func:`src.simulation.simulate_multi_core`, hence they
+    share the pool, broker and fitness cache.
+
+    The Spearman rank correlation between the screened and the full fitness of the promoted individuals tells how
+    well the screening predicts the ranking. If it drops below ``screening['min_correlation']``, the fraction to
+    promote is multiplied by ``screening['adapt']`` (up to all individuals), otherwise it is divided by it (down to
+    ``screening['min_promote']``).
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    evo_config : dict
+        Configuration file for the current simulation with ``evo_config['simulation']['screening']`` set. See
+        :func:`src.IO.make_default_evo_config`.
+    promote : float
+        Fraction of individuals simulated with the full configuration, at least one individual is promoted. See
+        :func:`src.screening.initial_promote`.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    num_cores : int
+        Number of CPU cores. See :func:`src.simulation.simulate_multi_core`.
+    pool : multiprocessing.pool.Pool | None
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    batch_size : int
+        Number of individuals simulated together in one physics server.
+    cache : dict | None
+        Fitness cache created by :func:`src.cache.open_fitness_cache`.
+    cutoff : float | None
+        Selection cutoff for early stopping of the full simulations. See :func:`src.simulation.simulate_pop`.
+    broker : dict | None
+        Broker created by :func:`src.distributed.start_broker`.
+
+    Returns
+    -------
+    fitness_all : list
+        Full fitness of promoted individuals, screened fitness of all others, in gene pool order.
+    tracker_all : dict
+        Samples recorded for each individual, of the full simulation if promoted. Keys are the indices of the
+        individuals within the gene pool.
+    screening_stats : list
+        Rank correlation between both stages (see :func:`src.screening._rank_correlation`), fraction promoted, number
+        of individuals promoted and fraction to promote in the next generation.
+    """
+
+    screening = evo_config['simulation']['screening']
+
+    # screen all individuals without early stopping, the cutoff refers to the full simulation
+    fitness_all, tracker_all = simulate_multi_core(gene_pool, screening_config(evo_config),
+                                                   track_individuals=track_individuals, num_cores=num_cores, pool=pool,
+                                                   batch_size=batch_size, cache=cache, broker=broker)
+
+    num_promoted = min(len(fitness_all), max(1, int(np.ceil(promote * len(fitness_all)))))
+    promoted = np.argsort(fitness_all)[::-1][:num_promoted]
+    fitness_full, tracker_full = simulate_multi_core(GenePool.from_genomes(gene_pool).take(promoted), evo_config,
+                                                     track_individuals=track_individuals, num_cores=num_cores,
+                                                     pool=pool, batch_size=batch_size, cache=cache, cutoff=cutoff,
+                                                     broker=broker)
+
+    correlation = _rank_correlation([fitness_all[index] for index in promoted], fitness_full)
+    for index, fitness_ind in zip(promoted, fitness_full):
+        fitness_all[index] = fitness_ind
+    tracker_all.update({int(promoted[index]): track for index, track in tracker_full.items()})
+
+    # promote more individuals while the screening ranks them unreliably, fewer otherwise
+    if correlation < screening['min_correlation']:
+        next_promote = min(1., promote * screening['adapt'])
+    else:
+        next_promote = max(screening['min_promote'], promote / screening['adapt'])
+
+    return fitness_all, tracker_all, [correlation, promote, num_promoted, next_promote]
+
+
+def _rank_correlation(fitness_screened, fitness_full):
+    """Computes the Spearman rank correlation between screened and full fitness.
+
+    Parameters
+    ----------
+    fitness_screened : list
+        Screened fitness of the promoted individuals.
+    fitness_full : list
+        Full fitness of the same individuals.
+
+    Returns
+    -------
+    correlation : float
+        Rank correlation, tied values share their average rank. 0 if it is undefined, i.e. for less than 2 individuals
+        or if either fitness is constant, since the ranking of the screening cannot be confirmed then.
+    """
+
+    if len(fitness_full) < 2 or np.ptp(fitness_screened) == 0 or np.ptp(fitness_full) == 0:
+        return 0.
+    return float(stats.spearmanr(fitness_screened, fitness_full)[0])
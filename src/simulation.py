@@ -1,12 +1,33 @@
 import pybullet as p
-from src.individual import _move_individual, _make_random_genome, _get_pos, _compute_mass
+from src.individual import _make_random_genome, _compute_mass, _compile_controller, _actuate, get_dist, \
+    _tracking_config, _track_width, _track_state
 from src.evolution import fitness
+from src.cache import genome_hash, lookup_fitness, store_fitness
+from src.gene_pool import GenePool
+from src.distributed import run_tasks, run_worker
 import time
 import numpy as np
 from matplotlib import cm
 import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+from multiprocessing.util import Finalize
+import weakref
+import signal
 import os
-unsorted_result = []
+
+# state of a persistent worker process, see make_worker_pool
+_worker_state = {}
+
+# configuration each persistent pool was created with, such that it is only sent along with batches if it differs
+_pool_configs = weakref.WeakKeyDictionary()
+
+# collision group bits, see _disable_collision. They differ from the default groups of bullet (1 for dynamic and 2 for
+# static objects), such that newly created individuals do not collide with isolated ones.
+_PLANE_COLLISION_GROUP = 4
+_INDIVIDUAL_COLLISION_GROUP = 8
+
+# default time step of bullet in seconds, scaled by evo_config['simulation']['time_step_factor'] (see _duration_steps)
+_TIME_STEP = 1. / 240.
 
 
 def remove_simulation(pop, sim_id):
@@ -29,124 +50,926 @@ def remove_simulation(pop, sim_id):
 def worker(args):
     """Worker function for parallel processing of simulations.
 
-    Output will be put into static, shared object defined elsewhere.
+    Genomes are read from shared memory (see :func:`src.simulation._share_gene_pool`) and results are written into
+    shared memory allocated by the parent process (see :func:`src.simulation._make_result_buffers`), only the index of
+    the first individual is returned as completion signal.
 
     Parameters
     ----------
     args : list | tuple
-        ``args[0]`` is the index of the worker
+        ``args[0]`` is the index of the first individual of the gene pool part within the gene pool
+
+        ``args[1]`` is the index after the last individual of the gene pool part
+
+        ``args[2]`` is the shared gene pool
+
+        ``args[3]`` is the evolution configuration
 
-        ``args[1]`` is the gene pool (part)
+        ``args[4]`` is a boolean value indicating whether to track individual's paths
+
+        ``args[5]`` is the selection cutoff for early stopping or None
+
+        ``args[6]`` are the shared result buffers
+
+    Returns
+    -------
+    start : int
+        Index of the first individual of the gene pool part.
+    """
 
-        ``args[2]`` is the evolution configuration
+    blocks = []
+    gene_pool = _attach_gene_pool(args[2], args[0], args[1], blocks)
+    pop, sim_id, tracker, stopped = simulate_pop(gene_pool, args[3], track_individuals=args[4], direct=True,
+                                                 sim_id=_make_sim_env('direct'), cutoff=args[5])
+    del gene_pool
+    _close_blocks(blocks)
+
+    _write_results(args[6], args[0], fitness(pop, sim_id, stopped), tracker, _stopped_mask(pop, stopped))
+    remove_simulation([ind for ind in pop if ind not in stopped], sim_id)
+    return args[0]
+
+
+def make_worker_pool(evo_config, num_cores=1):
+    """Creates a pool of worker processes that is reused across generations.
+
+    Each worker process connects to its own direct physics server once and keeps it alive until the pool is shut down.
+    The evolution configuration is sent to each worker once at start up, such that only genomes need to be sent per
+    generation. Workers ignore keyboard interrupts, hence Ctrl-C is handled by the main process, which is expected to
+    terminate the pool.
+
+    Parameters
+    ----------
+    evo_config : dict | None
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`. If None, the
+        configuration is sent along with each batch instead, such that evolutions with different configurations can
+        share the pool.
+    num_cores : int
+        Number of worker processes.
+
+    Returns
+    -------
+    pool : multiprocessing.pool.Pool
+        Pool of initialized workers. Pass it to :func:`src.simulation.simulate_multi_core`.
+    """
+
+    # workers have to share the resource tracker of this process, otherwise each worker starts its own tracker, which
+    # tries to free the shared memory blocks the worker attached to (see _make_result_buffers) once more at exit
+    if os.name != 'nt':
+        resource_tracker.ensure_running()
+
+    pool = mp.Pool(processes=num_cores, initializer=_init_worker, initargs=(evo_config, ))
+    _pool_configs[pool] = evo_config
+    return pool
+
+
+def _init_worker(evo_config):
+    """Initializes a persistent worker process. See :func:`src.simulation.make_worker_pool`.
+
+    Parameters
+    ----------
+    evo_config : dict | None
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    """
+
+    # let the main process handle Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    _worker_state['evo_config'] = evo_config
+    _worker_state['sim_id'] = _make_sim_env('direct')
+
+    # disconnect from the physics server once the worker exits
+    Finalize(None, p.disconnect, kwargs={'physicsClientId': _worker_state['sim_id']}, exitpriority=10)
+
+
+def pool_worker(args):
+    """Worker function for persistent worker processes. See :func:`src.simulation.make_worker_pool`.
+
+    Simulates one batch of individuals read from shared memory (see :func:`src.simulation._share_gene_pool`) and
+    writes the results into shared memory allocated by the parent process (see
+    :func:`src.simulation._make_result_buffers`). The physics server of the worker is reset after each simulation
+    instead of disconnecting from it.
+
+    Parameters
+    ----------
+    args : list | tuple
+        ``args[0]`` is the index of the first individual of the batch within the gene pool
+
+        ``args[1]`` is the index after the last individual of the batch
+
+        ``args[2]`` is the shared gene pool
 
         ``args[3]`` is a boolean value indicating whether to track individual's paths
 
-        ``args[4]`` is the shared queue were data is appended (only for windows)
+        ``args[4]`` is the selection cutoff for early stopping or None
+
+        ``args[5]`` are the shared result buffers
+
+        ``args[6]`` is the evolution configuration of the batch if it differs from the configuration of the pool
+        (e.g. of a screening stage, see :mod:`src.screening`), else None. See :func:`src.simulation._batch_config`
+
+    Returns
+    -------
+    start : int
+        Index of the first individual of the batch, as completion signal.
     """
-    pop, sim_id, tracker = simulate_pop(args[1].tolist(), args[2], track_individuals=args[3], direct=True,
-                                        sim_id=_make_sim_env('direct'))
-    if os.name == 'nt':
-        args[4].put((args[0], fitness(pop, sim_id), tracker))
-    else:
-        unsorted_result.append([args[0], fitness(pop, sim_id), tracker])
-    remove_simulation(pop, sim_id)
 
+    evo_config = _worker_config(args[6])
 
-def simulate_multi_core(gene_pool, evo_config, track_individuals=True, num_cores=1):
-    """Performs direct simulation on multiple CPU cores.
+    blocks = []
+    gene_pool = _attach_gene_pool(args[2], args[0], args[1], blocks)
+    pop, sim_id, tracker, stopped = simulate_pop(gene_pool, evo_config,
+                                                 track_individuals=args[3], direct=True,
+                                                 sim_id=_worker_state['sim_id'], cutoff=args[4])
+    del gene_pool
+    _close_blocks(blocks)
 
-    .. note:: Note that due to different system architectures this function works differently on windows and unix-oid
-              systems.
+    _write_results(args[5], args[0], fitness(pop, sim_id, stopped), tracker, _stopped_mask(pop, stopped))
+    _reset_sim_env(sim_id)
+    return args[0]
+
+
+def simulate_async(gene_pool, pool, evo_config=None, track_individuals=True, cutoff=None, callback=None,
+                   error_callback=None):
+    """Starts simulating a few individuals on a persistent pool without waiting for the results.
+
+    Unlike :func:`src.simulation.simulate_multi_core` the genomes and results are sent through the pool itself instead
+    of shared memory, which is cheaper for single individuals, e.g. when evaluating children as soon as they are bred.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        Genomes of the individuals, simulated together in one physics server.
+    pool : multiprocessing.pool.Pool
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    evo_config : dict | None
+        Configuration file for the current simulation. Only sent to the worker if it differs from the configuration
+        the pool was created with. If None, the configuration of the pool is used.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    cutoff : float | None
+        Selection cutoff for early stopping. See :func:`src.simulation.simulate_pop`.
+    callback : callable | None
+        Called with the result once the simulation finished. Runs in a thread of the pool, hence it should return
+        quickly.
+    error_callback : callable | None
+        Called with the exception if the simulation failed.
+
+    Returns
+    -------
+    result : multiprocessing.pool.AsyncResult
+        Its value is a tuple of the fitness list and the tracker dictionary of the individuals. See
+        :func:`src.simulation.simulate_multi_core`.
+    """
+
+    return pool.apply_async(async_worker, ([GenePool.from_genomes(gene_pool), track_individuals, cutoff,
+                                             _batch_config(pool, evo_config)], ),
+                            callback=callback, error_callback=error_callback)
+
+
+def async_worker(args):
+    """Worker function for :func:`src.simulation.simulate_async`. Runs in a persistent worker process.
+
+    Parameters
+    ----------
+    args : list | tuple
+        ``args[0]`` are the genomes of the individuals
+
+        ``args[1]`` is a boolean value indicating whether to track individual's paths
+
+        ``args[2]`` is the selection cutoff for early stopping or None
+
+        ``args[3]`` is the evolution configuration if it differs from the configuration of the pool, else None. See
+        :func:`src.simulation._batch_config`
+
+    Returns
+    -------
+    fitness_pop : list
+        Fitness for each individual.
+    tracker_pop : dict
+        Samples recorded for each individual. Keys are the indices of the individuals. Empty if individuals were not
+        tracked.
+    """
+
+    evo_config = _worker_config(args[3])
+    pop, sim_id, tracker, stopped = simulate_pop(args[0], evo_config, track_individuals=args[1], direct=True,
+                                                 sim_id=_worker_state['sim_id'], cutoff=args[2])
+    fitness_pop = fitness(pop, sim_id, stopped)
+    _reset_sim_env(sim_id)
+
+    tracker_pop = {}
+    if tracker is not None:
+        tracker_pop = {index: _trim_track(np.asarray(track, dtype=np.float32)) for index, track in enumerate(tracker)}
+    return fitness_pop, tracker_pop
+
+
+def _batch_config(pool, evo_config):
+    """Returns the configuration to send along with a batch to a persistent pool.
+
+    The configuration the pool was created with is held by each worker already (see
+    :func:`src.simulation.make_worker_pool`), hence it is only sent if it differs, e.g. for a screening stage or a
+    pool shared by evolutions with different configurations.
+
+    Parameters
+    ----------
+    pool : multiprocessing.pool.Pool
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    evo_config : dict | None
+        Configuration file of the batch.
+
+    Returns
+    -------
+    batch_config : dict | None
+        The configuration of the batch, None if the workers already hold it.
+    """
+
+    if evo_config is None or evo_config == _pool_configs.get(pool):
+        return None
+    return evo_config
+
+
+def _worker_config(batch_config):
+    """Returns the configuration a persistent worker simulates a batch with, the one of the batch takes precedence."""
+
+    evo_config = batch_config if batch_config is not None else _worker_state['evo_config']
+    if evo_config is None:
+        raise ValueError('The pool was created without a configuration, hence it has to be sent along with each batch.')
+    return evo_config
+
+
+def run_evaluation_worker(address, authkey, connect_timeout=60.):
+    """Connects to a broker as evaluation worker and simulates batches of individuals until the broker stops.
+
+    The worker receives the evolution configuration of the broker once, connects to its own direct physics server and
+    resets it after each batch, exactly like the workers of :func:`src.simulation.make_worker_pool`. Workers may run
+    on any host that can reach the broker.
+
+    Parameters
+    ----------
+    address : tuple
+        ``(host, port)`` of the broker. See :func:`src.distributed.start_broker`.
+    authkey : bytes
+        Shared secret of the broker.
+    connect_timeout : float
+        Seconds to retry connecting, e.g. if workers are started before the broker.
+
+    Returns
+    -------
+    num_tasks : int
+        Number of simulated batches.
+    """
+
+    return run_worker(address, _broker_worker, authkey, init=_init_broker_worker, connect_timeout=connect_timeout)
+
+
+def start_evaluation_workers(address, authkey, num_workers=1, connect_timeout=60.):
+    """Starts local evaluation worker processes connecting to a broker. See :func:`src.simulation.run_evaluation_worker`.
+
+    Workers ignore keyboard interrupts, hence Ctrl-C is handled by the main process, which is expected to terminate
+    them. Otherwise they exit once the broker is closed.
+
+    Parameters
+    ----------
+    address : tuple
+        ``(host, port)`` of the broker.
+    authkey : bytes
+        Shared secret of the broker.
+    num_workers : int
+        Number of worker processes.
+    connect_timeout : float
+        Seconds to retry connecting, e.g. if workers are started before the broker.
+
+    Returns
+    -------
+    workers : list
+        Started ``multiprocessing.Process`` for each worker.
+    """
+
+    workers = [mp.Process(target=_run_local_evaluation_worker, args=(address, authkey, connect_timeout), daemon=True)
+               for _ in range(num_workers)]
+    for process in workers:
+        process.start()
+    return workers
+
+
+def _run_local_evaluation_worker(address, authkey, connect_timeout):
+    """Runs an evaluation worker started by :func:`src.simulation.start_evaluation_workers`."""
+
+    # let the main process handle Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_evaluation_worker(address, authkey=authkey, connect_timeout=connect_timeout)
+
+
+def _init_broker_worker(evo_config):
+    """Connects an evaluation worker to its physics server. See :func:`src.simulation.run_evaluation_worker`."""
+
+    return {'evo_config': evo_config, 'sim_id': _make_sim_env('direct')}
+
+
+def _broker_worker(state, task):
+    """Simulates one batch of individuals sent by a broker. See :func:`src.simulation.run_evaluation_worker`.
+
+    Parameters
+    ----------
+    state : dict
+        ``'evo_config'`` and ``'sim_id'`` of the worker.
+    task : tuple
+        Index of the first individual of the batch within the gene pool, the genomes of the batch, whether to track
+        individual's paths, the selection cutoff for early stopping or None and the evolution configuration of the
+        batch or None to use the configuration of the worker.
+
+    Returns
+    -------
+    start : int
+        Index of the first individual of the batch.
+    fitness_pop : list
+        Fitness for each individual of the batch.
+    tracker : np.array | None
+        Samples recorded for each individual of the batch. See :func:`src.simulation.simulate_pop`.
+    stopped_pop : list
+        Whether each individual of the batch was stopped early.
+    """
+
+    start, gene_pool, track_individuals, cutoff, evo_config = task
+    if evo_config is None:
+        evo_config = state['evo_config']
+    pop, sim_id, tracker, stopped = simulate_pop(gene_pool, evo_config, track_individuals=track_individuals,
+                                                 direct=True, sim_id=state['sim_id'], cutoff=cutoff)
+    fitness_pop = fitness(pop, sim_id, stopped)
+    _reset_sim_env(sim_id)
+    return start, fitness_pop, tracker, _stopped_mask(pop, stopped)
+
+
+def _share_gene_pool(gene_pool, blocks):
+    """Copies the arrays of a gene pool into shared memory once, such that workers can map it instead of receiving
+    pickled genomes.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        Genomes for all individuals.
+    blocks : list
+        The new shared memory blocks are appended to this list, release them with
+        :func:`src.simulation._release_result_buffers`.
+
+    Returns
+    -------
+    shared_gene_pool : tuple
+        ``(name, shape, dtype)`` of the shared sizes, move patterns, pattern offsets and pattern lengths. See
+        :class:`src.gene_pool.GenePool`.
+    """
+
+    gene_pool = GenePool.from_genomes(gene_pool)
+
+    shared_gene_pool = []
+    for array in (gene_pool.sizes, gene_pool.move_patterns, gene_pool.pattern_offsets, gene_pool.pattern_lengths):
+        shared_array = _create_shared_array(array.shape, array.dtype, None, blocks)
+        _shared_array(shared_array, blocks[-1])[...] = array
+        shared_gene_pool.append(shared_array)
+    return tuple(shared_gene_pool)
+
+
+def _attach_gene_pool(shared_gene_pool, start, stop, blocks):
+    """Maps a slice of a gene pool shared by :func:`src.simulation._share_gene_pool` without copying it.
+
+    Parameters
+    ----------
+    shared_gene_pool : tuple
+        Shared arrays of the gene pool.
+    start : int
+        Index of the first individual.
+    stop : int
+        Index after the last individual.
+    blocks : list
+        The attached shared memory blocks are appended to this list. All references to the returned gene pool have to
+        be deleted before closing them with :func:`src.simulation._close_blocks`.
+
+    Returns
+    -------
+    gene_pool : GenePool
+        Gene pool of the selected individuals, backed by shared memory.
+    """
+
+    sizes, move_patterns, pattern_offsets, pattern_lengths = [
+        _shared_array(shared_array, _attach_block(shared_array, blocks)) for shared_array in shared_gene_pool]
+
+    # offsets keep pointing into the complete flat array of move patterns
+    return GenePool(sizes[start:stop], move_patterns, pattern_offsets[start:stop], pattern_lengths[start:stop])
+
+
+def _make_result_buffers(num_individuals, evo_config, track_individuals):
+    """Allocates shared memory for the results of one generation.
+
+    Workers write fitness values and tracked samples directly into these buffers instead of sending them back to the
+    parent process, such that only a completion signal passes through inter process communication. Release the buffers
+    with :func:`src.simulation._release_result_buffers`.
+
+    Parameters
+    ----------
+    num_individuals : int
+        Number of individuals in the gene pool.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    track_individuals : bool
+        Whether to allocate memory for tracked samples.
+
+    Returns
+    -------
+    buffers : dict
+        ``'fitness'``: shared array of shape (individuals, ), ``'stopped'``: shared boolean array of shape
+        (individuals, ), ``'tracker'``: shared array of shape (individuals, samples, values) filled with nan or None. Each shared array is a ``(name, shape, dtype)`` tuple, which is sent
+        to the workers.
+    blocks : list
+        Shared memory blocks backing the buffers, owned by the parent process.
+    """
+
+    tracking = _tracking_config(evo_config)
+    num_samples = int(np.ceil(_duration_steps(evo_config) / tracking['interval']))
+
+    blocks = []
+    buffers = {'fitness': _create_shared_array((num_individuals, ), np.float64, np.nan, blocks),
+               'stopped': _create_shared_array((num_individuals, ), np.bool_, False, blocks),
+               'tracker': None}
+    if track_individuals:
+        buffers['tracker'] = _create_shared_array((num_individuals, num_samples, _track_width(tracking['channels'])),
+                                                  np.float32, np.nan, blocks)
+    return buffers, blocks
+
+
+def _read_results(buffers, blocks):
+    """Copies the results of one generation out of shared memory. See :func:`src.simulation._make_result_buffers`.
+
+    Parameters
+    ----------
+    buffers : dict
+        Shared result buffers.
+    blocks : list
+        Shared memory blocks backing the buffers.
+
+    Returns
+    -------
+    fitness_all : list
+        Fitness values for all individuals in gene pool order.
+    tracker_all : dict
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. Empty if
+        individuals were not tracked.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order.
+    """
+
+    fitness_all = _shared_array(buffers['fitness'], blocks[0]).tolist()
+    stopped_all = _shared_array(buffers['stopped'], blocks[1]).tolist()
+
+    tracker_all = {}
+    if buffers['tracker'] is not None:
+        tracker = _shared_array(buffers['tracker'], blocks[2])
+        tracker_all = {index: _trim_track(track).copy() for index, track in enumerate(tracker)}
+    return fitness_all, tracker_all, stopped_all
+
+
+def _release_result_buffers(blocks):
+    """Frees shared memory allocated by :func:`src.simulation._make_result_buffers`.
+
+    Parameters
+    ----------
+    blocks : list
+        Shared memory blocks backing the buffers, including those of a gene pool shared with
+        :func:`src.simulation._share_gene_pool`.
+    """
+
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _write_results(buffers, start, fitness_pop, tracker, stopped_pop):
+    """Writes the results of a simulated batch into shared memory. See :func:`src.simulation._make_result_buffers`.
+
+    Parameters
+    ----------
+    buffers : dict
+        Shared result buffers.
+    start : int
+        Index of the first individual of the batch within the gene pool.
+    fitness_pop : list
+        Fitness for each individual of the batch.
+    tracker : np.array | None
+        Samples recorded for each individual of the batch. See :func:`src.simulation.simulate_pop`.
+    stopped_pop : list
+        Whether each individual of the batch was stopped early.
+    """
+
+    blocks = []
+    try:
+        fitness_all = _shared_array(buffers['fitness'], _attach_block(buffers['fitness'], blocks))
+        fitness_all[start:start + len(fitness_pop)] = fitness_pop
+        stopped_all = _shared_array(buffers['stopped'], _attach_block(buffers['stopped'], blocks))
+        stopped_all[start:start + len(stopped_pop)] = stopped_pop
+
+        if buffers['tracker'] is not None and tracker is not None:
+            tracker_all = _shared_array(buffers['tracker'], _attach_block(buffers['tracker'], blocks))
+            num_samples = min(tracker.shape[1], tracker_all.shape[1])
+            tracker_all[start:start + len(tracker), :num_samples] = tracker[:, :num_samples]
+
+            # views into shared memory have to be released before it can be closed
+            del tracker_all
+        del fitness_all, stopped_all
+    finally:
+        _close_blocks(blocks)
 
-    To use multi core processing, we exploit the fact, that individuals can be simulated independently. Thus the gene
-    pool is split into mostly evenly sized parts and for each part the simulation is run on a separate CPU core.
+
+def _create_shared_array(shape, dtype, fill_value, blocks):
+    """Creates a shared memory block holding an array.
 
     Parameters
     ----------
-    gene_pool : list
+    shape : tuple
+        Shape of the array.
+    dtype : type | str
+        Data type of the array.
+    fill_value : float | None
+        Initial value of all entries. If None, the array is not initialized.
+    blocks : list
+        The new block is appended to this list.
+
+    Returns
+    -------
+    shared_array : tuple
+        ``(name, shape, dtype)`` describing the array.
+    """
+
+    dtype = np.dtype(dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    blocks.append(block)
+
+    shared_array = (block.name, tuple(int(size) for size in shape), dtype.str)
+    if fill_value is not None:
+        _shared_array(shared_array, block).fill(fill_value)
+    return shared_array
+
+
+def _close_blocks(blocks):
+    """Closes shared memory blocks attached to by a worker without freeing them."""
+
+    for block in blocks:
+        block.close()
+
+
+def _attach_block(shared_array, blocks):
+    """Attaches to the shared memory block of an array created by :func:`src.simulation._create_shared_array`."""
+
+    blocks.append(shared_memory.SharedMemory(name=shared_array[0]))
+    return blocks[-1]
+
+
+def _shared_array(shared_array, block):
+    """Returns a numpy view of an array stored in a shared memory block."""
+
+    return np.ndarray(shared_array[1], dtype=np.dtype(shared_array[2]), buffer=block.buf)
+
+
+def _trim_track(track):
+    """Removes the samples an individual did not reach because it was stopped early.
+
+    Parameters
+    ----------
+    track : np.array
+        Samples recorded for one individual. See :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    track : np.array
+        Samples of shape (samples, values).
+    """
+
+    return track[~np.isnan(track[:, 0])]
+
+
+def _stopped_mask(pop, stopped):
+    """Returns whether each individual was stopped early.
+
+    Parameters
+    ----------
+    pop : list
+        List of ind_ids for multiple individuals.
+    stopped : dict
+        Fitness of each individual that was stopped early. See :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    stopped_pop : list
+        Boolean value for each individual in order of pop.
+    """
+
+    return [indiv in stopped for indiv in pop]
+
+
+def _make_batches(num_individuals, batch_size=1):
+    """Splits a gene pool into batches of consecutive individuals.
+
+    Parameters
+    ----------
+    num_individuals : int
+        Number of individuals in the gene pool.
+    batch_size : int
+        Number of individuals per batch.
+
+    Returns
+    -------
+    batches : list
+        ``(start, stop)`` index for each batch.
+    """
+
+    batch_size = max(1, batch_size)
+    return [(start, min(start + batch_size, num_individuals)) for start in range(0, num_individuals, batch_size)]
+
+
+def _simulate_scheduled(gene_pool, evo_config, track_individuals, pool, batch_size=1, cutoff=None):
+    """Simulates a gene pool by letting persistent workers pull small batches of individuals from a shared queue.
+
+    Whenever a worker finishes a batch it pulls the next one, such that slow batches (e.g. large individuals with many
+    contacts) do not leave the other workers idle until the end of the generation.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    evo_config : dict
+        Configuration file for the current simulation, used to size the result buffers. Sent along with each batch
+        only if it differs from the configuration the pool was created with, see :func:`src.simulation._batch_config`.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    pool : multiprocessing.pool.Pool
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    batch_size : int
+        Number of individuals per batch. Since individuals sharing a physics server all start at the same position,
+        small batches are usually the fastest.
+    cutoff : float | None
+        Selection cutoff for early stopping. See :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    fitness_all : list
+        Fitness values for all individuals in gene pool order.
+    tracker_all : dict
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. See
+        :func:`src.simulation.simulate_pop`.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order.
+    """
+
+    # workers write their results into shared memory at the index of each individual, hence the order of completion
+    # does not matter
+    buffers, blocks = _make_result_buffers(len(gene_pool), evo_config, track_individuals)
+    try:
+        # genomes are put into shared memory once, tasks only refer to a range of individuals
+        shared_gene_pool = _share_gene_pool(gene_pool, blocks)
+        batch_config = _batch_config(pool, evo_config)
+        tasks = [[start, stop, shared_gene_pool, track_individuals, cutoff, buffers, batch_config]
+                 for start, stop in _make_batches(len(gene_pool), batch_size)]
+        for _ in pool.imap_unordered(pool_worker, tasks):
+            pass
+        return _read_results(buffers, blocks)
+    finally:
+        _release_result_buffers(blocks)
+
+
+def _simulate_distributed(gene_pool, evo_config, track_individuals, broker, batch_size=1, cutoff=None):
+    """Simulates a gene pool on evaluation workers connected to a broker.
+
+    Batches of individuals are handed out to the workers one after another, batches of workers that are lost on the
+    way are handed out again. Results are collected in the same buffers as for a local pool, hence the results do not
+    depend on which workers simulated which batch.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    evo_config : dict
+        Configuration file for the current simulation, used to size the result buffers. Sent along with each batch
+        only if it differs from the configuration of the broker.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    broker : dict
+        Broker created by :func:`src.distributed.start_broker` with the evolution configuration.
+    batch_size : int
+        Number of individuals per batch.
+    cutoff : float | None
+        Selection cutoff for early stopping. See :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    fitness_all : list
+        Fitness values for all individuals in gene pool order.
+    tracker_all : dict
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. See
+        :func:`src.simulation.simulate_pop`.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order.
+    """
+
+    buffers, blocks = _make_result_buffers(len(gene_pool), evo_config, track_individuals)
+    try:
+        # only the genomes of each batch are sent, the configuration was sent to each worker once
+        batch_config = None if evo_config == broker['config'] else evo_config
+        tasks = [(start, gene_pool.take(range(start, stop)) if isinstance(gene_pool, GenePool) else
+                  gene_pool[start:stop], track_individuals, cutoff, batch_config)
+                 for start, stop in _make_batches(len(gene_pool), batch_size)]
+        for start, fitness_pop, tracker, stopped_pop in run_tasks(broker, tasks):
+            _write_results(buffers, start, fitness_pop, tracker, stopped_pop)
+        return _read_results(buffers, blocks)
+    finally:
+        _release_result_buffers(blocks)
+
+
+def _simulate_cached(gene_pool, evo_config, track_individuals, num_cores, pool, batch_size, cache, cutoff,
+                     broker=None):
+    """Simulates only those individuals whose fitness is not found in the fitness cache.
+
+    Genomes that occur multiple times within the gene pool are simulated only once. Newly obtained results are stored
+    in the cache, except for those of individuals that were stopped early.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
         List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
     evo_config : dict
         Configuration file for the current simulation.
     track_individuals : bool
         Whether to collect position data for all individuals.
     num_cores : int
-        Number of CPU cores used for the simulation. If -1, all available cores will be utilized.
+        Number of CPU cores used for the simulation.
+    pool : multiprocessing.pool.Pool | None
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    batch_size : int
+        Number of individuals per batch when using a persistent pool or a broker.
+    cache : dict
+        Fitness cache opened with :func:`src.cache.open_fitness_cache`.
+    cutoff : float | None
+        Selection cutoff for early stopping. See :func:`src.simulation.simulate_pop`.
+    broker : dict | None
+        Broker created by :func:`src.distributed.start_broker`.
 
     Returns
     -------
     fitness_all : list
-        List of fitness values for all individuals after merging results.
+        Fitness values for all individuals in gene pool order.
     tracker_all : dict
-        Paths recorded for each individual. Key values represent individual IDs within the simulation.
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. See
+        :func:`src.simulation.simulate_pop`.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order. Individuals found in the cache never are.
     """
 
-    global unsorted_result
-    # perform simulation using multiprocessing library (on multiple CPU cores) by splitting the amount of individuals
-    # into as many chunks as CPU cores were requested
-
-    # split gene pool into num_cores chunks and compute in parallel pools
-    split_gene_pool = np.array_split(np.array(gene_pool), num_cores)
+    keys = [genome_hash(genome, evo_config) for genome in gene_pool]
+    found = lookup_fitness(cache, keys, track_individuals)
 
-    # multiprocessing on windows works slightly different than on unix. To ensure compatibility two different ways of
-    # multi processing were implemented.
-    if os.name == 'nt':
-        # make multiprocessing queue
-        q_out = mp.Queue(maxsize=-1)
+    # simulate each missing genome once
+    missing = {}
+    for index, key in enumerate(keys):
+        if key not in found and key not in missing:
+            missing[key] = index
+    missing_ids = list(missing.values())
 
-        # make parallel processes
-        processes = [mp.Process(target=worker, args=([ind, data_in, evo_config, track_individuals, q_out], ))
-                     for ind, data_in in enumerate(split_gene_pool)]
+    stopped_keys = set()
+    if len(missing_ids) > 0:
+        if isinstance(gene_pool, GenePool):
+            missing_pool = gene_pool.take(missing_ids)
+        else:
+            missing_pool = [gene_pool[index] for index in missing_ids]
+        fitness_new, tracker_new, stopped_new = simulate_multi_core(missing_pool, evo_config,
+                                                                    track_individuals=track_individuals,
+                                                                    num_cores=num_cores, pool=pool,
+                                                                    batch_size=batch_size, cutoff=cutoff,
+                                                                    broker=broker, return_stopped=True)
+        new_entries = [(keys[index], fitness_new[idx], tracker_new.get(idx))
+                       for idx, index in enumerate(missing_ids)]
+        found.update({key: (ind_fitness, track) for key, ind_fitness, track in new_entries})
+
+        # the fitness of individuals stopped early is not the one of a complete simulation
+        stopped_keys = {keys[index] for idx, index in enumerate(missing_ids) if stopped_new[idx]}
+        store_fitness(cache, [entry for entry in new_entries if entry[0] not in stopped_keys])
+
+    fitness_all = [found[key][0] for key in keys]
+    tracker_all = {index: found[key][1] for index, key in enumerate(keys) if track_individuals}
+    return fitness_all, tracker_all, [key in stopped_keys for key in keys]
+
+
+def simulate_multi_core(gene_pool, evo_config, track_individuals=True, num_cores=1, pool=None, batch_size=1,
+                        cache=None, cutoff=None, broker=None, return_stopped=False):
+    """Performs direct simulation on multiple CPU cores.
 
-        # start parallel processes
-        for process in processes:
-            process.start()
+    To use multi core processing, we exploit the fact, that individuals can be simulated independently. Thus the gene
+    pool is split into mostly evenly sized parts and for each part the simulation is run on a separate CPU core. Workers
+    write fitness values and tracked samples into shared memory allocated per call (see
+    :func:`src.simulation._make_result_buffers`), only completion signals are sent back.
 
-        unsorted_result = []
-        # get data from queue on the fly to avoid overflow
-        while any([process.is_alive() for process in processes]):
-            while not q_out.empty():
-                unsorted_result.append(q_out.get(block=True, timeout=None))
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    evo_config : dict
+        Configuration file for the current simulation.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    num_cores : int
+        Number of CPU cores used for the simulation. If -1, all available cores will be utilized.
+    pool : multiprocessing.pool.Pool | None
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`. If given, workers pull batches of
+        ``batch_size`` individuals from a shared queue (see :func:`src.simulation._simulate_scheduled`). Individuals
+        are always simulated with ``evo_config``, which is only sent to the workers if it differs from the
+        configuration the pool was created with. If None, new processes are started for this call.
+    batch_size : int
+        Number of individuals per batch when using a persistent pool or a broker.
+    cache : dict | None
+        Fitness cache opened with :func:`src.cache.open_fitness_cache`. If given, only genomes not found in the cache
+        are simulated. Do not use a cache if simulations are not deterministic.
+    cutoff : float | None
+        Fitness needed to be selected, used to stop hopeless individuals early if configured. See
+        :func:`src.simulation.simulate_pop`.
+    broker : dict | None
+        Broker created by :func:`src.distributed.start_broker`. If given, batches of ``batch_size`` individuals are
+        simulated by evaluation workers connected to the broker from any host (see
+        :func:`src.simulation.run_evaluation_worker`) instead of local processes and ``pool`` is ignored.
+    return_stopped : bool
+        Whether to return which individuals were stopped early as well.
 
-    # for unix-oid systems
-    else:
-        manager = mp.Manager()
-        unsorted_result = manager.list()
+    Returns
+    -------
+    fitness_all : list
+        List of fitness values for all individuals after merging results.
+    tracker_all : dict
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. See
+        :func:`src.simulation.simulate_pop`.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order. Only returned if ``return_stopped`` is True.
+    """
 
-        pool = mp.Pool(processes=num_cores)
-        pool.imap_unordered(worker, [[ind, data, evo_config, track_individuals]
-                                     for ind, data in enumerate(split_gene_pool)])
-        pool.close()
-        pool.join()
+    if cache is not None:
+        results = _simulate_cached(gene_pool, evo_config, track_individuals, num_cores, pool, batch_size, cache,
+                                   cutoff, broker)
 
-    # since incoming results are not sorted due to different run times of the processes, sort them
-    sorted_fitness = [t[1] for t in sorted(unsorted_result)]
-    sorted_tracker = [t[2] for t in sorted(unsorted_result)]
+    # evaluation workers of a broker already hold the evolution configuration and a physics server
+    elif broker is not None:
+        results = _simulate_distributed(gene_pool, evo_config, track_individuals, broker, batch_size, cutoff)
 
-    # make fitness output
-    fitness_all = []
+    # workers of a persistent pool already hold a physics server and usually the evolution configuration
+    elif pool is not None:
+        results = _simulate_scheduled(gene_pool, evo_config, track_individuals, pool, batch_size, cutoff)
+    else:
+        results = _simulate_processes(gene_pool, evo_config, track_individuals, num_cores, cutoff)
+    return results if return_stopped else results[:2]
 
-    # fitness all accumulates all results to one single list such that the distinction between cores is not made anymore
-    for sub_pop in sorted_fitness:
-        fitness_all += sub_pop
 
-    # make tracker output
-    tracker_all = {}
-    counter = 0
-    for sub_pop in sorted_tracker:
-        for key in sub_pop.keys():
-            tracker_all[counter] = sub_pop[key]
-            counter += 1
+def _simulate_processes(gene_pool, evo_config, track_individuals, num_cores, cutoff=None):
+    """Simulates a gene pool on new processes, one evenly sized part of the gene pool per CPU core.
 
-    return fitness_all, tracker_all
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
+    evo_config : dict
+        Configuration file for the current simulation.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    num_cores : int
+        Number of CPU cores used for the simulation.
+    cutoff : float | None
+        Selection cutoff for early stopping. See :func:`src.simulation.simulate_pop`.
 
+    Returns
+    -------
+    fitness_all : list
+        Fitness values for all individuals in gene pool order.
+    tracker_all : dict
+        Samples recorded for each individual. Keys are the indices of the individuals within the gene pool. See
+        :func:`src.simulation.simulate_pop`.
+    stopped_all : list
+        Whether each individual was stopped early, in gene pool order.
+    """
 
-def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individuals=True, sim_id=None):
+    # perform simulation using multiprocessing library (on multiple CPU cores) by splitting the amount of individuals
+    # into as many chunks as CPU cores were requested. Workers write their results into shared memory, which works the
+    # same on windows and unix-oid systems
+    buffers, blocks = _make_result_buffers(len(gene_pool), evo_config, track_individuals)
+    try:
+        shared_gene_pool = _share_gene_pool(gene_pool, blocks)
+        tasks = [[int(chunk[0]), int(chunk[-1]) + 1, shared_gene_pool, evo_config, track_individuals, cutoff, buffers]
+                 for chunk in np.array_split(np.arange(len(gene_pool)), num_cores) if len(chunk) > 0]
+        with mp.Pool(processes=num_cores) as pool:
+            for _ in pool.imap_unordered(worker, tasks):
+                pass
+        return _read_results(buffers, blocks)
+    finally:
+        _release_result_buffers(blocks)
+
+
+def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individuals=True, sim_id=None,
+                 actuation='array', cutoff=None):
     """Genomes for multiple individuals are converted into multi bodies and simulated using `pybullet`.
 
     Parameters
     ----------
-    gene_pool : list
+    gene_pool : list | GenePool
         List of genomes for all individuals. Created using :func:`src.IO.new_gene_pool`.
     evo_config : dict
         Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
@@ -158,6 +981,13 @@ def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individua
         Whether to collect position data for all individuals.
     sim_id : int
         Index pointing to the physics server of the respective simulation.
+    actuation : str
+        ``'array'`` sends one motor command per individual and step for all joints, ``'limb'`` sends one command per
+        joint (reference mode). See :func:`src.individual._actuate`.
+    cutoff : float | None
+        Fitness an individual needs to reach in order to be selected (e.g. obtained from the previous generation via
+        :func:`src.evolution.selection_cutoff`). If given and early stopping is configured, individuals that can no
+        longer reach it are stopped early. See :func:`src.simulation._check_early_stopping`.
 
     Returns
     -------
@@ -165,8 +995,14 @@ def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individua
         List of ind_ids for multiple individuals.
     sim_id : int
         Index pointing to the physics server of the respective simulation.
-    tracker : dict
-        Paths recorded for each individual. Key values represent individual IDs within the simulation.
+    tracker : np.array | None
+        Samples recorded for each individual of shape (individuals, samples, values) in order of pop, None if
+        individuals are not tracked. Each sample holds x and y followed by the channels configured in
+        ``evo_config['simulation']['tracking']``, see :func:`src.individual._tracking_config`. Samples after an
+        individual was stopped are nan.
+    stopped : dict
+        Fitness of each individual that was stopped early. Key values represent individual IDs within the simulation.
+        Stopped individuals are removed from the simulation.
     """
 
     # simulate all individuals of one generation
@@ -176,41 +1012,73 @@ def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individua
         else:
             sim_id = _make_sim_env('gui')
 
-    # create multi body IDs for all individuals in pop (given by gene in gene pool)
-    pop = [_genome2simulation(sim_id, evo_config, genome) for genome in gene_pool]
-    _disable_collision(sim_id, pop)
+    # create multi body IDs for all individuals in pop (given by gene in gene pool) and isolate each one right away,
+    # such that individuals never overlap within the collision detection
+    pop = []
+    for genome in gene_pool:
+        pop.append(_genome2simulation(sim_id, evo_config, genome))
+        _disable_collision(sim_id, pop[-1:])
 
-    duration_steps = evo_config['simulation']['fps'] * evo_config['simulation']['duration']
+    # a coarser time step covers the duration in fewer steps, each step advancing the move patterns accordingly
+    step_size = evo_config['simulation'].get('time_step_factor', 1)
+    p.setTimeStep(_TIME_STEP * step_size, physicsClientId=sim_id)
+    duration_steps = _duration_steps(evo_config)
 
     # wrap some arguments from argument parser
     step = 0
     if args is not None:
         slow_factor = args.slow_down_factor
         if args.duration is not None:
-            duration_steps = args.duration * evo_config['simulation']['fps']
+            duration_steps = args.duration * evo_config['simulation']['fps'] // step_size
     else:
         slow_factor = 1
 
     if duration_steps < 0:
         duration_steps = np.Inf
 
+    # compile controllers once, such that each step only looks up target positions and sends motor commands
+    controllers = [_compile_controller(indiv, genome, evo_config, sim_id, duration_steps, step_size=step_size)
+                   for indiv, genome in zip(pop, gene_pool)]
+
+    # steps at which individuals that can no longer reach the cutoff are stopped
+    early_stopping = evo_config['simulation'].get('early_stopping')
+    if early_stopping is not None and cutoff is not None and np.isfinite(duration_steps):
+        checkpoints = {int(duration_steps * fraction) - 1 for fraction in early_stopping['checkpoints']}
+    else:
+        checkpoints = set()
+
+    # preallocate the tracker, samples of individuals that are stopped early remain nan
+    tracking = _tracking_config(evo_config)
+    if track_individuals:
+        if np.isfinite(duration_steps):
+            num_samples = int(np.ceil(duration_steps / tracking['interval']))
+        else:
+            num_samples = 1024
+        tracker = np.full((len(pop), num_samples, _track_width(tracking['channels'])), np.nan, dtype=np.float32)
+    else:
+        tracker = None
+    rows = {indiv: row for row, indiv in enumerate(pop)}
+
     # actual simulation
-    tracker = {}
+    stopped = {}
     follow_indiv = pop[0]
-    while p.isConnected(sim_id) and step < duration_steps:
+    while p.isConnected(sim_id) and step < duration_steps and len(controllers) > 0:
         p.stepSimulation(physicsClientId=sim_id)
 
         # move all limbs
-        for indiv, genome in zip(pop, gene_pool):
-            _move_individual(indiv, genome, step, evo_config, sim_id)
+        for controller in controllers:
+            _actuate(controller, step, sim_id, actuation)
 
-            # record x and y position every 10th step to avoid memory overflow
-            if track_individuals and step % 10 == 0:
-                x, y = _get_pos(indiv, sim_id)
-                if indiv in tracker.keys():
-                    tracker[indiv].append([x, y])
-                else:
-                    tracker[indiv] = [[x, y]]
+        # record position (and further channels if configured) every few steps to avoid memory overflow
+        if tracker is not None and step % tracking['interval'] == 0:
+            sample = step // tracking['interval']
+
+            # simulations of infinite duration (GUI) grow the tracker as needed
+            if sample >= tracker.shape[1]:
+                tracker = np.concatenate([tracker, np.full_like(tracker, np.nan)], axis=1)
+
+            for controller in controllers:
+                tracker[rows[controller['ind_id']], sample] = _track_state(controller, tracking['channels'], sim_id)
 
         # set camera position to position of first individual in pop
         if args is not None:
@@ -219,11 +1087,86 @@ def simulate_pop(gene_pool, evo_config, args=None, direct=False, track_individua
                 p.resetDebugVisualizerCamera(cameraDistance=15, cameraYaw=30, cameraPitch=-52,
                                              cameraTargetPosition=target)
 
+        if step in checkpoints:
+            stopped.update(_check_early_stopping(controllers, (step + 1) / duration_steps, cutoff, early_stopping,
+                                                 sim_id))
+            controllers = [controller for controller in controllers if controller['ind_id'] not in stopped]
+
         # for GUI only
         if not direct:
-            time.sleep(1. / evo_config['simulation']['fps'] * slow_factor)
+            time.sleep(step_size / evo_config['simulation']['fps'] * slow_factor)
         step += 1
-    return pop, sim_id, tracker
+
+    if tracker is not None:
+        tracker = tracker[:, :int(np.ceil(step / tracking['interval']))]
+    return pop, sim_id, tracker, stopped
+
+
+def _duration_steps(evo_config):
+    """Returns the number of steps of a simulation.
+
+    Each step advances the move patterns by ``evo_config['simulation']['time_step_factor']`` entries (default 1) and
+    the physics by as many default time steps, hence a larger factor simulates the same duration in fewer, coarser
+    steps. See :mod:`src.screening`.
+
+    Parameters
+    ----------
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+
+    Returns
+    -------
+    duration_steps : int | float
+        Number of steps, negative for an infinite simulation.
+    """
+
+    return evo_config['simulation']['fps'] * evo_config['simulation']['duration'] // \
+        evo_config['simulation'].get('time_step_factor', 1)
+
+
+def _check_early_stopping(controllers, progress, cutoff, early_stopping, sim_id):
+    """Stops individuals that can no longer realistically reach the selection cutoff.
+
+    The final fitness of each individual is estimated by linear extrapolation of its current distance, i.e.
+    ``distance / progress``. If the estimate multiplied by ``early_stopping['margin']`` is still below the cutoff, the
+    individual is stopped and removed from the simulation. Its fitness is determined by ``early_stopping['policy']``:
+
+    * ``'freeze'``: the distance reached when stopped
+    * ``'extrapolate'``: the extrapolated distance ``distance / progress``
+
+    Both are below the cutoff, hence stopped individuals are ranked behind all individuals reaching the cutoff.
+
+    Parameters
+    ----------
+    controllers : list
+        Compiled controllers of all individuals that are still simulated. See
+        :func:`src.individual._compile_controller`.
+    progress : float
+        Fraction of the simulation duration that has passed.
+    cutoff : float
+        Fitness needed to be selected.
+    early_stopping : dict
+        Early stopping configuration. See :func:`src.IO.make_default_evo_config`.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+
+    Returns
+    -------
+    stopped : dict
+        Fitness of each individual that was stopped. Key values represent individual IDs within the simulation.
+    """
+
+    stopped = {}
+    for controller in controllers:
+        indiv = controller['ind_id']
+        distance = get_dist(indiv, sim_id)
+        if distance / progress * early_stopping['margin'] < cutoff:
+            if early_stopping['policy'] == 'extrapolate':
+                stopped[indiv] = distance / progress
+            else:
+                stopped[indiv] = distance
+            p.removeBody(indiv, physicsClientId=sim_id)
+    return stopped
 
 
 def _make_sim_env(gui_or_direct):
@@ -248,12 +1191,45 @@ def _make_sim_env(gui_or_direct):
     else:
         sim_id = p.connect(p.DIRECT)
 
+    _populate_sim_env(sim_id)
+    return sim_id
+
+
+def _reset_sim_env(sim_id):
+    """Removes all objects from a simulation while keeping the connection to the physics server.
+
+    Afterwards the simulation is in the same state as a newly created one. See :func:`src.simulation._make_sim_env`.
+
+    Parameters
+    ----------
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+    """
+
+    p.resetSimulation(physicsClientId=sim_id)
+    _populate_sim_env(sim_id)
+
+
+def _populate_sim_env(sim_id):
+    """Initializes default settings like gravity and a world plane for an empty simulation.
+
+    Parameters
+    ----------
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+    """
+
     # gravity -10 to make simulation computationally easier
     p.setGravity(0, 0, -10, physicsClientId=sim_id)
 
+    # process contacts in an order that does not depend on other individuals in the same simulation, such that the
+    # fitness of an individual does not depend on how the population is split up
+    p.setPhysicsEngineParameter(deterministicOverlappingPairs=1, physicsClientId=sim_id)
+
     # surface
-    p.createMultiBody(0, p.createCollisionShape(p.GEOM_PLANE, physicsClientId=sim_id), physicsClientId=sim_id)
-    return sim_id
+    plane = p.createMultiBody(0, p.createCollisionShape(p.GEOM_PLANE, physicsClientId=sim_id), physicsClientId=sim_id)
+    p.setCollisionFilterGroupMask(plane, -1, _PLANE_COLLISION_GROUP, _INDIVIDUAL_COLLISION_GROUP,
+                                  physicsClientId=sim_id)
 
 
 def _get_start_height(genome):
@@ -494,6 +1470,12 @@ def _disable_collision(sim_id, pop):
 
     This is to ensure that simultaneously simulated multi bodies do not interfere with each other by collision.
 
+    Instead of filtering each pair of links of each pair of individuals, all links of all individuals are put into
+    the same collision group, which only collides with the group of the world plane (see
+    :func:`src.simulation._populate_sim_env`). Hence the number of calls grows linearly with the population size. Call
+    this function for each individual right after its creation, such that individuals never overlap within the
+    collision detection.
+
     Parameters
     ----------
     sim_id : int
@@ -502,13 +1484,8 @@ def _disable_collision(sim_id, pop):
         List of ind_ids for multiple individuals.
     """
 
-    # disable collision between each joint in individual i and each joint in individual j
-    for idx, individual in enumerate(pop[:-1]):  # from first to second last
-        for other_individual in pop[idx + 1:]:  # from next (relative to above) to end
-
-            # pair all link indices and disable collision (num of joints = num of links)
-            for joint in range(-1, p.getNumJoints(individual, physicsClientId=sim_id)):  # all joints to ...
-                for other_joint in range(-1, p.getNumJoints(other_individual,
-                                                            physicsClientId=sim_id)):  # ... all other joints
-                    p.setCollisionFilterPair(individual, other_individual, joint, other_joint, 0,
-                                             physicsClientId=sim_id)
+    # individuals only collide with the plane, i.e. neither with each other nor with themselves
+    for individual in pop:
+        for joint in range(-1, p.getNumJoints(individual, physicsClientId=sim_id)):
+            p.setCollisionFilterGroupMask(individual, joint, _INDIVIDUAL_COLLISION_GROUP, _PLANE_COLLISION_GROUP,
+                                          physicsClientId=sim_id)
@@ -0,0 +1,166 @@
+from src.simulation import simulate_async
+from src.evolution import select_pair, selection_cutoff, crossing, batch_crossing
+from src.gene_pool import GenePool
+import numpy as np
+import queue
+
+
+def steady_state(gene_pool, evo_config, pool, num_generations, track_individuals=True, max_pending=1, cutoff=None):
+    """Evolves a population without waiting for whole generations to be simulated.
+
+    Individuals are simulated one by one on a persistent pool. As soon as a simulation finished, the individual enters
+    the population if it is better than the worst one and a new child is bred from the current population and handed
+    to the pool right away, such that workers neither wait for the slowest simulation of a generation nor for the
+    crossing of the next one. Parents are picked by :func:`src.evolution.select_pair`, with the distribution of
+    :func:`src.evolution.selection`, from the population ranked by fitness and crossed by :func:`src.evolution.batch_crossing` (or :func:`src.evolution.crossing`, see
+    ``batch_crossing`` in the evolution configuration).
+
+    Every ``n`` finished simulations, with ``n`` being the size of the population, make up a virtual generation, which
+    is reported like a generation of the generational evolution. All random numbers are drawn in the calling process,
+    but the order in which simulations finish varies, hence evolutions are not reproducible.
+
+    Parameters
+    ----------
+    gene_pool : list | GenePool
+        Initial genomes, simulated first. Their number determines the size of the population.
+    evo_config : dict
+        Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
+    pool : multiprocessing.pool.Pool
+        Persistent worker pool created by :func:`src.simulation.make_worker_pool`.
+    num_generations : int
+        Number of virtual generations, i.e. ``num_generations * n`` simulations are performed.
+    track_individuals : bool
+        Whether to collect position data for all individuals.
+    max_pending : int
+        Number of simulations handed to the pool at any time. Use more than the number of workers, such that workers
+        do not wait for the next child.
+    cutoff : float | None
+        Selection cutoff for early stopping of the initial genomes. Children are simulated with the cutoff of the
+        population they were bred from. See :func:`src.simulation.simulate_pop`.
+
+    Returns
+    -------
+    generations : generator
+        For each virtual generation a tuple of
+
+        * ``evaluated``: GenePool of the ``n`` individuals simulated within the virtual generation, in the order the
+          simulations finished
+        * ``fitness``: list of their fitness values
+        * ``tracker``: dictionary of their recorded samples, keys are indices within ``evaluated``
+        * ``population``: GenePool of the current population
+        * ``cutoff``: selection cutoff of the current population
+    """
+
+    initial = list(GenePool.from_genomes(gene_pool))
+    num_individuals = len(initial)
+    num_simulations = num_generations * num_individuals
+
+    # results are put into a queue by threads of the pool
+    finished = queue.Queue()
+    population, population_fitness = [], []
+    ranking, population_cutoff = None, None
+    evaluated, evaluated_fitness, evaluated_tracker = [], [], {}
+    num_started, num_finished = 0, 0
+
+    while num_finished < num_simulations:
+
+        # keep the pool busy, children are bred as soon as enough individuals were simulated to select from
+        while num_started < num_simulations and num_started - num_finished < max_pending:
+            if num_started < num_individuals:
+                genome, genome_cutoff = initial[num_started], cutoff
+            elif len(population) >= 4:
+                # the population is only ranked again once it changed
+                if ranking is None:
+                    ranking = np.argsort(population_fitness)[::-1]
+                    population_cutoff = selection_cutoff(population_fitness)
+                genome = _breed(population, ranking, evo_config)
+                genome_cutoff = population_cutoff
+            else:
+                break
+
+            simulate_async([genome], pool, evo_config=evo_config, track_individuals=track_individuals,
+                           cutoff=genome_cutoff,
+                           callback=lambda result, genome=genome: finished.put((genome, result, None)),
+                           error_callback=lambda error: finished.put((None, None, error)))
+            num_started += 1
+
+        genome, result, error = finished.get()
+        if error is not None:
+            raise error
+        num_finished += 1
+
+        fitness_ind, tracker_ind = result[0][0], result[1].get(0)
+        if _replace_worst(population, population_fitness, genome, fitness_ind, num_individuals):
+            ranking = None
+
+        if tracker_ind is not None:
+            evaluated_tracker[len(evaluated)] = tracker_ind
+        evaluated.append(genome)
+        evaluated_fitness.append(fitness_ind)
+
+        if len(evaluated) == num_individuals:
+            yield GenePool.from_genomes(evaluated), evaluated_fitness, evaluated_tracker, \
+                GenePool.from_genomes(population), selection_cutoff(population_fitness)
+            evaluated, evaluated_fitness, evaluated_tracker = [], [], {}
+
+
+def _breed(population, ranking, evo_config):
+    """Breeds one child from the population. See :func:`src.steady_state.steady_state`.
+
+    Parameters
+    ----------
+    population : list
+        Genomes of the population.
+    ranking : np.array
+        Indices of the population sorted descending with respect to fitness.
+    evo_config : dict
+        Configuration file for the current simulation.
+
+    Returns
+    -------
+    genome : tuple
+        Genome of the child.
+    """
+
+    # the pair follows the rank based distribution of the selection
+    parent_0, parent_1 = select_pair(ranking)
+    parents = [population[parent_0], population[parent_1]]
+
+    if evo_config['evolution'].get('batch_crossing', False):
+        return batch_crossing([(0, 1)], parents, evo_config)[0]
+    return crossing([(0, 1)], parents, evo_config)[0]
+
+
+def _replace_worst(population, population_fitness, genome, fitness_ind, num_individuals):
+    """Adds an individual to the population, which replaces the worst individual once the population is complete.
+
+    Parameters
+    ----------
+    population : list
+        Genomes of the population, modified in place.
+    population_fitness : list
+        Fitness of each individual of the population, modified in place.
+    genome : tuple
+        Genome of the new individual.
+    fitness_ind : float
+        Fitness of the new individual.
+    num_individuals : int
+        Size of the complete population.
+
+    Returns
+    -------
+    changed : bool
+        Whether the individual entered the population.
+    """
+
+    if len(population) < num_individuals:
+        population.append(genome)
+        population_fitness.append(fitness_ind)
+        return True
+
+    worst = int(np.argmin(population_fitness))
+    if fitness_ind > population_fitness[worst]:
+        population[worst] = genome
+        population_fitness[worst] = fitness_ind
+        return True
+    return False
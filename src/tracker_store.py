@@ -0,0 +1,197 @@
+from src.checkpoint import atomic_write
+import numpy as np
+import pickle
+import os
+
+
+class TrackerStore:
+    """Tracked paths of an evolution stored as one compressed chunk per generation.
+
+    Each generation is written to ``gen_<generation>.npz`` within the store directory by
+    :func:`src.tracker_store.append_tracker`. A chunk holds the indices of all tracked individuals, the length of each
+    path and all paths concatenated as float32 samples (x, y and further tracked values). Saving a generation
+    therefore only writes that generation, and nothing but the generations that are accessed is loaded.
+
+    A ``TrackerStore`` can be used like the list of tracker dictionaries that was pickled to ``tracker.pkl`` before:
+    ``len`` returns the number of stored generations and indexing with a generation number returns the tracker
+    dictionary of that generation, loaded from disk on access. The listing of the directory is cached and only read
+    again once the directory has been modified.
+
+    Parameters
+    ----------
+    tracker_dir : str
+        Directory holding the chunks.
+    """
+
+    def __init__(self, tracker_dir):
+        self.tracker_dir = tracker_dir
+        self._listing = None
+        self._listing_mtime = None
+
+    @property
+    def generations(self):
+        """list: Sorted numbers of all stored generations."""
+
+        return list(self._generation_set()[0])
+
+    def __len__(self):
+        return len(self._generation_set()[0])
+
+    def __contains__(self, generation):
+        return generation in self._generation_set()[1]
+
+    def __getitem__(self, generation):
+        """Returns the tracker dictionary of a generation, raises a KeyError if it is not stored."""
+
+        if generation not in self:
+            # the modification time may not have changed if the chunk was written within the same clock tick
+            self._listing = None
+            if generation not in self:
+                raise KeyError('Generation {} is not in tracker store {}.'.format(generation, self.tracker_dir))
+
+        return load_tracker_chunk(self.tracker_dir, generation)
+
+    def __iter__(self):
+        for generation in self.generations:
+            yield load_tracker_chunk(self.tracker_dir, generation)
+
+    def _generation_set(self):
+        """Returns the sorted generations and a set of them, listing the directory only if it was modified."""
+
+        try:
+            mtime = os.stat(self.tracker_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._listing is None or mtime != self._listing_mtime:
+            generations = tracker_generations(self.tracker_dir)
+            self._listing = (tuple(generations), set(generations))
+            self._listing_mtime = mtime
+
+        return self._listing
+
+
+def append_tracker(tracker, generation, tracker_dir):
+    """Writes the tracker of a single generation to a tracker store.
+
+    Parameters
+    ----------
+    tracker : dict
+        Tracker for one generation. Each key is a different individual, each value the samples of shape
+        (samples, values) recorded for it, starting with x and y. See :func:`src.simulation.simulate_pop`.
+    generation : int
+        Number of the generation.
+    tracker_dir : str
+        Directory of the tracker store, created if needed.
+    """
+
+    os.makedirs(tracker_dir, exist_ok=True)
+
+    individuals = np.array(sorted(tracker.keys()), dtype=np.int64)
+    paths = [np.asarray(tracker[ind], dtype=np.float32) for ind in individuals]
+    lengths = np.array([len(path) for path in paths], dtype=np.int64)
+    paths = np.concatenate(paths) if len(paths) > 0 else np.zeros((0, 2), dtype=np.float32)
+
+    # write to a temporary file first, such that an interrupted evolution does not leave a broken chunk behind
+    atomic_write(_chunk_file(tracker_dir, generation),
+                 lambda chunk_file: np.savez_compressed(chunk_file, individuals=individuals, lengths=lengths,
+                                                        paths=paths))
+
+
+def load_tracker_chunk(tracker_dir, generation):
+    """Loads the tracker of a single generation from a tracker store.
+
+    Parameters
+    ----------
+    tracker_dir : str
+        Directory of the tracker store.
+    generation : int
+        Number of the generation.
+
+    Returns
+    -------
+    tracker : dict
+        Tracker for one generation. Each key is a different individual, each value an array of samples starting with x
+        and y.
+    """
+
+    with np.load(_chunk_file(tracker_dir, generation)) as chunk:
+        offsets = np.cumsum(chunk['lengths']) - chunk['lengths']
+        paths = chunk['paths']
+        return {int(ind): paths[offset:offset + length]
+                for ind, offset, length in zip(chunk['individuals'], offsets, chunk['lengths'])}
+
+
+def tracker_generations(tracker_dir):
+    """Finds all generations within a tracker store.
+
+    Parameters
+    ----------
+    tracker_dir : str
+        Directory of the tracker store.
+
+    Returns
+    -------
+    generations : list
+        Sorted generation numbers. Empty if the directory does not exist.
+    """
+
+    if not os.path.isdir(tracker_dir):
+        return []
+
+    return sorted(int(file[len('gen_'):-len('.npz')]) for file in os.listdir(tracker_dir)
+                  if file.startswith('gen_') and file.endswith('.npz'))
+
+
+def clear_tracker(tracker_dir, first_generation=0):
+    """Removes generations from a tracker store, e.g. because they are about to be simulated again.
+
+    Parameters
+    ----------
+    tracker_dir : str
+        Directory of the tracker store.
+    first_generation : int
+        All generations starting from this one are removed.
+    """
+
+    for generation in tracker_generations(tracker_dir):
+        if generation >= first_generation:
+            os.remove(_chunk_file(tracker_dir, generation))
+
+
+def migrate_tracker(filename='tracker.pkl', tracker_dir=None, first_generation=0):
+    """Converts a ``tracker.pkl`` file of an older evolution to a tracker store.
+
+    The pickle file is left untouched and can be removed once the store has been checked.
+
+    Parameters
+    ----------
+    filename : str
+        Pickle file holding a list of tracker dictionaries, one per generation.
+    tracker_dir : str | None
+        Directory of the tracker store. If None, a directory ``tracker`` next to filename is used.
+    first_generation : int
+        Generation number of the first entry in the pickle file.
+
+    Returns
+    -------
+    tracker_dir : str
+        Directory of the tracker store.
+    """
+
+    if tracker_dir is None:
+        tracker_dir = os.path.join(os.path.dirname(filename), 'tracker') + os.path.sep
+
+    with open(filename, 'rb') as pkl_file:
+        tracker_over_gen = pickle.load(pkl_file)
+
+    for generation, tracker in enumerate(tracker_over_gen, start=first_generation):
+        append_tracker(tracker, generation, tracker_dir)
+
+    return tracker_dir
+
+
+def _chunk_file(tracker_dir, generation):
+    """Returns the file name of the chunk of a generation."""
+
+    return os.path.join(tracker_dir, 'gen_{}.npz'.format(generation))
@@ -8,36 +8,46 @@ def show_multiple_gen_paths(gen_tracked_paths):
     """Plots paths for multiple generations.
 
     Creates 5 plots evenly spaced across the selected evolution, such that the first and last generation is included.
-    Plots show tracked paths for each individual as seen from on top.
+    Plots show tracked paths for each individual as seen from on top. Only the plotted generations are accessed, hence
+    only those are loaded from a :class:`src.tracker_store.TrackerStore`.
 
     Parameters
     ----------
-    gen_tracked_paths : list
+    gen_tracked_paths : list | TrackerStore
         Tracker for multiple generations.
     """
 
+    # a tracker store is indexed by generation number and need not start at generation 0
+    if hasattr(gen_tracked_paths, 'generations'):
+        stored_gens = gen_tracked_paths.generations
+    else:
+        stored_gens = list(range(len(gen_tracked_paths)))
+
+    # ensure enough generations to be split in 5 plots
+    if len(stored_gens) > 4:
+        gens = list(range(0, len(stored_gens), int(len(stored_gens) / 5)))
+    else:
+        gens = list(range(len(stored_gens)))
+
+    # ensure last generation is displayed
+    if not gens[-1] == (len(stored_gens) - 1):
+        gens += [len(stored_gens) - 1]
+
+    gens = [stored_gens[idx] for idx in gens]
+    selected_tracked_paths = [gen_tracked_paths[gen] for gen in gens]
+
     # show paths for multiple generations
     coord_max = 0
 
     # find maximum coordinate for axis scaling
-    for tracked_paths in gen_tracked_paths:
+    for tracked_paths in selected_tracked_paths:
         for key in tracked_paths.keys():
             tracked_path = np.asarray(tracked_paths[key])
             if np.max(np.abs(tracked_path)) > coord_max:
                 coord_max = np.max(np.abs(tracked_path))
 
-    # ensure enough generations to be split in 5 plots
-    if len(gen_tracked_paths) > 4:
-        gens = list(range(0, len(gen_tracked_paths), int(len(gen_tracked_paths) / 5)))
-    else:
-        gens = list(range(len(gen_tracked_paths)))
-
-    # ensure last generation is displayed
-    if not gens[-1] == (len(gen_tracked_paths) - 1):
-        gens += [len(gen_tracked_paths) - 1]
-
     # set plotting title according to selected or index
-    for idx, tracked_paths in enumerate([gen_tracked_paths[gen] for gen in gens]):
+    for idx, tracked_paths in enumerate(selected_tracked_paths):
         if gens is not None:
             gen = gens[idx]
         else:
@@ -56,13 +66,17 @@ def show_path(tracked_paths, ax_lim=None, title='paths of individuals'):
 
     Parameters
     ----------
-    tracked_paths : dict
-        Tracker for one generation. Each key is a different individual.
+    tracked_paths : dict | np.array
+        Tracker for one generation. Each key is a different individual. An array as returned by
+        :func:`src.simulation.simulate_pop` holds one individual per row.
     ax_lim : float | int
         Axis limit +- selected value.
     title : str
         Plot title.
     """
+    if not isinstance(tracked_paths, dict):
+        tracked_paths = dict(enumerate(tracked_paths))
+
     # show paths for one generation
     plt.figure()
     plt.gcf().set_facecolor('black')
@@ -140,6 +154,17 @@ def show_individual(gene_pool, evo_config, args):
         Configuration file for the current simulation. See :func:`src.IO.make_default_evo_config`.
     args : argparse.Namespace
         Parsed arguments.
+
+    Returns
+    -------
+    pop : list
+        List of ind_ids for multiple individuals.
+    sim_id : int
+        Index pointing to the physics server of the respective simulation.
+    tracker : np.array
+        Samples recorded for each individual. See :func:`src.simulation.simulate_pop`.
+    stopped : dict
+        Individuals stopped early, always empty since no selection cutoff is given.
     """
 
     # show desired simulation
@@ -0,0 +1,54 @@
+import numpy as np
+import pybullet as p
+import pytest
+import src.IO as IO
+import src.simulation as simulation
+
+
+def _make_config(individuals=3, duration=2):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = individuals
+    evo_config['simulation']['duration'] = duration
+    return evo_config
+
+
+def _simulate_recorded(gene_pool, evo_config, actuation, monkeypatch):
+    """Simulates a gene pool and records the base pose of every body after each physics step."""
+
+    poses = []
+    step_simulation = p.stepSimulation
+
+    def recording_step(physicsClientId=0):
+        step_simulation(physicsClientId=physicsClientId)
+        bodies = [p.getBodyUniqueId(idx, physicsClientId=physicsClientId)
+                  for idx in range(p.getNumBodies(physicsClientId=physicsClientId))]
+        poses.append([p.getBasePositionAndOrientation(body, physicsClientId=physicsClientId) for body in bodies])
+
+    with monkeypatch.context() as patch:
+        patch.setattr(simulation.p, 'stepSimulation', recording_step)
+        pop, sim_id, tracker, _ = simulation.simulate_pop(gene_pool, evo_config, direct=True, actuation=actuation)
+    fitness = [simulation.get_dist(indiv, sim_id) for indiv in pop]
+    p.disconnect(physicsClientId=sim_id)
+    return poses, fitness, tracker
+
+
+@pytest.mark.parametrize('seed', [0, 7])
+def test_array_actuation_matches_limb_actuation(seed, monkeypatch):
+    evo_config = _make_config()
+    np.random.seed(seed)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    poses_array, fitness_array, tracker_array = _simulate_recorded(gene_pool, evo_config, 'array', monkeypatch)
+    poses_limb, fitness_limb, tracker_limb = _simulate_recorded(gene_pool, evo_config, 'limb', monkeypatch)
+
+    # positions and orientations of all bodies are bitwise identical at every step
+    assert len(poses_array) == simulation._duration_steps(evo_config)
+    assert len(poses_array) == len(poses_limb)
+    for step, (pose_array, pose_limb) in enumerate(zip(poses_array, poses_limb)):
+        assert pose_array == pose_limb, 'poses differ at step {}'.format(step)
+
+    # individuals actually move, otherwise both modes would be trivially identical
+    assert fitness_array == fitness_limb
+    assert max(fitness_array) > 1e-3
+    np.testing.assert_array_equal(tracker_array, tracker_limb)
+
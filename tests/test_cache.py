@@ -0,0 +1,28 @@
+import numpy as np
+from src.cache import open_fitness_cache, close_fitness_cache, lookup_fitness, store_fitness
+
+
+def test_entry_count_and_eviction(tmp_path):
+    filename = str(tmp_path / 'fitness_cache.sqlite')
+    cache = open_fitness_cache(filename, max_entries=3)
+    store_fitness(cache, [('a', 1., None), ('b', 2., None)])
+    store_fitness(cache, [('a', 1., np.zeros((2, 2), np.float32)), ('c', 3., None)])
+    assert cache['num_entries'] == 3
+
+    # 'a' and 'c' are used more recently than 'b', which is evicted first
+    assert set(lookup_fitness(cache, ['a', 'c'])) == {'a', 'c'}
+    store_fitness(cache, [('d', 4., None)])
+    assert cache['num_entries'] == 3
+    assert set(lookup_fitness(cache, ['a', 'b', 'c', 'd'])) == {'a', 'c', 'd'}
+    assert cache['hits'] == 5 and cache['misses'] == 1
+
+    # entries without tracked samples count as misses if tracks are required
+    found = lookup_fitness(cache, ['a', 'c'], track_individuals=True)
+    assert list(found) == ['a'] and found['a'][1].shape == (2, 2)
+    close_fitness_cache(cache)
+
+    # the counters continue from the database when it is opened again
+    cache = open_fitness_cache(filename, max_entries=3)
+    assert cache['num_entries'] == 3
+    assert cache['last_used'] == 5
+    close_fitness_cache(cache)
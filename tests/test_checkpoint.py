@@ -0,0 +1,59 @@
+import os
+import sys
+import subprocess
+import numpy as np
+import src.IO as IO
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_clear_checkpoint(tmp_path):
+    parent_dir = str(tmp_path) + os.sep
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 4
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    for generation in [3, 4]:
+        IO.save_checkpoint(parent_dir, generation, gene_pool, None, np.random.get_state(), IO.config_hash(evo_config),
+                           generation, generation)
+    # a gene pool left behind by an interrupted checkpoint
+    IO.save_gene_pool(gene_pool, filename=parent_dir + 'checkpoint_gen_2.gp', precision='float64')
+    IO.save_gene_pool(gene_pool, filename=parent_dir + 'gen_3.gp')
+    assert IO.load_checkpoint(parent_dir)['generation'] == 4
+
+    IO.clear_checkpoint(parent_dir)
+    assert IO.load_checkpoint(parent_dir) is None
+    assert os.listdir(parent_dir) == ['gen_3.gp']
+
+    # nothing to clear
+    IO.clear_checkpoint(parent_dir)
+    IO.clear_checkpoint(parent_dir + 'missing' + os.sep)
+
+
+def _evolve(parent_dir, generations):
+    """Runs simulate_evolution.py on parent_dir, continuing from its checkpoint if there is one."""
+
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, 'simulate_evolution.py'), '-e', parent_dir, '-i', '6',
+                    '-g', str(generations), '-d', '1', '-c', '1', '-rs', '3'], cwd=REPO_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_resume_equals_uninterrupted_run(tmp_path):
+    uninterrupted, resumed = str(tmp_path / 'uninterrupted') + os.sep, str(tmp_path / 'resumed') + os.sep
+    _evolve(uninterrupted, 4)
+    _evolve(resumed, 2)
+    assert IO.load_checkpoint(resumed)['generation'] == 2
+    _evolve(resumed, 2)
+    assert IO.load_checkpoint(resumed)['generation'] == 4
+
+    for name in ['stats.bin', 'fitness.bin']:
+        with open(uninterrupted + name, 'rb') as log_file, open(resumed + name, 'rb') as other_file:
+            assert log_file.read() == other_file.read(), name
+    assert len(IO.read_run_log(resumed + 'stats.bin')) == 4
+
+    for name in ['gen_3.gp', 'checkpoint_gen_4.gp']:
+        gene_pool, other = IO.load_gene_pool(uninterrupted + name), IO.load_gene_pool(resumed + name)
+        assert np.array_equal(gene_pool.sizes, other.sizes)
+        assert np.array_equal(gene_pool.move_patterns, other.move_patterns)
+        assert np.array_equal(gene_pool.pattern_lengths, other.pattern_lengths)
@@ -0,0 +1,76 @@
+import os
+import time
+import pytest
+from src.checkpoint import start_checkpoint_writer, submit_checkpoint, checkpoint_status, close_checkpoint_writer, \
+    atomic_write
+
+
+def _write_text(filename, text):
+    atomic_write(filename, lambda text_file: text_file.write(text), mode='w')
+
+
+def _fail(*args):
+    raise OSError('disk full')
+
+
+def test_checkpoints_are_written_in_order(tmp_path):
+    filename = str(tmp_path / 'checkpoint.txt')
+    writer = start_checkpoint_writer(max_queue=2)
+    for generation in range(5):
+        submit_checkpoint(writer, 'gen_{}'.format(generation), _write_text, filename, text=str(generation))
+    latencies = close_checkpoint_writer(writer)
+
+    assert [label for label, _ in latencies] == ['gen_{}'.format(generation) for generation in range(5)]
+    assert checkpoint_status(writer) == (0, latencies[-1])
+    with open(filename) as text_file:
+        assert text_file.read() == '4'
+
+
+def test_writer_error_is_raised_in_main_thread(tmp_path):
+    filename = str(tmp_path / 'checkpoint.txt')
+    writer = start_checkpoint_writer()
+    submit_checkpoint(writer, 'gen_0', _write_text, filename, '0')
+    submit_checkpoint(writer, 'gen_1', _fail)
+    submit_checkpoint(writer, 'gen_2', _write_text, filename, '2')
+
+    with pytest.raises(RuntimeError) as error_info:
+        close_checkpoint_writer(writer)
+    assert isinstance(error_info.value.__cause__, OSError)
+    assert not writer['thread'].is_alive()
+
+    # checkpoints after the failed one are skipped
+    assert [label for label, _ in writer['latencies']] == ['gen_0']
+    with open(filename) as text_file:
+        assert text_file.read() == '0'
+
+
+def test_submit_raises_after_writer_error():
+    writer = start_checkpoint_writer()
+    submit_checkpoint(writer, 'gen_0', _fail)
+    deadline = time.time() + 10
+    while writer['error'] is None and time.time() < deadline:
+        time.sleep(0.01)
+
+    with pytest.raises(RuntimeError):
+        submit_checkpoint(writer, 'gen_1', _fail)
+    with pytest.raises(RuntimeError):
+        close_checkpoint_writer(writer)
+
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_atomic_write_leaves_no_partial_file(tmp_path, existing):
+    filename = str(tmp_path / 'stats.csv')
+    if existing:
+        _write_text(filename, 'previous')
+
+    def write(text_file):
+        text_file.write('partial')
+        raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        atomic_write(filename, write, mode='w')
+
+    assert os.listdir(str(tmp_path)) == (['stats.csv'] if existing else [])
+    if existing:
+        with open(filename) as text_file:
+            assert text_file.read() == 'previous'
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from scipy import stats
+import src.IO as IO
+import src.evolution as evo
+from src.gene_pool import GenePool, SIZE_KEYS, MOVE_KEYS
+
+NUM_CHILDREN = 1000
+
+
+def _ks_tolerance(num_samples):
+    """Critical value of the two sample Kolmogorov-Smirnov statistic for a significance level of 0.001."""
+
+    return 1.95 * np.sqrt(2 / num_samples)
+
+
+def _assert_same_distribution(samples, other_samples, message=''):
+    statistic = stats.ks_2samp(samples, other_samples)[0]
+    assert statistic < _ks_tolerance(len(samples)), '{}: KS statistic {:.4f}'.format(message, statistic)
+
+
+def _make_config(mutation, symmetric=False):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 2
+    evo_config['simulation']['duration'] = 40
+    evo_config['individuals']['symmetric'] = symmetric
+    if mutation:
+        evo_config['evolution'].update(mutation_prob_ind=0.8, mutation_prob_gene=0.5, mutation_prob_feature=0.3)
+    else:
+        evo_config['evolution'].update(mutation_prob_ind=0., mutation_prob_gene=0., mutation_prob_feature=0.)
+    return evo_config
+
+
+def _make_children(evo_config):
+    """Crosses the same pair of parents NUM_CHILDREN times with both implementations."""
+
+    np.random.seed(3)
+    parents = IO.new_gene_pool(None, evo_config)
+
+    # crossing resamples the patterns of the parents in place, hence each child gets its own copy of both parents
+    gene_pool = parents.take(np.tile([0, 1], NUM_CHILDREN))
+    pairs = np.arange(2 * NUM_CHILDREN).reshape(-1, 2)
+
+    np.random.seed(4)
+    children = evo.crossing(pairs, gene_pool.to_genomes(), evo_config)
+    batch_children = evo.batch_crossing(pairs, gene_pool, evo_config, rng=np.random.RandomState(5))
+    return GenePool.from_genomes(children), batch_children
+
+
+def _pattern_middles(gene_pool):
+    """Returns the value in the middle of each move pattern, one independent sample per gene and child."""
+
+    return gene_pool.move_patterns[gene_pool.pattern_offsets + gene_pool.pattern_lengths // 2].reshape(-1)
+
+
+@pytest.mark.parametrize('mutation', [False, True])
+def test_batch_crossing_matches_crossing(mutation):
+    evo_config = _make_config(mutation)
+    children, batch_children = _make_children(evo_config)
+    assert len(batch_children) == len(children) == NUM_CHILDREN
+
+    for idx, key in enumerate(SIZE_KEYS):
+        for dim in range(3):
+            _assert_same_distribution(children.sizes[:, idx, dim], batch_children.sizes[:, idx, dim],
+                                      'size {} {}'.format(key, dim))
+
+    middles, batch_middles = _pattern_middles(children), _pattern_middles(batch_children)
+    for idx, key in enumerate(MOVE_KEYS):
+        _assert_same_distribution(children.pattern_lengths[:, idx], batch_children.pattern_lengths[:, idx],
+                                  'pattern length {}'.format(key))
+        _assert_same_distribution(middles.reshape(NUM_CHILDREN, -1)[:, idx],
+                                  batch_middles.reshape(NUM_CHILDREN, -1)[:, idx], 'pattern {}'.format(key))
+
+    # all features of all children together are more sensitive, e.g. to the width of the crossing limits
+    _assert_same_distribution(children.sizes.reshape(-1), batch_children.sizes.reshape(-1), 'sizes')
+    _assert_same_distribution(middles, batch_middles, 'patterns')
+
+
+def test_batch_crossing_without_mutation_stays_within_limits():
+    evo_config = _make_config(mutation=False)
+    np.random.seed(3)
+    parents = IO.new_gene_pool(None, evo_config)
+    children = evo.batch_crossing([(0, 1)] * 100, parents, evo_config, rng=np.random.RandomState(5))
+
+    lower, upper = evo._limit((parents.sizes[0] + parents.sizes[1]) / 2, parents.sizes[0] - parents.sizes[1],
+                              evo_config)
+    assert np.all(children.sizes >= np.maximum(lower, 0.01) - 1e-12)
+    assert np.all(children.sizes <= np.maximum(upper, 0.01) + 1e-12)
+
+
+def test_batch_crossing_keeps_symmetry():
+    evo_config = _make_config(mutation=True, symmetric=True)
+    np.random.seed(3)
+    parents = IO.new_gene_pool(None, evo_config)
+    children = evo.batch_crossing([(0, 1)] * 100, parents, evo_config, rng=np.random.RandomState(5))
+
+    # unlike crossing, which checks for the mirrored gene before it was crossed and thus crosses both independently
+    for left_key, right_key in [('left_hand', 'right_hand'), ('left_foot', 'right_foot')]:
+        np.testing.assert_array_equal(children.sizes[:, SIZE_KEYS.index(left_key)],
+                                      children.sizes[:, SIZE_KEYS.index(right_key)])
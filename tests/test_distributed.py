@@ -0,0 +1,103 @@
+import time
+import socket
+import threading
+import numpy as np
+import pytest
+import src.IO as IO
+from src.distributed import start_broker, close_broker, num_workers, parse_address, is_loopback
+from src.simulation import simulate_multi_core, make_worker_pool, start_evaluation_workers
+
+
+def test_broker_defaults():
+    assert parse_address(':5000') == ('127.0.0.1', 5000)
+    assert parse_address('0.0.0.0:5000') == ('0.0.0.0', 5000)
+    assert is_loopback('127.0.0.1') and is_loopback('localhost')
+    assert not is_loopback('0.0.0.0') and not is_loopback('')
+
+    # without a secret each broker generates its own
+    brokers = [start_broker(None) for _ in range(2)]
+    try:
+        assert all(broker['address'][0] == '127.0.0.1' for broker in brokers)
+        assert len(brokers[0]['authkey']) == 32 and brokers[0]['authkey'] != brokers[1]['authkey']
+    finally:
+        for broker in brokers:
+            close_broker(broker)
+
+
+def _non_loopback_ip():
+    """Returns an IP address of this host other than a loopback address, None if there is none."""
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        try:
+            # no packet is sent, connecting a datagram socket only selects the outgoing interface
+            probe.connect(('198.51.100.1', 1))
+            host = probe.getsockname()[0]
+        except OSError:
+            return None
+    return None if is_loopback(host) else host
+
+
+@pytest.mark.parametrize('host', ['127.0.0.1', '0.0.0.0', 'interface'])
+def test_local_workers_connect_to_broker_address(host):
+    if host == 'interface':
+        host = _non_loopback_ip()
+        if host is None:
+            pytest.skip('host has no non-loopback interface')
+
+    broker = start_broker(None, address=(host, 0))
+    workers = start_evaluation_workers(broker['address'], broker['authkey'], connect_timeout=5.)
+    try:
+        start = time.time()
+        while num_workers(broker) < 1 and time.time() - start < 30:
+            time.sleep(0.1)
+        assert num_workers(broker) == 1
+    finally:
+        close_broker(broker)
+        for process in workers:
+            process.join(10)
+    assert all(process.exitcode == 0 for process in workers)
+
+
+def test_lost_worker_gives_identical_results():
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 24
+    evo_config['simulation']['duration'] = 4
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    pool = make_worker_pool(evo_config, num_cores=1)
+    try:
+        fitness, tracker = simulate_multi_core(gene_pool, evo_config, track_individuals=True, pool=pool)
+    finally:
+        pool.close()
+        pool.join()
+
+    broker = start_broker(evo_config)
+    workers = start_evaluation_workers(broker['address'], broker['authkey'], num_workers=3)
+    try:
+        start = time.time()
+        while num_workers(broker) < 3 and time.time() - start < 60:
+            time.sleep(0.1)
+        assert num_workers(broker) == 3
+
+        results = {}
+        run = threading.Thread(target=lambda: results.update(zip(
+            ['fitness', 'tracker'], simulate_multi_core(gene_pool, evo_config, track_individuals=True,
+                                                        broker=broker))))
+        run.start()
+
+        # kill one worker while the others are still busy with the generation, its batch is handed out again
+        time.sleep(0.5)
+        assert run.is_alive()
+        workers[0].kill()
+        run.join(120)
+        assert not run.is_alive()
+        assert num_workers(broker) == 2
+    finally:
+        close_broker(broker)
+        for process in workers:
+            process.join(10)
+
+    assert np.array_equal(results['fitness'], fitness)
+    assert results['tracker'].keys() == tracker.keys()
+    assert all(np.array_equal(results['tracker'][ind], tracker[ind]) for ind in tracker)
@@ -0,0 +1,64 @@
+import json
+import numpy as np
+import pytest
+import src.IO as IO
+from src.cache import open_fitness_cache, close_fitness_cache
+from src.simulation import simulate_multi_core, make_worker_pool
+
+
+def _make_config(margin=1, checkpoints=(0.5, ), policy='extrapolate'):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 4
+    evo_config['simulation']['duration'] = 1
+    evo_config['simulation']['early_stopping'] = {'checkpoints': list(checkpoints), 'policy': policy,
+                                                  'margin': margin}
+    return evo_config
+
+
+@pytest.mark.parametrize('early_stopping', [{'margin': 0.5}, {'checkpoints': [0.5, 1]}, {'checkpoints': [0]},
+                                            {'policy': 'guess'}])
+def test_invalid_config_is_rejected(early_stopping, tmp_path):
+    filename = str(tmp_path / 'evo_config.json')
+    evo_config = _make_config(**early_stopping)
+    with open(filename, 'w') as json_file:
+        json.dump(evo_config, json_file)
+
+    with pytest.raises(ValueError):
+        IO.read_evo_config(filename)
+
+
+def test_valid_config_is_read(tmp_path):
+    filename = str(tmp_path / 'evo_config.json')
+    IO.write_evo_config(_make_config(margin=2, checkpoints=(0.25, 0.75), policy='freeze'), filename)
+    assert IO.read_evo_config(filename)['simulation']['early_stopping']['margin'] == 2
+
+
+def test_stopped_individuals_are_not_cached(tmp_path):
+    evo_config = _make_config()
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    pool = make_worker_pool(evo_config, num_cores=1)
+    cache = open_fitness_cache(str(tmp_path / 'fitness_cache.sqlite'))
+    try:
+        # nobody reaches an unreachable cutoff, everybody reaches a negative one
+        fitness, _, stopped = simulate_multi_core(gene_pool, evo_config, pool=pool, cache=cache, cutoff=1e9,
+                                                  return_stopped=True)
+        assert stopped == [True] * len(gene_pool)
+        assert cache['num_entries'] == 0
+
+        fitness_full, _, stopped = simulate_multi_core(gene_pool, evo_config, pool=pool, cache=cache, cutoff=-1,
+                                                       return_stopped=True)
+        assert stopped == [False] * len(gene_pool)
+        assert cache['num_entries'] == len(gene_pool)
+        assert all(ind_fitness != ind_fitness_full for ind_fitness, ind_fitness_full in zip(fitness, fitness_full))
+
+        # found in the cache, hence not stopped
+        _, _, stopped = simulate_multi_core(gene_pool, evo_config, pool=pool, cache=cache, cutoff=1e9,
+                                            return_stopped=True)
+        assert stopped == [False] * len(gene_pool)
+        assert cache['hits'] == len(gene_pool)
+    finally:
+        close_fitness_cache(cache)
+        pool.close()
+        pool.join()
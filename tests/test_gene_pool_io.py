@@ -0,0 +1,146 @@
+import os
+import pickle
+import numpy as np
+import pytest
+import src.IO as IO
+import src.evolution as evo
+from src.gene_pool import GenePool
+from src.gene_pool_archive import MAX_DELTA_DEPTH, PACK_FILE, _load_archive, _chunk_header
+
+
+def _make_config(num_individuals=6):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = num_individuals
+    evo_config['simulation']['duration'] = 4
+    return evo_config
+
+
+def _assert_gene_pools_equal(gene_pool, expected, precision='float64'):
+    """Asserts identical genomes, the expected values rounded to the precision they were stored with."""
+
+    gene_pool, expected = GenePool.from_genomes(gene_pool), GenePool.from_genomes(expected)
+    assert len(gene_pool) == len(expected)
+    assert np.array_equal(gene_pool.pattern_lengths, expected.pattern_lengths)
+    assert np.array_equal(gene_pool.sizes, expected.sizes.astype(precision).astype(float))
+    for genome, expected_genome in zip(gene_pool.to_genomes(), expected.to_genomes()):
+        for chromosome, expected_chromosome in zip(genome, expected_genome):
+            assert chromosome.keys() == expected_chromosome.keys()
+            for key in chromosome:
+                assert np.array_equal(chromosome[key],
+                                      np.asarray(expected_chromosome[key]).astype(precision).astype(float))
+
+
+def _next_generation(gene_pool, evo_config):
+    return evo.batch_crossing(evo.selection(np.arange(len(gene_pool))), gene_pool, evo_config)
+
+
+@pytest.mark.parametrize('precision', ['float32', 'float64'])
+def test_gene_pool_file_round_trip(tmp_path, precision):
+    evo_config = _make_config(7)
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    filename = str(tmp_path / 'gen_0.gp')
+    IO.save_gene_pool(gene_pool, filename=filename, precision=precision)
+
+    assert IO.gene_pool_size(filename) == 7
+    _assert_gene_pools_equal(IO.load_gene_pool(filename), gene_pool, precision)
+
+    # selected individuals in the given order, duplicates included
+    indices = [5, 0, 5, 2]
+    _assert_gene_pools_equal(IO.load_gene_pool(filename, indices=indices), gene_pool.take(indices), precision)
+    assert len(IO.load_gene_pool(filename, indices=[])) == 0
+
+    if precision == 'float32':
+        assert not np.array_equal(IO.load_gene_pool(filename).move_patterns, gene_pool.move_patterns)
+
+
+@pytest.mark.parametrize('precision', ['float32', 'float64'])
+def test_archive_round_trip_beyond_max_delta_depth(tmp_path, precision):
+    evo_config = _make_config()
+    np.random.seed(1)
+    parent_dir = str(tmp_path) + os.sep
+
+    gene_pools = [IO.new_gene_pool(None, evo_config)]
+    for generation in range(MAX_DELTA_DEPTH + 5):
+        IO.save_gene_pool(gene_pools[-1], filename=parent_dir + 'gen_{}.gpr'.format(generation), precision=precision)
+        gene_pools.append(_next_generation(gene_pools[-1], evo_config))
+
+    depths = []
+    with open(parent_dir + PACK_FILE, 'rb') as pack:
+        for generation, gene_pool in enumerate(gene_pools[:-1]):
+            filename = IO.gene_pool_filename(parent_dir, generation)
+            assert filename.endswith('.gpr') and IO.gene_pool_size(filename) == len(gene_pool)
+            _assert_gene_pools_equal(IO.load_gene_pool(filename), gene_pool, precision)
+            _assert_gene_pools_equal(IO.load_gene_pool(filename, indices=[3, 1]), gene_pool.take([3, 1]), precision)
+
+            chunks = _load_archive(filename, None, with_chunks=True)[1]
+            depths.append([int(_chunk_header(pack, int(chunk))['depth']) for chunk in chunks])
+
+    # deltas are chained up to the maximum depth, afterwards individuals are stored in full again
+    depths = np.array(depths)
+    assert np.all(depths[0] == 0)
+    assert np.max(depths) == MAX_DELTA_DEPTH
+    assert np.any(depths[MAX_DELTA_DEPTH + 1:] < MAX_DELTA_DEPTH)
+
+
+def test_load_legacy_and_new_formats(tmp_path):
+    evo_config = _make_config()
+    np.random.seed(2)
+    parent_dir = str(tmp_path) + os.sep
+    gene_pools = [IO.new_gene_pool(None, evo_config)]
+    for _ in range(2):
+        gene_pools.append(_next_generation(gene_pools[-1], evo_config))
+
+    # generation 0 of an older evolution as pickle file, then a gene pool file and an archived gene pool
+    with open(parent_dir + 'gen_0.pkl', 'wb') as pkl_file:
+        pickle.dump(gene_pools[0].to_genomes(), pkl_file)
+    IO.save_gene_pool(gene_pools[1], filename=parent_dir + 'gen_1.gp', precision='float64')
+    IO.save_gene_pool(gene_pools[2], filename=parent_dir + 'gen_2.gpr', precision='float64')
+
+    for generation, extension in enumerate(['.pkl', '.gp', '.gpr']):
+        filename = IO.gene_pool_filename(parent_dir, generation)
+        assert filename == parent_dir + 'gen_{}{}'.format(generation, extension)
+        _assert_gene_pools_equal(IO.load_gene_pool(filename), gene_pools[generation])
+        _assert_gene_pools_equal(IO.new_gene_pool(filename, evo_config, indices=[1, 4]),
+                                 gene_pools[generation].take([1, 4]))
+    assert IO.gene_pool_filename(parent_dir, 3) == parent_dir + 'gen_3.gp'
+
+    # a gene pool file takes precedence over an archived one of the same generation
+    IO.save_gene_pool(gene_pools[1], filename=parent_dir + 'gen_2.gp', precision='float64')
+    assert IO.gene_pool_filename(parent_dir, 2) == parent_dir + 'gen_2.gp'
+
+
+@pytest.mark.parametrize('keep_files', [False, True])
+def test_compact_gene_pools_is_lossless(tmp_path, keep_files):
+    evo_config = _make_config()
+    np.random.seed(3)
+    parent_dir = str(tmp_path) + os.sep
+    gene_pools = [IO.new_gene_pool(None, evo_config)]
+    for _ in range(4):
+        gene_pools.append(_next_generation(gene_pools[-1], evo_config))
+
+    with open(parent_dir + 'gen_0.pkl', 'wb') as pkl_file:
+        pickle.dump(gene_pools[0].to_genomes(), pkl_file)
+    for generation in range(1, 4):
+        IO.save_gene_pool(gene_pools[generation], filename=parent_dir + 'gen_{}.gp'.format(generation),
+                          precision='float64' if generation < 3 else 'float32')
+    IO.save_gene_pool(gene_pools[4], filename=parent_dir + 'gen_4.gpr', precision='float64')
+
+    num_archived, bytes_before, bytes_after = IO.compact_gene_pools(parent_dir, keep_files=keep_files)
+    assert num_archived == 4 and bytes_before > 0 and bytes_after > 0
+
+    for generation, gene_pool in enumerate(gene_pools):
+        filename = parent_dir + 'gen_{}.gpr'.format(generation)
+        _assert_gene_pools_equal(IO.load_gene_pool(filename), gene_pool, 'float32' if generation == 3 else 'float64')
+
+    remaining = sorted(file for file in os.listdir(parent_dir) if file.startswith('gen_'))
+    if keep_files:
+        assert remaining == ['gen_0.gpr', 'gen_0.pkl', 'gen_1.gp', 'gen_1.gpr', 'gen_2.gp', 'gen_2.gpr', 'gen_3.gp',
+                             'gen_3.gpr', 'gen_4.gpr']
+    else:
+        assert remaining == ['gen_{}.gpr'.format(generation) for generation in range(5)]
+        assert all(IO.gene_pool_filename(parent_dir, generation) == parent_dir + 'gen_{}.gpr'.format(generation)
+                   for generation in range(5))
+
+        # compacting again finds nothing to archive
+        assert IO.compact_gene_pools(parent_dir)[0] == 0
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from src.individual import _interpolate_move_pattern, _interpolate_move_patterns
+
+# both implementations interpolate at the same positions, computed in different order
+TOLERANCE = 1e-10
+
+
+def _interpolate_move_pattern_strided(move_pattern, new_size, min_size=10, max_size=1000):
+    """Former implementation, which interpolated shortened patterns onto an enlarged vector and sliced every
+    len(move_pattern)-th value."""
+
+    if new_size < min_size:
+        new_size = min_size
+    elif new_size > max_size:
+        new_size = max_size
+
+    if len(move_pattern) > new_size:
+        int_size = new_size * len(move_pattern) - len(move_pattern) + 1
+    else:
+        int_size = new_size
+
+    x = np.linspace(0, len(move_pattern), len(move_pattern))
+    new_x = np.linspace(0, len(move_pattern), int_size)
+    interpolated_move_pattern = np.interp(new_x, x, move_pattern)
+
+    if len(move_pattern) > new_size:
+        return interpolated_move_pattern[::len(move_pattern)]
+    else:
+        return interpolated_move_pattern
+
+
+# (length, new size): upsampling, downsampling, sizes clamped to min_size and max_size=1000 and unchanged sizes
+SIZES = [(10, 37), (120, 240), (240, 361), (37, 10), (240, 120), (361, 240), (1000, 999), (240, 5), (120, 1500),
+         (1500, 2000), (1000, 1000), (240, 240), (10, 10)]
+
+
+@pytest.mark.parametrize('length, new_size', SIZES)
+def test_interpolate_move_pattern_matches_strided(length, new_size):
+    move_pattern = np.random.RandomState(length).random_sample(length) * 2 * np.pi - np.pi
+
+    expected = _interpolate_move_pattern_strided(move_pattern, new_size)
+    interpolated = _interpolate_move_pattern(move_pattern, new_size)
+    assert len(interpolated) == len(expected) == min(max(new_size, 10), 1000)
+    np.testing.assert_allclose(interpolated, expected, rtol=0, atol=TOLERANCE)
+
+    # the first and last value are kept
+    assert interpolated[0] == move_pattern[0]
+    np.testing.assert_allclose(interpolated[-1], move_pattern[-1], rtol=0, atol=TOLERANCE)
+    if new_size == length:
+        np.testing.assert_allclose(interpolated, move_pattern, rtol=0, atol=TOLERANCE)
+
+
+def test_interpolate_move_patterns_matches_strided():
+    rng = np.random.RandomState(0)
+    lengths = np.array([length for length, _ in SIZES])
+    new_sizes = np.clip([new_size for _, new_size in SIZES], 10, 1000)
+    offsets = np.cumsum(lengths) - lengths
+    move_patterns = rng.random_sample(np.sum(lengths)) * 2 * np.pi - np.pi
+
+    interpolated = _interpolate_move_patterns(move_patterns, offsets, lengths, new_sizes)
+    expected = np.concatenate([_interpolate_move_pattern_strided(move_patterns[offset:offset + length], new_size)
+                               for offset, length, new_size in zip(offsets, lengths, new_sizes)])
+    assert interpolated.shape == expected.shape
+    np.testing.assert_allclose(interpolated, expected, rtol=0, atol=TOLERANCE)
+
+    # offsets and sizes given as (individuals, genes) arrays, as done by batch_crossing
+    interpolated_2d = _interpolate_move_patterns(move_patterns, offsets[:12].reshape(3, 4), lengths[:12].reshape(3, 4),
+                                                 new_sizes[:12].reshape(3, 4))
+    np.testing.assert_array_equal(interpolated_2d, interpolated[:np.sum(new_sizes[:12])])
@@ -0,0 +1,42 @@
+import numpy as np
+import src.IO as IO
+import src.islands as islands_module
+from src.islands import start_islands, island_generations, close_islands
+
+
+def _evolve(gene_pool, evo_config, topology, seed):
+    np.random.seed(seed)
+    islands = start_islands(gene_pool, evo_config, 2, send_gene_pools=True)
+    try:
+        return list(island_generations(islands, 5, migration_interval=2, num_migrants=2, topology=topology))
+    finally:
+        close_islands(islands)
+
+
+def test_islands_report_once_per_epoch(monkeypatch):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 8
+    evo_config['simulation']['duration'] = 1
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    received = []
+    receive = islands_module._receive
+    monkeypatch.setattr(islands_module, '_receive',
+                        lambda connection, kind: received.append(kind) or receive(connection, kind))
+    generations = _evolve(gene_pool, evo_config, 'random', 1)
+
+    # epochs of 2, 2 and 1 generations, each island sends its report and its population once per epoch
+    assert received == ['epoch', 'epoch', 'population', 'population'] * 3
+    assert len(generations) == 5
+    for index, (evaluated, fitness, tracker, island_stats, population, cutoffs) in enumerate(generations):
+        assert len(evaluated) == len(fitness) == len(tracker) == 8
+        assert [row[0] for row in island_stats] == [index, index]
+        assert (population is None) == (index in (0, 2))
+        assert (cutoffs is None) == (population is None)
+
+    # seeding the calling process reproduces the evolution, including the random migration targets
+    repeated = _evolve(gene_pool, evo_config, 'random', 1)
+    for generation, other in zip(generations, repeated):
+        assert generation[1] == other[1] and generation[3] == other[3]
+        assert np.array_equal(generation[0].sizes, other[0].sizes)
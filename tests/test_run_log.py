@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import src.IO as IO
+
+
+def _rows(num_generations, width=4):
+    return [[generation] + list(np.random.rand(width - 1)) for generation in range(num_generations)]
+
+
+def test_append_read_trim_export(tmp_path):
+    np.random.seed(0)
+    filename = str(tmp_path / 'stats.bin')
+    rows = _rows(6)
+    for row in rows:
+        IO.append_run_log(row, filename=filename)
+
+    assert np.array_equal(IO.read_run_log(filename), rows)
+    assert np.array_equal(IO.read_run_log(filename)[:, 1], np.array(rows)[:, 1])
+    assert IO.load_stats(filename) == rows
+
+    with pytest.raises(ValueError):
+        IO.append_run_log([1., 2.], filename=filename)
+
+    # generations 4 and 5 are simulated again
+    assert np.array_equal(IO.trim_run_log(filename, 4), rows[:4])
+    assert np.array_equal(IO.read_run_log(filename), rows[:4])
+    IO.append_run_log(rows[4], filename=filename)
+    assert np.array_equal(IO.read_run_log(filename), rows[:5])
+
+    IO.export_run_log(filename)
+    assert np.array_equal(np.loadtxt(str(tmp_path / 'stats.csv'), delimiter=','), rows[:5])
+    assert IO.load_stats(str(tmp_path / 'stats.csv')) == rows[:5]
+
+    # trimming a missing run log creates an empty file, records are appended as usual
+    assert len(IO.trim_run_log(str(tmp_path / 'fitness.bin'), 0)) == 0
+    IO.append_run_log(rows[0], filename=str(tmp_path / 'fitness.bin'))
+    assert np.array_equal(IO.read_run_log(str(tmp_path / 'fitness.bin')), rows[:1])
+
+
+def test_bad_magic_number_is_rejected(tmp_path):
+    filename = str(tmp_path / 'stats.bin')
+    IO.save_run_log(_rows(2), filename=filename)
+    with open(filename, 'r+b') as log_file:
+        log_file.write(b'NOTALOG!')
+
+    with pytest.raises(ValueError):
+        IO.read_run_log(filename)
+    with pytest.raises(ValueError):
+        IO.append_run_log([2., 0., 0., 0.], filename=filename)
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    np.random.seed(1)
+    filename = str(tmp_path / 'stats.bin')
+    rows = _rows(3)
+    IO.save_run_log(rows, filename=filename)
+
+    # the evolution was killed while writing the record of generation 3
+    with open(filename, 'ab') as log_file:
+        log_file.write(np.array(rows[0][:2], dtype=IO.RUN_LOG_DTYPE).tobytes()[:-3])
+    assert np.array_equal(IO.read_run_log(filename), rows)
+
+    # the next record replaces the incomplete one
+    row = [3., 1., 2., 3.]
+    IO.append_run_log(row, filename=filename)
+    assert np.array_equal(IO.read_run_log(filename), rows + [row])
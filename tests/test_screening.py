@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import src.IO as IO
+import src.screening as screening_module
+from src.screening import simulate_screened, initial_promote, screening_config, _rank_correlation
+from src.simulation import simulate_multi_core, make_worker_pool
+
+SCREENING = {'duration': 1, 'time_step_factor': 2, 'promote': 0.5, 'min_promote': 0.2, 'min_correlation': 0.8,
+             'adapt': 1.5}
+
+
+def _make_config(num_individuals=8):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = num_individuals
+    evo_config['simulation']['duration'] = 2
+    evo_config['simulation']['screening'] = dict(SCREENING)
+    return evo_config
+
+
+@pytest.mark.parametrize('full_order, promote, next_promote', [(1, 0.5, 0.5 / 1.5), (1, 0.25, 0.2),
+                                                               (-1, 0.5, 0.75), (-1, 0.8, 1.)])
+def test_promote_adapts_to_rank_correlation(monkeypatch, full_order, promote, next_promote):
+    evo_config = _make_config(10)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    screened = list(np.arange(10.))
+
+    # the full simulation ranks the promoted individuals in the same or in the reverse order as the screening
+    def simulate(gene_pool, config, **kwargs):
+        if config['simulation']['screening'] is None:
+            return list(screened), {}
+        return list(full_order * np.arange(len(gene_pool), 0, -1.)), {}
+    monkeypatch.setattr(screening_module, 'simulate_multi_core', simulate)
+
+    fitness, _, screening_stats = simulate_screened(gene_pool, evo_config, promote, track_individuals=False)
+    correlation, used_promote, num_promoted, adapted = screening_stats
+    assert correlation == pytest.approx(full_order)
+    assert used_promote == promote and num_promoted == int(np.ceil(promote * 10))
+    assert adapted == pytest.approx(next_promote)
+    assert initial_promote(evo_config, [[0] + screening_stats]) == adapted
+    assert initial_promote(evo_config) == SCREENING['promote']
+
+    # the best screened individuals are replaced by their full fitness, the others keep the screened one
+    promoted = np.arange(10)[::-1][:num_promoted]
+    assert [fitness[index] for index in promoted] == list(full_order * np.arange(num_promoted, 0, -1.))
+    assert fitness[:10 - num_promoted] == screened[:10 - num_promoted]
+
+
+def test_promoted_individuals_get_full_fitness():
+    evo_config = _make_config(6)
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    pool = make_worker_pool(evo_config, num_cores=1)
+    try:
+        fitness, tracker, screening_stats = simulate_screened(gene_pool, evo_config, 0.5, pool=pool)
+        screened, screened_tracker = simulate_multi_core(gene_pool, screening_config(evo_config), pool=pool)
+        promoted = np.argsort(screened)[::-1][:screening_stats[2]]
+        full, full_tracker = simulate_multi_core(gene_pool.take(promoted), evo_config, pool=pool)
+    finally:
+        pool.close()
+        pool.join()
+
+    assert screening_stats[2] == 3
+    assert any(fitness[index] != screened[index] for index in promoted)
+    for index in range(len(gene_pool)):
+        if index in promoted:
+            position = int(np.flatnonzero(promoted == index)[0])
+            assert fitness[index] == full[position]
+            assert np.array_equal(tracker[index], full_tracker[position])
+        else:
+            assert fitness[index] == screened[index]
+            assert np.array_equal(tracker[index], screened_tracker[index])
+
+
+@pytest.mark.parametrize('fitness_screened, fitness_full, expected', [
+    ([1, 2, 3, 4], [2, 4, 6, 8], 1.),
+    ([1, 2, 3, 4], [8, 6, 4, 2], -1.),
+    ([1, 1, 2, 3], [1, 2, 3, 4], 0.9486833),
+    ([1, 1, 1, 1], [1, 2, 3, 4], 0.),
+    ([1, 2, 3, 4], [5, 5, 5, 5], 0.),
+    ([1, 2], [1, 2], 1.),
+    ([1], [1], 0.),
+    ([], [], 0.)])
+def test_rank_correlation_handles_ties_and_constants(fitness_screened, fitness_full, expected):
+    correlation = _rank_correlation(fitness_screened, fitness_full)
+    assert not np.isnan(correlation)
+    assert correlation == pytest.approx(expected)
@@ -0,0 +1,132 @@
+import random
+import numpy as np
+import pytest
+from scipy import stats
+from src.evolution import selection, select_pair
+
+# largest difference of the frequency of a rank (as survivor or partner) between both implementations
+FREQUENCY_TOLERANCE = 0.01
+
+
+def _selection_setdiff(sorted_pop):
+    """Former implementation, which drew each partner from np.setdiff1d of all survivors and the survivor itself."""
+
+    num_survivors = int(0.5 * len(sorted_pop))
+    coeff = 1.1
+    k = coeff ** (num_survivors + 1) - 1
+
+    survivor_ids = list(np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * np.random.rand(
+        num_survivors) + 1)))
+
+    while np.unique(survivor_ids).shape[0] < 2:
+        survivor_ids = list(np.round(num_survivors - (num_survivors / np.log(k + 1)) * np.log(k * np.random.rand(
+            num_survivors) + 1)))
+
+    survivor_ids *= 2
+
+    pairs = []
+    for this_survivor_id in survivor_ids:
+        not_this_survivor_ids = np.setdiff1d(survivor_ids, this_survivor_id)
+        not_this_survivor_id = int(random.choice(not_this_survivor_ids))
+        pairs.append((sorted_pop[int(this_survivor_id)], sorted_pop[not_this_survivor_id]))
+    return pairs
+
+
+def _rank_frequencies(draw, num_individuals, num_draws):
+    """Returns how often each rank is drawn as survivor and as partner, relative to the number of pairs."""
+
+    survivors, partners = np.zeros(num_individuals), np.zeros(num_individuals)
+    for _ in range(num_draws):
+        pairs = np.array(draw())
+        np.add.at(survivors, pairs[:, 0], 1)
+        np.add.at(partners, pairs[:, 1], 1)
+    return survivors / (num_draws * num_individuals), partners / (num_draws * num_individuals)
+
+
+@pytest.mark.parametrize('num_individuals, num_draws', [(6, 10000), (80, 1000)])
+def test_selection_keeps_distribution(num_individuals, num_draws):
+    sorted_pop = np.arange(num_individuals)
+
+    np.random.seed(0)
+    random.seed(0)
+    expected = _rank_frequencies(lambda: _selection_setdiff(sorted_pop), num_individuals, num_draws)
+    rng = np.random.RandomState(1)
+    frequencies = _rank_frequencies(lambda: selection(sorted_pop, rng), num_individuals, num_draws)
+
+    for frequency, expected_frequency in zip(frequencies, expected):
+        np.testing.assert_allclose(frequency, expected_frequency, rtol=0, atol=FREQUENCY_TOLERANCE)
+
+    # only the better half (plus the rank rounded up to) survives
+    assert np.all(frequencies[0][num_individuals // 2 + 1:] == 0)
+
+
+def test_selection_partner_is_uniform_over_other_survivors():
+    rng = np.random.RandomState(2)
+    sorted_pop = np.arange(20)
+
+    # position of each partner among the distinct survivors without the survivor itself, grouped by their number
+    positions = {}
+    for _ in range(5000):
+        pairs = np.array(selection(sorted_pop, rng))
+        distinct = np.unique(pairs[:, 0])
+        assert len(pairs) == len(sorted_pop)
+        assert np.all(pairs[:, 0] != pairs[:, 1])
+        assert np.all(np.isin(pairs[:, 1], distinct))
+
+        for survivor, partner in pairs:
+            others = distinct[distinct != survivor]
+            positions.setdefault(len(others), []).append(int(np.searchsorted(others, partner)))
+
+    tested = 0
+    for num_others, group in positions.items():
+        counts = np.bincount(group, minlength=num_others)
+        if np.min(counts) < 50:
+            continue
+        assert stats.chisquare(counts)[1] > 0.001, 'partners of {} other survivors'.format(num_others)
+        tested += 1
+    assert tested >= 2
+
+
+def test_selection_uses_global_state_without_rng():
+    sorted_pop = np.arange(10)
+    np.random.seed(3)
+    pairs = selection(sorted_pop)
+    np.random.seed(3)
+    assert selection(sorted_pop) == pairs
+    assert selection(sorted_pop, np.random.RandomState(3)) == pairs
+
+
+@pytest.mark.parametrize('num_individuals', [0, 1, 2, 3])
+def test_selection_needs_four_individuals(num_individuals):
+    with pytest.raises(ValueError):
+        selection(np.arange(num_individuals), np.random.RandomState(0))
+
+
+def test_selection_of_four_individuals():
+    rng = np.random.RandomState(4)
+    for _ in range(100):
+        pairs = np.array(selection(np.arange(4), rng))
+        assert pairs.shape == (4, 2)
+        assert np.all(pairs[:, 0] != pairs[:, 1])
+        assert np.all(pairs <= 2)
+
+
+@pytest.mark.parametrize('num_individuals', [4, 10])
+def test_select_pair_keeps_distribution(num_individuals):
+    sorted_pop = np.arange(num_individuals)
+    rng = np.random.RandomState(5)
+
+    # joint frequency of survivor and partner of single pairs and of all pairs of a selection
+    expected = np.zeros((num_individuals, num_individuals))
+    for _ in range(2000):
+        np.add.at(expected, tuple(np.array(selection(sorted_pop, rng)).T), 1)
+    frequencies = np.zeros((num_individuals, num_individuals))
+    for _ in range(20000):
+        frequencies[select_pair(sorted_pop, rng)] += 1
+
+    np.testing.assert_allclose(frequencies / np.sum(frequencies), expected / np.sum(expected), rtol=0,
+                               atol=FREQUENCY_TOLERANCE)
+    assert np.all(np.diag(frequencies) == 0)
+
+    with pytest.raises(ValueError):
+        select_pair(np.arange(3), rng)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import src.IO as IO
+from src.gene_pool import GenePool
+from src.evolution import selection_cutoff
+from src.simulation import simulate_multi_core, make_worker_pool
+from src.steady_state import steady_state, _replace_worst
+
+
+def _make_config(num_individuals):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = num_individuals
+    evo_config['simulation']['duration'] = 1
+    return evo_config
+
+
+def test_replace_worst_fills_then_replaces_minimum():
+    population, population_fitness = [], []
+    for name, fitness in zip('abcd', [3., 1., 4., 2.]):
+        assert _replace_worst(population, population_fitness, name, fitness, 4)
+    assert population == ['a', 'b', 'c', 'd'] and population_fitness == [3., 1., 4., 2.]
+
+    # not better than the worst individual
+    assert not _replace_worst(population, population_fitness, 'e', 1., 4)
+    assert not _replace_worst(population, population_fitness, 'f', 0.5, 4)
+    assert population == ['a', 'b', 'c', 'd']
+
+    # only the slot of the worst individual changes
+    assert _replace_worst(population, population_fitness, 'g', 2.5, 4)
+    assert population == ['a', 'g', 'c', 'd'] and population_fitness == [3., 2.5, 4., 2.]
+    assert _replace_worst(population, population_fitness, 'h', 5., 4)
+    assert population == ['a', 'g', 'c', 'h'] and population_fitness == [3., 2.5, 4., 5.]
+    assert len(population) == len(population_fitness) == 4
+
+
+@pytest.mark.parametrize('max_pending', [1, 3])
+def test_steady_state_yields_virtual_generations(max_pending):
+    num_individuals, num_generations = 4, 3
+    evo_config = _make_config(num_individuals)
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    pool = make_worker_pool(evo_config, num_cores=1)
+    try:
+        initial_fitness = simulate_multi_core(gene_pool, evo_config, pool=pool)[0]
+        generations = list(steady_state(gene_pool, evo_config, pool, num_generations, max_pending=max_pending))
+    finally:
+        pool.close()
+        pool.join()
+
+    assert len(generations) == num_generations
+    for evaluated, fitness, tracker, population, cutoff in generations:
+        assert isinstance(evaluated, GenePool) and len(evaluated) == len(fitness) == num_individuals
+        assert sorted(tracker) == list(range(num_individuals))
+        assert len(population) == num_individuals
+
+    # the initial genomes are simulated first and make up the first population, which only gets better afterwards
+    assert sorted(generations[0][1]) == sorted(initial_fitness)
+    cutoffs = [generation[4] for generation in generations]
+    assert cutoffs[0] == selection_cutoff(initial_fitness)
+    assert np.all(np.diff(cutoffs) >= 0)
@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pytest
+from src.tracker_store import TrackerStore, append_tracker, clear_tracker
+
+
+def _tracker(generation):
+    return {ind: np.full((3, 2), generation + ind, dtype=np.float32) for ind in range(2)}
+
+
+def test_lookup_by_generation(tmp_path):
+    tracker_dir = str(tmp_path / 'tracker')
+    store = TrackerStore(tracker_dir)
+    assert len(store) == 0
+
+    # a resumed evolution stores generations that do not start at 0
+    for generation in [5, 6, 7]:
+        append_tracker(_tracker(generation), generation, tracker_dir)
+
+    assert store.generations == [5, 6, 7] and len(store) == 3
+    assert np.all(store[6][1] == 7)
+    assert [tracker[0][0, 0] for tracker in store] == [5, 6, 7]
+    for generation in [0, 2, -1, 8]:
+        with pytest.raises(KeyError):
+            store[generation]
+
+    # appended and removed chunks are seen without creating a new store
+    append_tracker(_tracker(8), 8, tracker_dir)
+    assert np.all(store[8][0] == 8)
+    clear_tracker(tracker_dir, first_generation=7)
+    assert store.generations == [5, 6]
+    with pytest.raises(KeyError):
+        store[7]
+
+
+def test_listing_is_cached(tmp_path, monkeypatch):
+    tracker_dir = str(tmp_path / 'tracker')
+    for generation in range(3):
+        append_tracker(_tracker(generation), generation, tracker_dir)
+    store = TrackerStore(tracker_dir)
+    assert len(store) == 3
+
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda path: listed.append(path) or listdir(path))
+    for generation in range(3):
+        store[generation]
+    assert len(store) == 3 and store.generations == [0, 1, 2]
+    assert listed == []
@@ -0,0 +1,49 @@
+import numpy as np
+import pybullet as p
+import pytest
+import src.IO as IO
+import src.simulation as simulation
+from src.individual import _make_limb_dict
+
+
+def _make_config(interval=10, channels=()):
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 3
+    evo_config['simulation']['duration'] = 1
+    evo_config['simulation']['tracking'] = {'interval': interval, 'channels': list(channels)}
+    return evo_config
+
+
+def _simulate_tracked(gene_pool, evo_config):
+    pop, sim_id, tracker, _ = simulation.simulate_pop(gene_pool, evo_config, direct=True)
+    p.disconnect(physicsClientId=sim_id)
+    return tracker
+
+
+@pytest.mark.parametrize('channels, width', [((), 2), (('z', ), 3), (('z', 'orientation'), 7),
+                                             (('z', 'orientation', 'joints'), 7 + len(_make_limb_dict()))])
+def test_tracker_shape(channels, width):
+    evo_config = _make_config(interval=7, channels=channels)
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+    tracker = _simulate_tracked(gene_pool, evo_config)
+
+    num_samples = int(np.ceil(simulation._duration_steps(evo_config) / 7))
+    assert tracker.shape == (3, num_samples, width)
+    assert not np.any(np.isnan(tracker))
+
+
+def test_samples_are_spaced_by_interval():
+    np.random.seed(1)
+    gene_pool = IO.new_gene_pool(None, _make_config())
+
+    # every step is sampled, the tracker with a larger interval holds every 6th sample of it
+    tracker_all = _simulate_tracked(gene_pool, _make_config(interval=1, channels=['z', 'orientation']))
+    tracker = _simulate_tracked(gene_pool, _make_config(interval=6, channels=['z', 'orientation']))
+
+    assert len(tracker_all) == len(tracker)
+    assert tracker.shape[1] == int(np.ceil(tracker_all.shape[1] / 6))
+    np.testing.assert_array_equal(tracker, tracker_all[:, ::6])
+
+    # x and y are recorded first, the individuals actually move between samples
+    assert np.all(np.abs(np.diff(tracker[:, :, :2], axis=1)).sum(axis=(1, 2)) > 0)
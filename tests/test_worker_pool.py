@@ -0,0 +1,49 @@
+import copy
+import numpy as np
+import src.IO as IO
+from src.simulation import simulate_multi_core, simulate_async, make_worker_pool, _batch_config
+
+
+def test_batch_config_takes_precedence():
+    evo_config = IO.make_default_evo_config()
+    evo_config['simulation']['individuals'] = 3
+    evo_config['simulation']['duration'] = 1
+    other_config = copy.deepcopy(evo_config)
+    other_config['simulation']['duration'] = 2
+    np.random.seed(0)
+    gene_pool = IO.new_gene_pool(None, evo_config)
+
+    reference = {}
+    for config in [evo_config, other_config]:
+        pool = make_worker_pool(config, num_cores=1)
+        try:
+            reference[config['simulation']['duration']] = simulate_multi_core(gene_pool, config, pool=pool)[0]
+        finally:
+            pool.close()
+            pool.join()
+    assert not np.array_equal(reference[1], reference[2])
+
+    pool = make_worker_pool(evo_config, num_cores=1)
+    try:
+        # the configuration of the pool is not sent again, a different one is
+        assert _batch_config(pool, copy.deepcopy(evo_config)) is None
+        assert _batch_config(pool, None) is None
+        assert _batch_config(pool, other_config) is other_config
+
+        for config in [evo_config, other_config, evo_config]:
+            expected = reference[config['simulation']['duration']]
+            assert np.array_equal(simulate_multi_core(gene_pool, config, pool=pool)[0], expected)
+            fitness = [simulate_async([genome], pool, evo_config=config).get()[0][0] for genome in gene_pool]
+            assert np.array_equal(fitness, expected)
+    finally:
+        pool.close()
+        pool.join()
+
+    # a pool without configuration simulates whatever it is sent
+    pool = make_worker_pool(None, num_cores=1)
+    try:
+        assert _batch_config(pool, evo_config) is evo_config
+        assert np.array_equal(simulate_multi_core(gene_pool, other_config, pool=pool)[0], reference[2])
+    finally:
+        pool.close()
+        pool.join()